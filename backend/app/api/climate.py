@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request
+
+from app.services.climatology import DAYS_PER_YEAR_SLOTS, NormalsNotReady, climatology, day_slot
+from app.services.geo_service import geo_service
+from app.utils.http_cache import EncodedBodyCache, conditional_response, negotiate_media_type
+
+router = APIRouter()
+
+NORMALS_CACHE_CONTROL = 'public, max-age=86400'
+MB = 1024 * 1024
+
+_encoded_bodies = EncodedBodyCache(max_bytes=8 * MB)
+
+
+def resolve_province(province: str) -> tuple[str, dict]:
+    province = province.strip()
+    if len(province) == 1:
+        province = f'0{province}'
+    province_data = geo_service.get_province_by_code(province)
+    if not province_data:
+        raise HTTPException(status_code=404, detail=f'Il bulunamadi: {province}')
+    return province, province_data
+
+
+@router.get('/climate/normals')
+async def get_climate_normals(
+    request: Request,
+    province: str = Query(..., min_length=1, description='Il plaka kodu'),
+    start_date: Optional[str] = Query(None, pattern=r'^\d{4}-\d{2}-\d{2}$', description='Baslangic tarihi (YYYY-MM-DD)'),
+    end_date: Optional[str] = Query(None, pattern=r'^\d{4}-\d{2}-\d{2}$', description='Bitis tarihi (YYYY-MM-DD)'),
+):
+    """Secilen il icin referans donemi gun-of-year normallerini dondurur (ortalama, std, p10/p50/p90).
+
+    Tarih verilmezse yilin 366 gunu doner. Normaller il basina onceden
+    hesaplanip saklanir; istekler upstream'e gitmez, tablosu henuz
+    dolmamis il icin 503 ve Retry-After doner.
+    """
+    province, province_data = resolve_province(province)
+
+    if start_date:
+        try:
+            start_dt = datetime.strptime(start_date, '%Y-%m-%d').date()
+            end_dt = datetime.strptime(end_date or start_date, '%Y-%m-%d').date()
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=f'Tarih formati yanlis: {exc}') from exc
+        days = max(0, (end_dt - start_dt).days) + 1
+        if days > DAYS_PER_YEAR_SLOTS:
+            raise HTTPException(status_code=400, detail=f'En fazla {DAYS_PER_YEAR_SLOTS} gunluk aralik secilebilir.')
+        slots = [day_slot(start_dt + timedelta(days=offset)) for offset in range(days)]
+    else:
+        slots = list(range(DAYS_PER_YEAR_SLOTS))
+
+    try:
+        normals = await climatology.require(province)
+    except NormalsNotReady as exc:
+        raise HTTPException(status_code=503, detail=str(exc), headers={'Retry-After': str(exc.retry_after)}) from exc
+    payload = {
+        'province': province_data.get('name'),
+        'plate_code': province,
+        **normals.to_dict(slots),
+    }
+    return conditional_response(
+        request,
+        _encoded_bodies.encode(
+            ('normals', province, start_date, end_date),
+            payload,
+            normals.built_at,
+            negotiate_media_type(request, arrow=False),
+        ),
+        NORMALS_CACHE_CONTROL,
+    )
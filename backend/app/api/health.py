@@ -2,6 +2,10 @@ from fastapi import APIRouter
 from datetime import datetime
 import time
 
+from app.services.cache import cache_stats
+from app.services.open_meteo import open_meteo
+from app.utils.singleflight import singleflight_stats
+
 router = APIRouter()
 
 # Server start time (basit uptime tracking)
@@ -11,9 +15,16 @@ START_TIME = time.time()
 async def health_check():
     """Sağlık kontrolü endpoint'i"""
     uptime_seconds = int(time.time() - START_TIME)
+    upstream = open_meteo.breaker_stats()
+    degraded = any(breaker["state"] != "closed" for breaker in upstream.values())
     return {
-        "status": "healthy",
+        "status": "degraded" if degraded else "healthy",
         "timestamp": datetime.utcnow().isoformat(),
         "uptime_seconds": uptime_seconds,
-        "message": "🟢 API çalışıyor"
+        "caches": cache_stats(),
+        "singleflight": singleflight_stats(),
+        "upstream": upstream,
+        "upstream_mode": open_meteo.mode,
+        "scheduler": open_meteo.scheduler.stats(),
+        "message": "🟡 Open-Meteo kısmen erişilemiyor" if degraded else "🟢 API çalışıyor"
     }
@@ -0,0 +1,18 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+
+from app.utils.metrics import CONTENT_TYPE, Histogram, render
+
+router = APIRouter()
+
+HTTP_LATENCY = Histogram(
+    'http_request_duration_seconds',
+    'HTTP istek suresi (rota sablonu, metod ve durum koduna gore).',
+    ('route', 'method', 'status'),
+)
+
+
+@router.get('/metrics', include_in_schema=False)
+async def get_metrics():
+    """Prometheus metin biciminde metrikler."""
+    return Response(content=render(), media_type=CONTENT_TYPE)
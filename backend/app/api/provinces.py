@@ -1,58 +1,95 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
+import json
+from fastapi import APIRouter, HTTPException, Query, Request
+from typing import Dict, Tuple
 from app.services.geo_service import geo_service
 from app.models.province import ProvinceInfo, ProvinceList, Coordinates
+from app.utils.http_cache import PreparedResponse
 
 router = APIRouter()
 
-@router.get("/provinces", response_model=ProvinceList)
-async def get_provinces():
-    """81 ilin listesini döndürür"""
-    try:
-        provinces_data = geo_service.get_all_provinces()
-        
-        provinces = []
-        for p in provinces_data:
-            province = ProvinceInfo(
-                name=p.get("name"),
-                name_en=p.get("name"),
-                plate_code=p.get("plate_code"),
-                region=p.get("region"),
-                population=p.get("population"),
-                area_km2=p.get("area_km2"),
-                elevation=p.get("elevation"),
-                coordinates=Coordinates(
-                    latitude=p.get("latitude"),
-                    longitude=p.get("longitude")
-                )
+def _build_province_list() -> ProvinceList:
+    """81 ilin listesini modele dönüştür"""
+    provinces = []
+    for p in geo_service.get_all_provinces():
+        province = ProvinceInfo(
+            name=p.get("name"),
+            name_en=p.get("name"),
+            plate_code=p.get("plate_code"),
+            region=p.get("region"),
+            population=p.get("population"),
+            area_km2=p.get("area_km2"),
+            elevation=p.get("elevation"),
+            coordinates=Coordinates(
+                latitude=p.get("latitude"),
+                longitude=p.get("longitude")
             )
-            provinces.append(province)
-        
-        return ProvinceList(
-            provinces=provinces,
-            total=len(provinces)
         )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        provinces.append(province)
+
+    return ProvinceList(
+        provinces=provinces,
+        total=len(provinces)
+    )
+
+def _build_province_detail(province_data: dict) -> dict:
+    """Tek il yanıtının gövdesi"""
+    return {
+        "name": province_data.get("name"),
+        "plate_code": province_data.get("plate_code"),
+        "coordinates": {
+            "latitude": province_data.get("latitude"),
+            "longitude": province_data.get("longitude")
+        },
+        "elevation": province_data.get("elevation")
+    }
+
+def _prepare_static_responses() -> Tuple[PreparedResponse, Dict[str, PreparedResponse]]:
+    """İl yanıtlarını bir kez serileştir; veri yalnızca koordinat dosyası değişince değişir"""
+    list_response = PreparedResponse(_build_province_list().model_dump_json().encode("utf-8"))
+    detail_responses = {
+        province.get("plate_code"): PreparedResponse(
+            json.dumps(_build_province_detail(province), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        )
+        for province in geo_service.get_all_provinces()
+    }
+    return list_response, detail_responses
+
+_province_list_response, _province_detail_responses = _prepare_static_responses()
+
+@router.get("/provinces", response_model=ProvinceList)
+async def get_provinces(request: Request):
+    """81 ilin listesini döndürür"""
+    return _province_list_response.respond(request)
+
+@router.get("/provinces/nearest")
+async def get_nearest_provinces(
+    lat: float = Query(..., ge=-90, le=90, description="Enlem"),
+    lon: float = Query(..., ge=-180, le=180, description="Boylam"),
+    k: int = Query(1, ge=1, le=81, description="Döndürülecek il sayısı"),
+):
+    """Verilen koordinata en yakın illeri mesafeye göre sıralı döndürür"""
+    nearest = geo_service.get_nearest_provinces(lat, lon, k)
+    return {
+        "query": {"latitude": lat, "longitude": lon},
+        "provinces": [
+            {
+                "name": province.get("name"),
+                "plate_code": province.get("plate_code"),
+                "coordinates": {
+                    "latitude": province.get("latitude"),
+                    "longitude": province.get("longitude")
+                },
+                "distance_km": round(distance, 2)
+            }
+            for province, distance in nearest
+        ],
+        "total": len(nearest)
+    }
 
 @router.get("/provinces/{plate_code}")
-async def get_province(plate_code: str):
+async def get_province(plate_code: str, request: Request):
     """Spesifik bir ili al"""
-    try:
-        province_data = geo_service.get_province_by_code(plate_code)
-        if not province_data:
-            raise HTTPException(status_code=404, detail=f"İl bulunamadı: {plate_code}")
-        
-        return {
-            "name": province_data.get("name"),
-            "plate_code": province_data.get("plate_code"),
-            "coordinates": {
-                "latitude": province_data.get("latitude"),
-                "longitude": province_data.get("longitude")
-            },
-            "elevation": province_data.get("elevation")
-        }
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    prepared = _province_detail_responses.get(plate_code)
+    if prepared is None:
+        raise HTTPException(status_code=404, detail=f"İl bulunamadı: {plate_code}")
+    return prepared.respond(request)
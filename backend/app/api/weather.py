@@ -1,30 +1,113 @@
-﻿from datetime import datetime
+﻿from datetime import datetime, timedelta
 import asyncio
 import logging
 import time
-from typing import Optional
+from collections import deque
+from typing import AsyncIterator, Optional
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 
+from app.config import settings
 from app.models.weather import DailyWeatherData, HourlyWeatherData, WeatherData, WeatherResponse
+from app.services.archive_store import archive_store
+from app.services.cache import TieredCache, cache_stats
+from app.services.climatology import NormalsNotReady, anomaly_series, climatology
 from app.services.geo_service import geo_service
-from app.services.open_meteo import open_meteo
+from app.services.open_meteo import ARCHIVE_ENDPOINT, FORECAST_ENDPOINT, open_meteo
+from app.services.national_stats import concat_columns, national_day_stats
+from app.services.refresher import BackgroundRefresher
+from app.services.snapshot_cube import SnapshotCube
+from app.utils.deadline import Deadline, DeadlineExceeded
+from app.utils.downsampling import reduce_series
+from app.utils.helpers import merge_series, plan_fetch_ranges, split_by_year, split_series_by_day
+from app.utils.http_cache import EncodedBodyCache, cache_control_for, conditional_response, negotiate_media_type
+from app.utils.lru_cache import LRUCache
+from app.utils.metrics import Counter, Gauge, Histogram, register_collector
+from app.utils.request_scheduler import BACKGROUND, BULK
+from app.utils.singleflight import SingleFlight
+from app.utils.timing import span
+from app.utils.wire_formats import dump_json
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-_current_cache = {'timestamp': 0.0, 'payload': None}
-_snapshot_cache = {'timestamp': 0.0, 'key': None, 'payload': None}
-_snapshot_hourly_cache: dict[str, dict] = {}
-_weather_cache: dict[str, dict] = {}
-
 CURRENT_CACHE_TTL_SECONDS = 900
+CURRENT_REFRESH_MARGIN_SECONDS = 120
 SNAPSHOT_CACHE_TTL_SECONDS = 900
 SNAPSHOT_HOURLY_CACHE_TTL_SECONDS = 21600
 WEATHER_CACHE_TTL_SECONDS = 900
+SEGMENT_BRIDGE_MAX_DAYS = 3
 SNAPSHOT_FETCH_TIMEOUT_SECONDS = 6.5
+SNAPSHOT_BATCH_TIMEOUT_SECONDS = 10.0
 SNAPSHOT_CURRENT_TIMEOUT_SECONDS = 5.0
-MAX_CONCURRENT_REQUESTS = 10
+HISTORY_FETCH_CONCURRENCY = 4
+NATIONAL_MAX_DAYS = 31
+ANOMALY_MAX_DAYS = 366
+CURRENT_CACHE_KEY = 'all'
+PRIMARY_SERIES_FIELDS = {'hourly': 'temperature_2m', 'daily': 'temperature_2m_max'}
+STREAM_NDJSON_MEDIA_TYPE = 'application/x-ndjson'
+STREAM_SSE_MEDIA_TYPE = 'text/event-stream'
+
+MB = 1024 * 1024
+
+_current_cache = TieredCache('current', CURRENT_CACHE_TTL_SECONDS, max_entries=1, max_bytes=2 * MB)
+_snapshot_cache = TieredCache('snapshot', SNAPSHOT_CACHE_TTL_SECONDS, max_bytes=16 * MB)
+_snapshot_hourly_cache = TieredCache('snapshot_hourly', SNAPSHOT_HOURLY_CACHE_TTL_SECONDS, max_bytes=32 * MB)
+_weather_cache = TieredCache('weather', WEATHER_CACHE_TTL_SECONDS, max_bytes=64 * MB)
+_weather_segment_cache = TieredCache('weather_day', WEATHER_CACHE_TTL_SECONDS, max_bytes=64 * MB)
+
+_encoded_bodies = EncodedBodyCache(max_bytes=32 * MB)
+# Toplanmis/seyreltilmis /weather gorunumleri; kaynak payload'un zaman damgasiyla dogrulanir.
+_weather_views = LRUCache(max_bytes=16 * MB)
+# Gun basina ulusal istatistikler; gunun snapshot kupunun zaman damgasiyla dogrulanir.
+_national_days = LRUCache(max_bytes=8 * MB)
+# Tarih basina il x saat x degisken kupu; saat secimi kupten dilimlenir.
+_snapshot_cubes = LRUCache(max_bytes=32 * MB, ttl_seconds=SNAPSHOT_HOURLY_CACHE_TTL_SECONDS, sizeof=lambda cube: cube.nbytes)
+
+_snapshot_hourly_flight = SingleFlight('snapshot_hourly')
+_weather_flight = SingleFlight('weather')
+
+FALLBACK_PATHS = Counter(
+    'weather_fallback_total',
+    'Verinin hangi kaynaktan geldigi: aralik zinciri ve snapshot fan-out asamalari (il sayisi).',
+    ('chain', 'path'),
+)
+FANOUT_DURATION = Histogram('weather_fanout_duration_seconds', '81 illik fan-out build suresi.', ('fanout',))
+FANOUT_AVAILABLE = Gauge('weather_fanout_available_provinces', 'Son fan-out build\'inde verisi alinan il sayisi.', ('fanout',))
+FANOUT_COVERAGE = Gauge('weather_fanout_coverage_ratio', 'Son fan-out build\'inin kapsama orani (0-1).', ('fanout',))
+
+
+def _collect_cache_metrics():
+    """Bu moduldeki tum cache'lerin sayaclari; okuma aninda mevcut stats() degerlerinden uretilir."""
+    rows = []
+    for namespace, stats in cache_stats().items():
+        rows.append((namespace, 'l1', stats['l1']))
+        rows.append((namespace, 'l2', {'hits': stats['l2_hits'], 'misses': stats['l2_misses']}))
+    for name, local_cache in (
+        ('encoded_bodies', _encoded_bodies),
+        ('weather_views', _weather_views),
+        ('national_days', _national_days),
+        ('snapshot_cubes', _snapshot_cubes),
+    ):
+        rows.append((name, 'local', local_cache.stats()))
+
+    families = (
+        ('hits', 'counter', 'Cache isabetleri.'),
+        ('misses', 'counter', 'Cache iskalari.'),
+        ('evictions', 'counter', 'Boyut siniri nedeniyle atilan kayitlar.'),
+        ('expirations', 'counter', 'Suresi dolan kayitlar.'),
+        ('entries', 'gauge', 'Cache\'teki kayit sayisi.'),
+        ('bytes', 'gauge', 'Cache\'in yaklasik boyutu (byte).'),
+    )
+    for field, kind, documentation in families:
+        name = f'weather_cache_{field}_total' if kind == 'counter' else f'weather_cache_{field}'
+        yield name, kind, documentation, [
+            ({'cache': cache_name, 'tier': tier}, stats[field]) for cache_name, tier, stats in rows if field in stats
+        ]
+
+
+register_collector(_collect_cache_metrics)
 
 
 def _parse_time_fraction(value: str) -> float:
@@ -50,24 +133,11 @@ def _extract_hour_fraction(timestamp: str) -> Optional[float]:
         return None
 
 
-def _resolve_best_hour_index(time_values: list[str], target_hour: float) -> int:
-    if not time_values:
-        return 0
-
-    best_index = 0
-    best_distance = 999.0
-
-    for index, time_value in enumerate(time_values):
-        hour_fraction = _extract_hour_fraction(time_value)
-        if hour_fraction is None:
-            continue
-
-        distance = abs(hour_fraction - target_hour)
-        if distance < best_distance:
-            best_distance = distance
-            best_index = index
-
-    return best_index
+def _stream_line(event: str, data: dict, sse: bool = False) -> bytes:
+    body = dump_json(data)
+    if sse:
+        return b'event: ' + event.encode() + b'\ndata: ' + body + b'\n\n'
+    return dump_json({'type': event, 'data': data}) + b'\n'
 
 
 def _safe_value(values, index: int, default):
@@ -125,174 +195,271 @@ def _normalize_hourly_payload(hourly_data: dict) -> dict:
     }
 
 
-async def _get_province_hourly_from_snapshot(date: str, province_code: str) -> Optional[dict]:
-    hourly_payload = _snapshot_cache_get(date)
-    if hourly_payload is None:
-        try:
-            hourly_payload = await _build_snapshot_hourly_payload(date)
-            _snapshot_cache_put(date, hourly_payload)
-        except Exception as snapshot_exc:
-            logger.warning('Hourly snapshot rebuild failed for %s on %s: %s', province_code, date, snapshot_exc)
-            return None
-
-    return _extract_province_hourly_from_payload(hourly_payload, province_code)
-
+async def _load_snapshot_hourly_entry(date: str, deadline: Optional[Deadline] = None) -> tuple[dict, float]:
+    """Tarihin 81 il saatlik verisini (payload, timestamp) olarak cache'ten al, yoksa tek bir build ile uret.
 
-def _snapshot_cache_get(date: str):
-    entry = _snapshot_hourly_cache.get(date)
-    if not entry:
-        return None
-
-    now = time.time()
-    if (now - entry['timestamp']) > SNAPSHOT_HOURLY_CACHE_TTL_SECONDS:
-        _snapshot_hourly_cache.pop(date, None)
-        return None
+    Zaman butcesi yuzunden eksik kalan build cache'e yazilmaz; ayni build'i
+    bekleyen diger isteklerin butcesi de eksik (degraded) isaretlenir.
+    """
+    entry = await _snapshot_hourly_cache.get_entry(date)
+    if entry is not None:
+        return entry
 
-    return entry['payload']
+    async def build_payload():
+        payload = await _build_snapshot_hourly_payload(date, deadline)
+        if deadline is not None and deadline.degraded:
+            return payload, time.time(), True
+        timestamp = await _snapshot_hourly_cache.set(date, payload)
+        return payload, timestamp, False
 
+    payload, timestamp, degraded = await _snapshot_hourly_flight.do(date, build_payload)
+    if degraded and deadline is not None:
+        deadline.mark_degraded()
+    return payload, timestamp
 
-def _snapshot_cache_put(date: str, payload):
-    _snapshot_hourly_cache[date] = {
-        'timestamp': time.time(),
-        'payload': payload,
-    }
-
-    if len(_snapshot_hourly_cache) > 6:
-        oldest_date = min(_snapshot_hourly_cache.items(), key=lambda item: item[1]['timestamp'])[0]
-        _snapshot_hourly_cache.pop(oldest_date, None)
 
+async def _load_snapshot_cube(date: str, deadline: Optional[Deadline] = None) -> SnapshotCube:
+    """Tarihin saatlik payload'unu il x saat x degisken kupune cevir; ayni payload icin bir kez kurulur."""
+    hourly_payload, built_at = await _load_snapshot_hourly_entry(date, deadline)
+    cube = _snapshot_cubes.get(date)
+    if cube is None or cube.built_at != built_at:
+        cube = SnapshotCube.from_payload(date, hourly_payload, built_at)
+        _snapshot_cubes.put(date, cube)
+    return cube
 
-def _weather_cache_get(key: str):
-    entry = _weather_cache.get(key)
-    if not entry:
-        return None
 
-    if (time.time() - entry['timestamp']) > WEATHER_CACHE_TTL_SECONDS:
-        _weather_cache.pop(key, None)
+async def _get_province_hourly_from_snapshot(date: str, province_code: str, deadline: Optional[Deadline] = None) -> Optional[dict]:
+    try:
+        hourly_payload, _ = await _load_snapshot_hourly_entry(date, deadline)
+    except Exception as snapshot_exc:
+        logger.warning('Hourly snapshot rebuild failed for %s on %s: %s', province_code, date, snapshot_exc)
         return None
 
-    return entry['payload']
-
+    return _extract_province_hourly_from_payload(hourly_payload, province_code)
 
-def _weather_cache_put(key: str, payload):
-    _weather_cache[key] = {'timestamp': time.time(), 'payload': payload}
-    if len(_weather_cache) > 512:
-        oldest_key = min(_weather_cache.items(), key=lambda item: item[1]['timestamp'])[0]
-        _weather_cache.pop(oldest_key, None)
 
+async def _fetch_archive_range(
+    province: str,
+    latitude: float,
+    longitude: float,
+    start_dt,
+    end_dt,
+    hourly_bool: bool,
+    deadline: Optional[Deadline] = None,
+) -> dict:
+    """Arsiv verisini once kalici depodan okur; upstream'e yalnizca eksik gunler icin gider."""
+    series_key = 'hourly' if hourly_bool else 'daily'
+    with span('archive_store'):
+        stored_series, missing_ranges = await archive_store.read_range(province, start_dt, end_dt, hourly_bool)
+    if not missing_ranges:
+        FALLBACK_PATHS.inc('range', 'archive_store')
+        return {series_key: stored_series}
+
+    weather_data = await open_meteo.get_historical_weather(
+        latitude=latitude,
+        longitude=longitude,
+        start_date=missing_ranges[0][0].isoformat(),
+        end_date=missing_ranges[-1][1].isoformat(),
+        hourly=hourly_bool,
+        deadline=deadline,
+    )
+    FALLBACK_PATHS.inc('range', 'archive')
+    fetched_series = weather_data.get(series_key)
+    if isinstance(fetched_series, dict):
+        await archive_store.write_series(province, fetched_series, hourly_bool)
+        if stored_series is not None:
+            weather_data = {**weather_data, series_key: merge_series(stored_series, fetched_series)}
+    return weather_data
+
+
+async def _fetch_weather_range(
+    province: str,
+    province_data: dict,
+    start_dt,
+    end_dt,
+    hourly_bool: bool,
+    deadline: Optional[Deadline] = None,
+    allow_snapshot: bool = True,
+) -> dict:
+    """Bir tarih araligini upstream fallback zinciriyle (arsiv -> forecast -> anlik) al.
+
+    Devresi acik bir uc beklemeden CircuitOpenError verir; zincir dogrudan sonraki uca gecer.
+    Tum adimlar ayni zaman butcesinden pay alir; butce biterse DeadlineExceeded yukselir.
+    81 illik snapshot yalnizca allow_snapshot acikken (tek gunluk isteklerde) denenir.
+    """
+    latitude = province_data.get('latitude')
+    longitude = province_data.get('longitude')
+    start_date = start_dt.isoformat()
+    end_date = end_dt.isoformat()
 
-@router.get('/weather')
-async def get_weather(
-    province: str = Query(..., min_length=1, description='Il plaka kodu'),
-    start_date: str = Query(..., pattern=r'^\d{4}-\d{2}-\d{2}$', description='Baslangic tarihi (YYYY-MM-DD)'),
-    end_date: Optional[str] = Query(None, pattern=r'^\d{4}-\d{2}-\d{2}$', description='Bitis tarihi (YYYY-MM-DD)'),
-    hourly: str = Query('true', description='Saatlik veri mi? (true/false)'),
-):
-    """Secilen il icin hava durumu verisini dondurur."""
     try:
-        hourly_bool = hourly.lower().strip() in ('true', '1', 'yes')
-
-        province = province.strip()
-        if len(province) == 1:
-            province = f'0{province}'
-
-        province_data = geo_service.get_province_by_code(province)
-        if not province_data:
-            raise HTTPException(status_code=404, detail=f'Il bulunamadi: {province}')
-
-        latitude = province_data.get('latitude')
-        longitude = province_data.get('longitude')
-
-        try:
-            start_dt = datetime.strptime(start_date, '%Y-%m-%d').date()
-            end_dt = datetime.strptime(end_date or start_date, '%Y-%m-%d').date()
-            if end_dt < start_dt:
-                end_dt = start_dt
-        except ValueError as exc:
-            raise HTTPException(status_code=400, detail=f'Tarih formati yanlis: {exc}') from exc
-
-        cache_key = f'{province}|{start_dt.isoformat()}|{end_dt.isoformat()}|{hourly_bool}'
-        cached_payload = _weather_cache_get(cache_key)
-        if cached_payload:
-            return cached_payload
-
+        weather_data = await _fetch_archive_range(province, latitude, longitude, start_dt, end_dt, hourly_bool, deadline)
+    except Exception as exc:
+        logger.warning('Archive API failed: %s. Trying forecast API.', exc)
         try:
-            weather_data = await open_meteo.get_historical_weather(
+            weather_data = await open_meteo.get_recent_weather(
                 latitude=latitude,
                 longitude=longitude,
                 start_date=start_date,
-                end_date=end_date or start_date,
+                end_date=end_date,
                 hourly=hourly_bool,
+                deadline=deadline,
             )
-        except Exception as exc:
-            logger.warning('Archive API failed: %s. Trying forecast API.', exc)
-            try:
-                weather_data = await open_meteo.get_recent_weather(
-                    latitude=latitude,
-                    longitude=longitude,
-                    start_date=start_date,
-                    end_date=end_date or start_date,
-                    hourly=hourly_bool,
+            FALLBACK_PATHS.inc('range', 'forecast')
+        except Exception as recent_exc:
+            logger.error('Forecast API failed: %s. Falling back to current weather.', recent_exc)
+            weather_data = await open_meteo.get_current_weather(latitude=latitude, longitude=longitude, deadline=deadline)
+            FALLBACK_PATHS.inc('range', 'current')
+            current = weather_data.get('current', {})
+            current_time = current.get('time', datetime.now().isoformat())
+
+            if hourly_bool:
+                province_hourly = (
+                    await _get_province_hourly_from_snapshot(start_date, province, deadline) if allow_snapshot else None
                 )
-            except Exception as recent_exc:
-                logger.error('Forecast API failed: %s. Falling back to current weather.', recent_exc)
-                weather_data = await open_meteo.get_current_weather(latitude=latitude, longitude=longitude)
-                current = weather_data.get('current', {})
-                current_time = current.get('time', datetime.now().isoformat())
-
-                if hourly_bool:
-                    province_hourly = await _get_province_hourly_from_snapshot(start_date, province)
-                    if _is_hourly_series_usable(province_hourly):
-                        weather_data = {
-                            'hourly': _normalize_hourly_payload(province_hourly),
-                        }
-                    else:
-                        if start_dt != datetime.now().date():
-                            raise HTTPException(
-                                status_code=503,
-                                detail='Secilen tarih icin saatlik seri verisi alinamadi. Lutfen tekrar deneyin.',
-                            )
-
-                        weather_data = {
-                            'hourly': {
-                                'time': [current_time],
-                                'temperature_2m': [float(current.get('temperature_2m', 0))],
-                                'apparent_temperature': [float(current.get('apparent_temperature', current.get('temperature_2m', 0)))],
-                                'precipitation': [float(current.get('precipitation', 0))],
-                                'wind_speed_10m': [float(current.get('wind_speed_10m', 0))],
-                                'wind_direction_10m': [float(current.get('wind_direction_10m', 0))],
-                                'relative_humidity_2m': [int(current.get('relative_humidity_2m', 50))],
-                                'pressure_msl': [float(current.get('pressure_msl', 0))],
-                                'visibility': [float(current.get('visibility', 0))],
-                                'cloud_cover': [int(current.get('cloud_cover', 0))],
-                                'weather_code': [int(current.get('weather_code', 0))],
-                            }
-                        }
+                if _is_hourly_series_usable(province_hourly):
+                    FALLBACK_PATHS.inc('range', 'snapshot')
+                    weather_data = {
+                        'hourly': _normalize_hourly_payload(province_hourly),
+                    }
                 else:
+                    if start_dt != datetime.now().date():
+                        raise HTTPException(
+                            status_code=503,
+                            detail='Secilen tarih icin saatlik seri verisi alinamadi. Lutfen tekrar deneyin.',
+                        )
+
                     weather_data = {
-                        'daily': {
-                            'time': [start_date],
-                            'temperature_2m_max': [float(current.get('temperature_2m', 0))],
-                            'temperature_2m_min': [float(current.get('temperature_2m', 0))],
-                            'precipitation_sum': [float(current.get('precipitation', 0))],
+                        'hourly': {
+                            'time': [current_time],
+                            'temperature_2m': [float(current.get('temperature_2m', 0))],
+                            'apparent_temperature': [float(current.get('apparent_temperature', current.get('temperature_2m', 0)))],
+                            'precipitation': [float(current.get('precipitation', 0))],
+                            'wind_speed_10m': [float(current.get('wind_speed_10m', 0))],
+                            'wind_direction_10m': [float(current.get('wind_direction_10m', 0))],
+                            'relative_humidity_2m': [int(current.get('relative_humidity_2m', 50))],
+                            'pressure_msl': [float(current.get('pressure_msl', 0))],
+                            'visibility': [float(current.get('visibility', 0))],
+                            'cloud_cover': [int(current.get('cloud_cover', 0))],
                             'weather_code': [int(current.get('weather_code', 0))],
                         }
                     }
-
-        if hourly_bool and start_dt == end_dt:
-            hourly_candidate = weather_data.get('hourly') if isinstance(weather_data, dict) else None
-            if not _is_hourly_series_usable(hourly_candidate):
-                province_hourly = await _get_province_hourly_from_snapshot(start_date, province)
-                if _is_hourly_series_usable(province_hourly):
-                    weather_data = {
-                        'hourly': _normalize_hourly_payload(province_hourly),
+            else:
+                weather_data = {
+                    'daily': {
+                        'time': [start_date],
+                        'temperature_2m_max': [float(current.get('temperature_2m', 0))],
+                        'temperature_2m_min': [float(current.get('temperature_2m', 0))],
+                        'precipitation_sum': [float(current.get('precipitation', 0))],
+                        'weather_code': [int(current.get('weather_code', 0))],
                     }
-                elif start_dt != datetime.now().date():
-                    raise HTTPException(
-                        status_code=503,
-                        detail='Secilen tarih icin saatlik seri verisi eksik. Lutfen tekrar deneyin.',
-                    )
+                }
+
+    if hourly_bool and allow_snapshot and start_dt == end_dt:
+        hourly_candidate = weather_data.get('hourly') if isinstance(weather_data, dict) else None
+        if not _is_hourly_series_usable(hourly_candidate):
+            province_hourly = await _get_province_hourly_from_snapshot(start_date, province, deadline)
+            if _is_hourly_series_usable(province_hourly):
+                FALLBACK_PATHS.inc('range', 'snapshot')
+                weather_data = {
+                    'hourly': _normalize_hourly_payload(province_hourly),
+                }
+            elif start_dt != datetime.now().date():
+                raise HTTPException(
+                    status_code=503,
+                    detail='Secilen tarih icin saatlik seri verisi eksik. Lutfen tekrar deneyin.',
+                )
+
+    return weather_data
+
+
+def _segment_key(province: str, day, hourly_bool: bool) -> str:
+    return f'{province}|{day.isoformat()}|{hourly_bool}'
 
+
+def _is_complete_segment(segment: dict, hourly_bool: bool) -> bool:
+    if hourly_bool:
+        return len(segment.get('time', [])) == 24 and any(
+            value is not None for value in segment.get('temperature_2m') or []
+        )
+    return len(segment.get('time', [])) == 1 and (segment.get('temperature_2m_max') or [None])[0] is not None
+
+
+async def _fetch_weather_payload(
+    province: str,
+    province_data: dict,
+    start_dt,
+    end_dt,
+    hourly_bool: bool,
+    deadline: Optional[Deadline] = None,
+) -> dict:
+    """Istenen araligi gunluk segmentlerden kurar; upstream'e yalnizca eksik gunler icin gider.
+
+    Zaman butcesine yetismeyen parcalar birakilir ve sonuc eksik (degraded)
+    isaretlenir; hic veri toplanamadiysa DeadlineExceeded yukselir.
+    """
+    latitude = province_data.get('latitude')
+    longitude = province_data.get('longitude')
+    series_key = 'hourly' if hourly_bool else 'daily'
+
+    days = [start_dt + timedelta(days=offset) for offset in range((end_dt - start_dt).days + 1)]
+    with span('segments'):
+        cached_segments = await _weather_segment_cache.get_many([_segment_key(province, day, hourly_bool) for day in days])
+    missing_days = [day for day, segment in zip(days, cached_segments) if segment is None]
+
+    async def fetch_gap(gap_start, gap_end) -> Optional[dict]:
+        # Cok gunluk istegin tek gunluk boslugu da yalnizca bu ilin arsiv/upstream zincirinden doldurulur.
+        weather_data = await _fetch_weather_range(
+            province,
+            province_data,
+            gap_start,
+            gap_end,
+            hourly_bool,
+            deadline,
+            allow_snapshot=start_dt == end_dt,
+        )
+        series = weather_data.get(series_key) if isinstance(weather_data, dict) else None
+        if not isinstance(series, dict):
+            return None
+
+        complete_segments = {}
+        for day_text, segment in split_series_by_day(series).items():
+            if gap_start.isoformat() <= day_text <= gap_end.isoformat() and _is_complete_segment(segment, hourly_bool):
+                complete_segments[_segment_key(province, datetime.fromisoformat(day_text).date(), hourly_bool)] = segment
+        await _weather_segment_cache.set_many(complete_segments)
+        return series
+
+    # Uzun bosluklar yillik parcalara bolunur; parcalar sinirli eszamanlilikla paralel cekilir.
+    gap_ranges = [
+        chunk
+        for gap_start, gap_end in plan_fetch_ranges(missing_days, SEGMENT_BRIDGE_MAX_DAYS)
+        for chunk in split_by_year(gap_start, gap_end)
+    ]
+    if gap_ranges:
+        logger.debug('Weather %s %s..%s: fetching %s gap range(s)', province, start_dt, end_dt, len(gap_ranges))
+    chunk_sem = asyncio.Semaphore(HISTORY_FETCH_CONCURRENCY)
+
+    async def fetch_chunk(gap_start, gap_end) -> Optional[dict]:
+        async with chunk_sem:
+            try:
+                return await fetch_gap(gap_start, gap_end)
+            except DeadlineExceeded as exc:
+                if deadline is None:
+                    raise
+                logger.warning('Weather %s %s..%s dropped: %s', province, gap_start, gap_end, exc)
+                deadline.mark_degraded()
+                return None
+
+    with span('fetch'):
+        fetched_series = await asyncio.gather(*(fetch_chunk(gap_start, gap_end) for gap_start, gap_end in gap_ranges))
+    if gap_ranges and deadline is not None and deadline.degraded:
+        if not any(cached_segments) and not any(fetched_series):
+            raise DeadlineExceeded(f'{province} icin zaman butcesi icinde veri alinamadi')
+    weather_data = {
+        series_key: merge_series(*(segment for segment in cached_segments if segment is not None), *fetched_series),
+    }
+
+    with span('validate'):
         if hourly_bool and 'hourly' in weather_data:
             hourly_data = weather_data['hourly']
             data = WeatherData(
@@ -329,33 +496,374 @@ async def get_weather(
             timezone='Europe/Istanbul',
             data=data,
         )
-        payload_dict = payload.model_dump()
-        _weather_cache_put(cache_key, payload_dict)
-        return payload_dict
+    with span('serialize'):
+        return payload.model_dump()
+
+
+def _weather_cache_key(province: str, start_dt, end_dt, hourly_bool: bool) -> str:
+    return f'{province}|{start_dt.isoformat()}|{end_dt.isoformat()}|{hourly_bool}'
+
+
+async def _load_weather_entry(
+    province: str,
+    province_data: dict,
+    start_dt,
+    end_dt,
+    hourly_bool: bool,
+    deadline: Optional[Deadline] = None,
+) -> tuple[dict, float, bool]:
+    """Aralik payload'unu (payload, timestamp, degraded) olarak cache'ten al, yoksa tek bir build ile uret.
+
+    Zaman butcesi yuzunden eksik kalan payload cache'e yazilmaz. `degraded`
+    build'in sonucudur: ayni build'i bekleyen istekler kendi butceleri
+    dolmasa da eksik payload'u eksik olarak isaretler.
+    """
+    cache_key = _weather_cache_key(province, start_dt, end_dt, hourly_bool)
+    entry = await _weather_cache.get_entry(cache_key)
+    if entry is not None:
+        return entry[0], entry[1], False
+
+    async def build_payload():
+        payload_dict = await _fetch_weather_payload(province, province_data, start_dt, end_dt, hourly_bool, deadline)
+        if deadline is not None and deadline.degraded:
+            return payload_dict, time.time(), True
+        timestamp = await _weather_cache.set(cache_key, payload_dict)
+        return payload_dict, timestamp, False
+
+    return await _weather_flight.do(cache_key, build_payload)
+
+
+async def _stream_weather_chunks(
+    province: str,
+    province_data: dict,
+    start_dt,
+    end_dt,
+    hourly_bool: bool,
+    chunk_deadline_seconds: Optional[float] = None,
+) -> AsyncIterator[bytes]:
+    """Araligi yillik parcalar halinde NDJSON olarak akit.
+
+    Parcalar sirayla gonderilir; en fazla HISTORY_FETCH_CONCURRENCY parca
+    onceden cekilir, boylece bellekte ayni anda yalnizca birkac yil durur.
+    Her parca kendi cache anahtariyla saklanir. Zaman butcesi parca
+    basinadir, uzun araliklar bu yuzden butceden uzun surebilir; butcesini
+    asan parca `error`, eksik kalan parca `degraded: true` olarak gelir.
+    """
+    chunks = iter(split_by_year(start_dt, end_dt))
+    pending: deque = deque()
+
+    def schedule_next():
+        chunk = next(chunks, None)
+        if chunk is not None:
+            deadline = Deadline(chunk_deadline_seconds) if chunk_deadline_seconds is not None else None
+            task = asyncio.ensure_future(_load_weather_entry(province, province_data, chunk[0], chunk[1], hourly_bool, deadline))
+            pending.append((chunk, task))
+
+    yield _stream_line(
+        'meta',
+        {
+            'province': province_data.get('name'),
+            'plate_code': province,
+            'coordinates': {'latitude': province_data.get('latitude'), 'longitude': province_data.get('longitude')},
+            'timezone': 'Europe/Istanbul',
+            'start_date': start_dt.isoformat(),
+            'end_date': end_dt.isoformat(),
+            'hourly': hourly_bool,
+        },
+    )
+
+    for _ in range(HISTORY_FETCH_CONCURRENCY):
+        schedule_next()
+
+    series_key = 'hourly' if hourly_bool else 'daily'
+    sent_chunks = 0
+    degraded_chunks = 0
+    points = 0
+    failures = []
+    try:
+        while pending:
+            (chunk_start, chunk_end), task = pending.popleft()
+            try:
+                payload, _, degraded = await task
+            except Exception as exc:
+                detail = exc.detail if isinstance(exc, HTTPException) else str(exc)
+                logger.warning('Weather chunk %s %s..%s failed: %s', province, chunk_start, chunk_end, detail)
+                failures.append({'start_date': chunk_start.isoformat(), 'end_date': chunk_end.isoformat(), 'detail': detail})
+                schedule_next()
+                yield _stream_line('error', failures[-1])
+                continue
+
+            schedule_next()
+            data = payload.get('data') or {}
+            points += len((data.get(series_key) or {}).get('time') or [])
+            sent_chunks += 1
+            degraded_chunks += degraded
+            yield _stream_line(
+                'chunk',
+                {'start_date': chunk_start.isoformat(), 'end_date': chunk_end.isoformat(), 'degraded': degraded, 'data': data},
+            )
+    finally:
+        for _, task in pending:
+            task.cancel()
+
+    yield _stream_line('summary', {'chunks': sent_chunks, 'degraded': degraded_chunks, 'points': points, 'failures': failures})
+
+
+def _weather_view(
+    cache_key: str,
+    payload: dict,
+    built_at: float,
+    hourly_bool: bool,
+    resolution: Optional[str],
+    max_points: Optional[int],
+) -> dict:
+    """Payload'un toplanmis/seyreltilmis kopyasi; ayni kaynak payload icin bir kez hesaplanir."""
+    view_key = (cache_key, resolution, max_points)
+    entry = _weather_views.get_entry(view_key)
+    if entry is not None and entry[1] == built_at:
+        return entry[0]
+
+    series_key = 'hourly' if hourly_bool else 'daily'
+    data = payload.get('data') or {}
+    series = data.get(series_key) or {}
+    reduced = reduce_series(series, PRIMARY_SERIES_FIELDS[series_key], resolution, max_points)
+    view = {
+        **payload,
+        'data': {**data, series_key: reduced},
+        'downsampling': {
+            'resolution': resolution,
+            'max_points': max_points,
+            'source_points': len(series.get('time') or []),
+            'points': len(reduced.get('time') or []),
+        },
+    }
+    _weather_views.put(view_key, view, timestamp=built_at)
+    return view
+
+
+def _is_settled_weather_payload(payload: dict, start_dt, end_dt, hourly_bool: bool) -> bool:
+    """Aralik tamamen arsiv donemindeyse ve her gun eksiksizse veri artik degismez."""
+    if end_dt > archive_store.cutoff():
+        return False
+    series = (payload.get('data') or {}).get('hourly' if hourly_bool else 'daily') or {}
+    expected = ((end_dt - start_dt).days + 1) * (24 if hourly_bool else 1)
+    return len(series.get('time') or []) == expected
+
+
+def _cache_control_for_budget(degraded: bool, ttl_seconds: int, built_at: float, immutable: bool) -> str:
+    """Zaman butcesi yuzunden eksik kalan yanitlar istemcide de saklanmaz."""
+    if degraded:
+        return 'no-store'
+    return cache_control_for(ttl_seconds, built_at, immutable=immutable)
+
+
+@router.get('/weather')
+async def get_weather(
+    request: Request,
+    province: str = Query(..., min_length=1, description='Il plaka kodu'),
+    start_date: str = Query(..., pattern=r'^\d{4}-\d{2}-\d{2}$', description='Baslangic tarihi (YYYY-MM-DD)'),
+    end_date: Optional[str] = Query(None, pattern=r'^\d{4}-\d{2}-\d{2}$', description='Bitis tarihi (YYYY-MM-DD)'),
+    hourly: str = Query('true', description='Saatlik veri mi? (true/false)'),
+    max_points: Optional[int] = Query(None, ge=3, le=10000, description='Seri basina en fazla nokta (LTTB ile seyreltme)'),
+    resolution: Optional[str] = Query(None, pattern=r'^(hour|day|week|month)$', description='Toplama cozunurlugu'),
+):
+    """Secilen il icin hava durumu verisini dondurur.
+
+    Yanit ETag/Last-Modified tasir; kosullu isteklere 304 doner. Arsiv
+    donemine dusen eksiksiz araliklar `immutable` olarak isaretlenir.
+    `Accept: application/x-msgpack` veya `application/vnd.apache.arrow.stream`
+    ile ayni veri ikili kolonlar halinde doner. `Accept: application/x-ndjson`
+    ile uzun araliklar yillik parcalar halinde akitilir; akis seyreltme
+    parametreleriyle birlikte kullanilamaz.
+
+    `resolution` seriyi saat/gun/hafta/ay kovalarina toplar; `max_points`
+    ardindan seriyi sekil koruyan LTTB ile verilen nokta sayisina indirir.
+    """
+    try:
+        hourly_bool = hourly.lower().strip() in ('true', '1', 'yes')
+
+        province = province.strip()
+        if len(province) == 1:
+            province = f'0{province}'
+
+        province_data = geo_service.get_province_by_code(province)
+        if not province_data:
+            raise HTTPException(status_code=404, detail=f'Il bulunamadi: {province}')
+
+        try:
+            start_dt = datetime.strptime(start_date, '%Y-%m-%d').date()
+            end_dt = datetime.strptime(end_date or start_date, '%Y-%m-%d').date()
+            if end_dt < start_dt:
+                end_dt = start_dt
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=f'Tarih formati yanlis: {exc}') from exc
+
+        if STREAM_NDJSON_MEDIA_TYPE in request.headers.get('accept', ''):
+            if max_points or resolution:
+                raise HTTPException(status_code=400, detail='NDJSON akisi max_points/resolution ile birlikte kullanilamaz.')
+            return StreamingResponse(
+                _stream_weather_chunks(province, province_data, start_dt, end_dt, hourly_bool, settings.REQUEST_DEADLINE_SECONDS),
+                media_type=STREAM_NDJSON_MEDIA_TYPE,
+            )
+
+        cache_key = _weather_cache_key(province, start_dt, end_dt, hourly_bool)
+        deadline = Deadline(settings.REQUEST_DEADLINE_SECONDS)
+        with span('load'):
+            payload, built_at, degraded = await _load_weather_entry(province, province_data, start_dt, end_dt, hourly_bool, deadline)
+        immutable = not degraded and _is_settled_weather_payload(payload, start_dt, end_dt, hourly_bool)
+        if max_points or resolution:
+            with span('view'):
+                payload = _weather_view(cache_key, payload, built_at, hourly_bool, resolution, max_points)
+        with span('encode'):
+            encoded = _encoded_bodies.encode(
+                ('weather', cache_key, resolution, max_points),
+                payload,
+                built_at,
+                negotiate_media_type(request),
+                table_path=('data', 'hourly' if hourly_bool else 'daily'),
+            )
+        return conditional_response(
+            request,
+            encoded,
+            _cache_control_for_budget(degraded, WEATHER_CACHE_TTL_SECONDS, built_at, immutable),
+        )
     except HTTPException:
         raise
+    except DeadlineExceeded as exc:
+        raise HTTPException(status_code=504, detail=f'Hava durumu verisi zaman butcesi icinde alinamadi: {exc}') from exc
     except Exception as exc:
         raise HTTPException(status_code=500, detail=f'Hava durumu verisi alinamadi: {exc}') from exc
 
 
-async def _build_snapshot_hourly_payload(date: str):
+def _has_hourly_time(weather_data) -> bool:
+    if not isinstance(weather_data, dict):
+        return False
+    hourly_data = weather_data.get('hourly')
+    return isinstance(hourly_data, dict) and bool(hourly_data.get('time'))
+
+
+def _has_coordinates(province: dict) -> bool:
+    return (
+        province.get('latitude') is not None
+        and province.get('longitude') is not None
+        and bool(province.get('plate_code'))
+    )
+
+
+def _snapshot_province_entry(province: dict, hourly_data: dict) -> dict:
+    return {
+        'plate_code': str(province.get('plate_code')).zfill(2),
+        'name': province.get('name'),
+        'hourly': {
+            'time': hourly_data.get('time', []),
+            'temperature_2m': hourly_data.get('temperature_2m', []),
+            'apparent_temperature': hourly_data.get('apparent_temperature', []),
+            'precipitation': hourly_data.get('precipitation', []),
+            'relative_humidity_2m': hourly_data.get('relative_humidity_2m', []),
+            'wind_speed_10m': hourly_data.get('wind_speed_10m', []),
+            'wind_direction_10m': hourly_data.get('wind_direction_10m', []),
+            'pressure_msl': hourly_data.get('pressure_msl', []),
+            'visibility': hourly_data.get('visibility', []),
+            'cloud_cover': hourly_data.get('cloud_cover', []),
+            'weather_code': hourly_data.get('weather_code', []),
+        },
+    }
+
+
+def _record_fanout(fanout: str, started: float, available: int, total: int):
+    FANOUT_DURATION.observe(time.perf_counter() - started, fanout)
+    FANOUT_AVAILABLE.set(available, fanout)
+    FANOUT_COVERAGE.set(available / total if total else 0.0, fanout)
+
+
+async def _build_snapshot_hourly_payload(date: str, deadline: Optional[Deadline] = None):
+    """81 il icin gunun saatlik verisini arsiv deposu, toplu istekler ve il bazli fallback ile topla.
+
+    Zaman butcesi verilirse her asama kalan sureden pay alir; butce bittiginde
+    sonraki asamalar atlanir ve yetismeyen iller sonuca girmez.
+    """
+    started = time.perf_counter()
     provinces = geo_service.get_all_provinces()
-    sem = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    located = [province for province in provinces if _has_coordinates(province)]
+    coordinates = [(province['latitude'], province['longitude']) for province in located]
     today = datetime.now().date()
     target_date = datetime.strptime(date, '%Y-%m-%d').date()
 
+    # Once kalici arsiv deposu okunur; eksik iller coklu konum istegiyle
+    # alinir, yalnizca onlardan da eksik kalanlar il bazli fallback zincirine duser.
+    plate_codes = [str(province['plate_code']).zfill(2) for province in located]
+    stored = await archive_store.read_day_many(plate_codes, target_date)
+    resolved: list[Optional[dict]] = [stored.get(plate_code) for plate_code in plate_codes]
+    FALLBACK_PATHS.inc('snapshot', 'archive_store', amount=len(stored))
+
+    # Devresi acik uclarin toplu asamasi atlanir; il bazli zincirde de bu uclar aninda reddedilir.
+    def has_budget() -> bool:
+        if deadline is None or not deadline.expired:
+            return True
+        deadline.mark_degraded()
+        return False
+
+    missing = [index for index, hourly_data in enumerate(resolved) if hourly_data is None]
+    if missing and open_meteo.is_available(ARCHIVE_ENDPOINT) and has_budget():
+        archive_results = await open_meteo.get_historical_weather_batch(
+            [coordinates[index] for index in missing],
+            start_date=date,
+            end_date=date,
+            hourly=True,
+            timeout=SNAPSHOT_BATCH_TIMEOUT_SECONDS,
+            retries=0,
+            deadline=deadline,
+        )
+        fetched = []
+        for index, weather_data in zip(missing, archive_results):
+            if _has_hourly_time(weather_data):
+                resolved[index] = weather_data['hourly']
+                fetched.append((plate_codes[index], weather_data['hourly']))
+        FALLBACK_PATHS.inc('snapshot', 'archive_batch', amount=len(fetched))
+        await archive_store.write_many(fetched, hourly=True)
+
+    missing = [index for index, hourly_data in enumerate(resolved) if hourly_data is None]
+    if missing and open_meteo.is_available(FORECAST_ENDPOINT) and has_budget():
+        recent_results = await open_meteo.get_recent_weather_batch(
+            [coordinates[index] for index in missing],
+            start_date=date,
+            end_date=date,
+            hourly=True,
+            timeout=SNAPSHOT_BATCH_TIMEOUT_SECONDS,
+            retries=0,
+            deadline=deadline,
+        )
+        recent_count = 0
+        for index, weather_data in zip(missing, recent_results):
+            if _has_hourly_time(weather_data):
+                resolved[index] = weather_data['hourly']
+                recent_count += 1
+        FALLBACK_PATHS.inc('snapshot', 'forecast_batch', amount=recent_count)
+
     async def fetch_one(province):
         lat = province.get('latitude')
         lon = province.get('longitude')
         plate_code = province.get('plate_code')
         name = province.get('name')
 
-        if lat is None or lon is None or not plate_code:
-            return None
-
-        async with sem:
+        try:
+            weather_data = await open_meteo.get_historical_weather(
+                latitude=lat,
+                longitude=lon,
+                start_date=date,
+                end_date=date,
+                hourly=True,
+                timeout=SNAPSHOT_FETCH_TIMEOUT_SECONDS,
+                retries=0,
+                deadline=deadline,
+                priority=BULK,
+            )
+            hourly_data = weather_data.get('hourly', {})
+            if not hourly_data.get('time'):
+                raise RuntimeError('hourly data is empty')
+        except Exception as exc:
             try:
-                weather_data = await open_meteo.get_historical_weather(
+                weather_data = await open_meteo.get_recent_weather(
                     latitude=lat,
                     longitude=lon,
                     start_date=date,
@@ -363,247 +871,610 @@ async def _build_snapshot_hourly_payload(date: str):
                     hourly=True,
                     timeout=SNAPSHOT_FETCH_TIMEOUT_SECONDS,
                     retries=0,
+                    deadline=deadline,
+                    priority=BULK,
                 )
                 hourly_data = weather_data.get('hourly', {})
                 if not hourly_data.get('time'):
-                    raise RuntimeError('hourly data is empty')
-            except Exception as exc:
+                    raise RuntimeError('recent hourly data is empty')
+            except Exception as recent_exc:
+                logger.warning('Snapshot hourly fallback failed for %s (%s): %s', name, plate_code, recent_exc)
+
+                if target_date != today:
+                    return None
+
                 try:
-                    weather_data = await open_meteo.get_recent_weather(
+                    current_data = await open_meteo.get_current_weather(
                         latitude=lat,
                         longitude=lon,
-                        start_date=date,
-                        end_date=date,
-                        hourly=True,
-                        timeout=SNAPSHOT_FETCH_TIMEOUT_SECONDS,
+                        timeout=SNAPSHOT_CURRENT_TIMEOUT_SECONDS,
                         retries=0,
+                        deadline=deadline,
+                        priority=BULK,
                     )
-                    hourly_data = weather_data.get('hourly', {})
-                    if not hourly_data.get('time'):
-                        raise RuntimeError('recent hourly data is empty')
-                except Exception as recent_exc:
-                    logger.warning('Snapshot hourly fallback failed for %s (%s): %s', name, plate_code, recent_exc)
-
-                    if target_date != today:
-                        return None
-
-                    try:
-                        current_data = await open_meteo.get_current_weather(
-                            latitude=lat,
-                            longitude=lon,
-                            timeout=SNAPSHOT_CURRENT_TIMEOUT_SECONDS,
-                            retries=0,
-                        )
-                        current = current_data.get('current', {})
-                        current_time = current.get('time', f'{date}T00:00')
-                        hourly_data = {
-                            'time': [current_time],
-                            'temperature_2m': [float(current.get('temperature_2m', 0))],
-                            'apparent_temperature': [float(current.get('apparent_temperature', current.get('temperature_2m', 0)))],
-                            'precipitation': [float(current.get('precipitation', 0))],
-                            'wind_speed_10m': [float(current.get('wind_speed_10m', 0))],
-                            'wind_direction_10m': [float(current.get('wind_direction_10m', 0))],
-                            'relative_humidity_2m': [int(current.get('relative_humidity_2m', 0))],
-                            'pressure_msl': [float(current.get('pressure_msl', 0))],
-                            'visibility': [float(current.get('visibility', 0))],
-                            'cloud_cover': [int(current.get('cloud_cover', 0))],
-                            'weather_code': [int(current.get('weather_code', 0))],
-                        }
-                    except Exception as current_exc:
-                        logger.error('Snapshot fallback failed for %s (%s): %s', name, plate_code, current_exc)
-                        return None
+                    current = current_data.get('current', {})
+                    current_time = current.get('time', f'{date}T00:00')
+                    hourly_data = {
+                        'time': [current_time],
+                        'temperature_2m': [float(current.get('temperature_2m', 0))],
+                        'apparent_temperature': [float(current.get('apparent_temperature', current.get('temperature_2m', 0)))],
+                        'precipitation': [float(current.get('precipitation', 0))],
+                        'wind_speed_10m': [float(current.get('wind_speed_10m', 0))],
+                        'wind_direction_10m': [float(current.get('wind_direction_10m', 0))],
+                        'relative_humidity_2m': [int(current.get('relative_humidity_2m', 0))],
+                        'pressure_msl': [float(current.get('pressure_msl', 0))],
+                        'visibility': [float(current.get('visibility', 0))],
+                        'cloud_cover': [int(current.get('cloud_cover', 0))],
+                        'weather_code': [int(current.get('weather_code', 0))],
+                    }
+                except Exception as current_exc:
+                    logger.error('Snapshot fallback failed for %s (%s): %s', name, plate_code, current_exc)
+                    return None
 
-            return {
-                'plate_code': str(plate_code).zfill(2),
-                'name': name,
-                'hourly': {
-                    'time': hourly_data.get('time', []),
-                    'temperature_2m': hourly_data.get('temperature_2m', []),
-                    'apparent_temperature': hourly_data.get('apparent_temperature', []),
-                    'precipitation': hourly_data.get('precipitation', []),
-                    'relative_humidity_2m': hourly_data.get('relative_humidity_2m', []),
-                    'wind_speed_10m': hourly_data.get('wind_speed_10m', []),
-                    'wind_direction_10m': hourly_data.get('wind_direction_10m', []),
-                    'pressure_msl': hourly_data.get('pressure_msl', []),
-                    'visibility': hourly_data.get('visibility', []),
-                    'cloud_cover': hourly_data.get('cloud_cover', []),
-                    'weather_code': hourly_data.get('weather_code', []),
-                },
-            }
+        return hourly_data
 
-    tasks = [fetch_one(province) for province in provinces]
-    results = await asyncio.gather(*tasks)
+    missing = [index for index, hourly_data in enumerate(resolved) if hourly_data is None]
+    if missing and has_budget():
+        logger.info('Snapshot batch missed %s provinces for %s, using per-province fallback.', len(missing), date)
+        if deadline is None:
+            fallback_results = await asyncio.gather(*(fetch_one(located[index]) for index in missing))
+        else:
+            # Butceye yetismeyen iller beklenmez; iptal edilip sonuctan dusulur.
+            fallback_results = await deadline.wait([asyncio.ensure_future(fetch_one(located[index])) for index in missing])
+        for index, hourly_data in zip(missing, fallback_results):
+            resolved[index] = hourly_data
+        FALLBACK_PATHS.inc('snapshot', 'province_fallback', amount=sum(result is not None for result in fallback_results))
+
+    entries = [
+        _snapshot_province_entry(province, hourly_data)
+        for province, hourly_data in zip(located, resolved)
+        if hourly_data is not None
+    ]
+    FALLBACK_PATHS.inc('snapshot', 'missing', amount=len(provinces) - len(entries))
+    _record_fanout('snapshot', started, len(entries), len(provinces))
     return {
-        'provinces': [item for item in results if item is not None],
+        'provinces': entries,
         'total': len(provinces),
     }
 
 
+async def _build_snapshot_payload(date: str, time_value: str, target_hour: float, deadline: Optional[Deadline] = None) -> dict:
+    """Saatlik snapshot kupunden istenen saate en yakin degerleri secer."""
+    cube = await _load_snapshot_cube(date, deadline)
+    with span('select'):
+        snapshot_data = cube.select(target_hour)
+
+    payload = {
+        'requested_date': date,
+        'requested_time': time_value,
+        'timestamp': datetime.utcnow().isoformat(),
+        'coverage': {
+            'available': len(snapshot_data),
+            'total': cube.total,
+        },
+        'provinces': snapshot_data,
+    }
+    return payload
+
+
 @router.get('/weather/snapshot')
 async def get_weather_snapshot(
+    request: Request,
     date: str = Query(..., pattern=r'^\d{4}-\d{2}-\d{2}$', description='Tarih (YYYY-MM-DD)'),
     time_value: str = Query(..., alias='time', pattern=r'^\d{2}:\d{2}$', description='Saat (HH:MM)'),
 ):
     """81 il icin secilen tarih-saat anina en yakin saatlik snapshot verisini dondurur."""
     try:
-        target_date = datetime.strptime(date, '%Y-%m-%d').date()
+        try:
+            target_date = datetime.strptime(date, '%Y-%m-%d').date()
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=f'Tarih formati yanlis: {exc}') from exc
+
+        today = datetime.now().date()
+        if target_date > today:
+            raise HTTPException(status_code=400, detail='Gelecek tarih secilemez.')
+
+        target_hour = _parse_time_fraction(time_value)
+
+        cache_key = f'{date}|{time_value}'
+        deadline = Deadline(settings.REQUEST_DEADLINE_SECONDS)
+        with span('cache'):
+            entry = await _snapshot_cache.get_entry(cache_key)
+        if entry is None:
+            with span('build'):
+                payload = await _build_snapshot_payload(date, time_value, target_hour, deadline)
+            if deadline.degraded:
+                entry = payload, time.time()
+            else:
+                entry = payload, await _snapshot_cache.set(cache_key, payload)
+
+        payload, built_at = entry
+        coverage = payload.get('coverage') or {}
+        immutable = target_date <= archive_store.cutoff() and coverage.get('available') == coverage.get('total')
+        with span('encode'):
+            encoded = _encoded_bodies.encode(('snapshot', cache_key), payload, built_at, negotiate_media_type(request), table_path=('provinces',))
+        return conditional_response(
+            request,
+            encoded,
+            _cache_control_for_budget(deadline.degraded, SNAPSHOT_CACHE_TTL_SECONDS, built_at, immutable),
+        )
+    except HTTPException:
+        raise
+    except DeadlineExceeded as exc:
+        raise HTTPException(status_code=504, detail=f'Snapshot verisi zaman butcesi icinde alinamadi: {exc}') from exc
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f'Snapshot verisi alinamadi: {exc}') from exc
+
+
+@router.get('/weather/snapshot/day')
+async def get_weather_snapshot_day(
+    request: Request,
+    date: str = Query(..., pattern=r'^\d{4}-\d{2}-\d{2}$', description='Tarih (YYYY-MM-DD)'),
+):
+    """81 ilin gun boyu saatlik verisini tek yanitta kolon bazli dondurur (zaman kaydirici icin)."""
+    try:
+        try:
+            target_date = datetime.strptime(date, '%Y-%m-%d').date()
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=f'Tarih formati yanlis: {exc}') from exc
+
+        if target_date > datetime.now().date():
+            raise HTTPException(status_code=400, detail='Gelecek tarih secilemez.')
+
+        deadline = Deadline(settings.REQUEST_DEADLINE_SECONDS)
+        cube = await _load_snapshot_cube(date, deadline)
+        cache_key = ('snapshot_day', date)
+        media_type = negotiate_media_type(request, arrow=False)
+        encoded = _encoded_bodies.lookup(cache_key, cube.built_at, media_type)
+        if encoded is None:
+            encoded = _encoded_bodies.encode(cache_key, cube.day_columns(), cube.built_at, media_type)
+
+        immutable = target_date <= archive_store.cutoff() and cube.is_complete()
+        return conditional_response(
+            request,
+            encoded,
+            _cache_control_for_budget(deadline.degraded, SNAPSHOT_HOURLY_CACHE_TTL_SECONDS, cube.built_at, immutable),
+        )
+    except HTTPException:
+        raise
+    except DeadlineExceeded as exc:
+        raise HTTPException(status_code=504, detail=f'Snapshot verisi zaman butcesi icinde alinamadi: {exc}') from exc
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f'Snapshot verisi alinamadi: {exc}') from exc
+
+
+async def _load_national_day(date: str, deadline: Optional[Deadline] = None) -> tuple[dict, SnapshotCube]:
+    """Bir gunun ulusal istatistikleri; gunun snapshot kupu degismedikce yeniden hesaplanmaz."""
+    cube = await _load_snapshot_cube(date, deadline)
+    entry = _national_days.get_entry(date)
+    if entry is not None and entry[1] == cube.built_at:
+        return entry[0], cube
+
+    regions = {province.get('plate_code'): province.get('region') for province in geo_service.get_all_provinces()}
+    stats = national_day_stats(cube, regions)
+    _national_days.put(date, stats, timestamp=cube.built_at)
+    return stats, cube
+
+
+@router.get('/weather/national')
+async def get_weather_national(
+    request: Request,
+    date: str = Query(..., pattern=r'^\d{4}-\d{2}-\d{2}$', description='Tarih (YYYY-MM-DD)'),
+    end_date: Optional[str] = Query(None, pattern=r'^\d{4}-\d{2}-\d{2}$', description='Bitis tarihi (YYYY-MM-DD)'),
+):
+    """Turkiye geneli saatlik ve gunluk ortalama, min/max, yuzdelik ve bolge ortalamalarini dondurur."""
+    try:
+        try:
+            start_dt = datetime.strptime(date, '%Y-%m-%d').date()
+            end_dt = datetime.strptime(end_date or date, '%Y-%m-%d').date()
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=f'Tarih formati yanlis: {exc}') from exc
+
+        if end_dt < start_dt:
+            end_dt = start_dt
+        if end_dt > datetime.now().date():
+            raise HTTPException(status_code=400, detail='Gelecek tarih secilemez.')
+        if (end_dt - start_dt).days + 1 > NATIONAL_MAX_DAYS:
+            raise HTTPException(status_code=400, detail=f'En fazla {NATIONAL_MAX_DAYS} gunluk aralik secilebilir.')
+
+        deadline = Deadline(settings.REQUEST_DEADLINE_SECONDS)
+        days = [(start_dt + timedelta(days=offset)).isoformat() for offset in range((end_dt - start_dt).days + 1)]
+        sem = asyncio.Semaphore(HISTORY_FETCH_CONCURRENCY)
+
+        async def load_day(day: str):
+            async with sem:
+                return await _load_national_day(day, deadline)
+
+        results = await asyncio.gather(*(load_day(day) for day in days))
+        built_at = max(cube.built_at for _, cube in results)
+        payload = {
+            'start_date': start_dt.isoformat(),
+            'end_date': end_dt.isoformat(),
+            **concat_columns([stats for stats, _ in results]),
+        }
+        immutable = end_dt <= archive_store.cutoff() and all(cube.is_complete() for _, cube in results)
+        return conditional_response(
+            request,
+            _encoded_bodies.encode(('national', start_dt.isoformat(), end_dt.isoformat()), payload, built_at, negotiate_media_type(request, arrow=False)),
+            _cache_control_for_budget(
+                deadline.degraded,
+                SNAPSHOT_HOURLY_CACHE_TTL_SECONDS,
+                min(cube.built_at for _, cube in results),
+                immutable,
+            ),
+        )
+    except HTTPException:
+        raise
+    except DeadlineExceeded as exc:
+        raise HTTPException(status_code=504, detail=f'Ulusal istatistikler zaman butcesi icinde alinamadi: {exc}') from exc
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f'Ulusal istatistikler alinamadi: {exc}') from exc
+
+
+@router.get('/weather/anomaly')
+async def get_weather_anomaly(
+    request: Request,
+    province: str = Query(..., min_length=1, description='Il plaka kodu'),
+    date: str = Query(..., pattern=r'^\d{4}-\d{2}-\d{2}$', description='Tarih (YYYY-MM-DD)'),
+    end_date: Optional[str] = Query(None, pattern=r'^\d{4}-\d{2}-\d{2}$', description='Bitis tarihi (YYYY-MM-DD)'),
+):
+    """Gunluk sicaklik ve yagisin iklim normallerinden sapmasini dondurur.
+
+    Normaller on hesaplanmis tablodan okunur (bkz. /api/climate/normals),
+    il henuz hazir degilse 503 doner; gunluk degerler /weather ile ayni
+    cache'ten okunur.
+    """
+    province = province.strip()
+    if len(province) == 1:
+        province = f'0{province}'
+    province_data = geo_service.get_province_by_code(province)
+    if not province_data:
+        raise HTTPException(status_code=404, detail=f'Il bulunamadi: {province}')
+
+    try:
+        start_dt = datetime.strptime(date, '%Y-%m-%d').date()
+        end_dt = datetime.strptime(end_date or date, '%Y-%m-%d').date()
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=f'Tarih formati yanlis: {exc}') from exc
 
-    today = datetime.now().date()
-    if target_date > today:
+    if end_dt < start_dt:
+        end_dt = start_dt
+    if end_dt > datetime.now().date():
         raise HTTPException(status_code=400, detail='Gelecek tarih secilemez.')
+    if (end_dt - start_dt).days + 1 > ANOMALY_MAX_DAYS:
+        raise HTTPException(status_code=400, detail=f'En fazla {ANOMALY_MAX_DAYS} gunluk aralik secilebilir.')
 
-    target_hour = _parse_time_fraction(time_value)
+    try:
+        normals = await climatology.require(province)
+    except NormalsNotReady as exc:
+        raise HTTPException(status_code=503, detail=str(exc), headers={'Retry-After': str(exc.retry_after)}) from exc
 
-    now = time.time()
-    cache_key = f'{date}|{time_value}'
-    if (
-        _snapshot_cache['payload']
-        and _snapshot_cache['key'] == cache_key
-        and (now - _snapshot_cache['timestamp']) < SNAPSHOT_CACHE_TTL_SECONDS
-    ):
-        return _snapshot_cache['payload']
+    try:
+        payload, built_at, _ = await _load_weather_entry(province, province_data, start_dt, end_dt, False)
+    except Exception as exc:
+        raise HTTPException(status_code=500, detail=f'Hava durumu verisi alinamadi: {exc}') from exc
 
-    hourly_payload = _snapshot_cache_get(date)
-    if hourly_payload is None:
-        hourly_payload = await _build_snapshot_hourly_payload(date)
-        _snapshot_cache_put(date, hourly_payload)
+    daily = (payload.get('data') or {}).get('daily') or {}
+    body = {
+        'province': province_data.get('name'),
+        'plate_code': province,
+        'start_date': start_dt.isoformat(),
+        'end_date': end_dt.isoformat(),
+        'reference': {'start_year': normals.reference[0], 'end_year': normals.reference[1]},
+        'daily': anomaly_series(daily, normals),
+    }
+    timestamp = max(built_at, normals.built_at)
+    immutable = _is_settled_weather_payload(payload, start_dt, end_dt, False)
+    return conditional_response(
+        request,
+        _encoded_bodies.encode(
+            ('anomaly', province, start_dt.isoformat(), end_dt.isoformat(), normals.reference),
+            body,
+            timestamp,
+            negotiate_media_type(request, arrow=False),
+        ),
+        cache_control_for(WEATHER_CACHE_TTL_SECONDS, built_at, immutable=immutable),
+    )
+
+
+def _current_province_entry(province: dict, current: dict) -> dict:
+    return {
+        'plate_code': province.get('plate_code'),
+        'name': province.get('name'),
+        'temperature': current.get('temperature_2m', 0),
+        'apparent_temperature': current.get('apparent_temperature', current.get('temperature_2m', 0)),
+        'precipitation': current.get('precipitation', 0),
+        'humidity': current.get('relative_humidity_2m', 0),
+        'wind_speed': current.get('wind_speed_10m', 0),
+        'wind_direction_10m': current.get('wind_direction_10m', 0),
+        'pressure_msl': current.get('pressure_msl', 0),
+        'visibility': current.get('visibility', 0),
+        'cloud_cover': current.get('cloud_cover', 0),
+        'weather_code': current.get('weather_code', 0),
+        'icon': f"code_{current.get('weather_code', 0)}",
+    }
 
-    snapshot_data = []
-    for item in hourly_payload.get('provinces', []):
-        hourly_data = item.get('hourly', {})
-        hourly_times = hourly_data.get('time', [])
-        if not hourly_times:
-            continue
 
-        index = _resolve_best_hour_index(hourly_times, target_hour)
-        temperature = _safe_value(hourly_data.get('temperature_2m', []), index, None)
-        if temperature is None:
-            continue
+def _located_provinces() -> list[dict]:
+    located = []
+    for province in geo_service.get_all_provinces():
+        if _has_coordinates(province):
+            located.append(province)
+        else:
+            logger.warning(
+                'Skipping province without coordinates: %s (%s)',
+                province.get('name'),
+                province.get('plate_code'),
+            )
+    return located
+
+
+async def _fetch_current_fallback(province: dict, today: str, priority: int = BULK) -> Optional[dict]:
+    """Toplu istekte eksik kalan il icin tekil anlik istek, o da olmazsa son saatlik deger."""
+    lat = province.get('latitude')
+    lon = province.get('longitude')
+    plate_code = province.get('plate_code')
+    name = province.get('name')
+
+    try:
+        result = await open_meteo.get_current_weather(latitude=lat, longitude=lon, priority=priority)
+        return _current_province_entry(province, result.get('current', {}))
+    except Exception as current_exc:
+        logger.warning('Current weather failed for %s (%s): %s', name, plate_code, current_exc)
+
+        try:
+            fallback = await open_meteo.get_recent_weather(
+                latitude=lat,
+                longitude=lon,
+                start_date=today,
+                end_date=today,
+                hourly=True,
+                priority=priority,
+            )
+            hourly_data = fallback.get('hourly', {})
+            temps = hourly_data.get('temperature_2m', [])
+            idx = len(temps) - 1 if temps else 0
 
-        snapshot_data.append(
-            {
-                'plate_code': item.get('plate_code'),
-                'name': item.get('name'),
-                'temperature': float(temperature),
-                'apparent_temperature': float(_safe_value(hourly_data.get('apparent_temperature', []), index, temperature) or temperature),
-                'precipitation': float(_safe_value(hourly_data.get('precipitation', []), index, 0.0) or 0.0),
-                'humidity': int(_safe_value(hourly_data.get('relative_humidity_2m', []), index, 0) or 0),
-                'wind_speed': float(_safe_value(hourly_data.get('wind_speed_10m', []), index, 0.0) or 0.0),
-                'wind_direction_10m': float(_safe_value(hourly_data.get('wind_direction_10m', []), index, 0.0) or 0.0),
-                'pressure_msl': float(_safe_value(hourly_data.get('pressure_msl', []), index, 0.0) or 0.0),
-                'visibility': float(_safe_value(hourly_data.get('visibility', []), index, 0.0) or 0.0),
-                'cloud_cover': int(_safe_value(hourly_data.get('cloud_cover', []), index, 0) or 0),
-                'weather_code': int(_safe_value(hourly_data.get('weather_code', []), index, 0) or 0),
-                'icon': f"code_{int(_safe_value(hourly_data.get('weather_code', []), index, 0) or 0)}",
-                'resolved_time': _safe_value(hourly_times, index, f'{date}T00:00'),
+            return {
+                'plate_code': plate_code,
+                'name': name,
+                'temperature': float(_safe_value(temps, idx, 0.0) or 0.0),
+                'apparent_temperature': float(_safe_value(hourly_data.get('apparent_temperature', []), idx, _safe_value(temps, idx, 0.0) or 0.0) or 0.0),
+                'precipitation': float(_safe_value(hourly_data.get('precipitation', []), idx, 0.0) or 0.0),
+                'humidity': int(_safe_value(hourly_data.get('relative_humidity_2m', []), idx, 0) or 0),
+                'wind_speed': float(_safe_value(hourly_data.get('wind_speed_10m', []), idx, 0.0) or 0.0),
+                'wind_direction_10m': float(_safe_value(hourly_data.get('wind_direction_10m', []), idx, 0.0) or 0.0),
+                'pressure_msl': float(_safe_value(hourly_data.get('pressure_msl', []), idx, 0.0) or 0.0),
+                'visibility': float(_safe_value(hourly_data.get('visibility', []), idx, 0.0) or 0.0),
+                'cloud_cover': int(_safe_value(hourly_data.get('cloud_cover', []), idx, 0) or 0),
+                'weather_code': int(_safe_value(hourly_data.get('weather_code', []), idx, 0) or 0),
+                'icon': f"code_{int(_safe_value(hourly_data.get('weather_code', []), idx, 0) or 0)}",
             }
-        )
+        except Exception as fallback_exc:
+            logger.error('Fallback weather failed for %s (%s): %s', name, plate_code, fallback_exc)
+            return None
 
-    payload = {
-        'requested_date': date,
-        'requested_time': time_value,
+
+async def _iter_current_entries(located: list[dict], priority: int = BULK) -> AsyncIterator[tuple[int, Optional[dict]]]:
+    """Illerin anlik verisini cozuldukce (indeks, kayit) olarak uret; basarisiz iller icin kayit None.
+
+    Once tek bir toplu istek yapilir; eksik kalan iller tekil isteklerle
+    tamamlanir ve bitis sirasina gore uretilir.
+    """
+    batch_results = await open_meteo.get_current_weather_batch(
+        [(province['latitude'], province['longitude']) for province in located],
+        retries=1,
+        priority=priority,
+    )
+    missing = []
+    for index, result in enumerate(batch_results):
+        current = result.get('current') if isinstance(result, dict) else None
+        if isinstance(current, dict):
+            yield index, _current_province_entry(located[index], current)
+        else:
+            missing.append(index)
+    FALLBACK_PATHS.inc('current', 'batch', amount=len(located) - len(missing))
+
+    if not missing:
+        return
+
+    logger.info('Current weather batch missed %s provinces, using per-province fallback.', len(missing))
+    today = datetime.now().strftime('%Y-%m-%d')
+
+    async def fetch_one(index):
+        return index, await _fetch_current_fallback(located[index], today, priority)
+
+    tasks = [asyncio.ensure_future(fetch_one(index)) for index in missing]
+    try:
+        for next_result in asyncio.as_completed(tasks):
+            index, item = await next_result
+            FALLBACK_PATHS.inc('current', 'province_fallback' if item is not None else 'missing')
+            yield index, item
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def _current_payload(entries: list[Optional[dict]]) -> dict:
+    return {
         'timestamp': datetime.utcnow().isoformat(),
-        'coverage': {
-            'available': len(snapshot_data),
-            'total': hourly_payload.get('total', 81),
-        },
-        'provinces': snapshot_data,
+        'provinces': [item for item in entries if item is not None],
     }
 
-    _snapshot_cache['timestamp'] = now
-    _snapshot_cache['key'] = cache_key
-    _snapshot_cache['payload'] = payload
 
-    return payload
+class _CurrentFanout:
+    """81 il icin tek bir anlik veri fan-out'u; ayni build'i bekleyenler buna abone olur.
 
+    Kayitlar cozuldukce biriktirilir: sonradan katilan abone once birikmis
+    kayitlari, sonra yenilerini alir. Fan-out istemcilerden bagimsiz bir
+    task olarak calisir; bitince payload cache'e yazilir ve refresher'a
+    verilir.
+    """
 
-@router.get('/weather/current')
-async def get_current_weather():
-    """Tum iller icin anlik hava durumunu dondurur."""
-    try:
-        now = time.time()
-        if _current_cache['payload'] and (now - _current_cache['timestamp']) < CURRENT_CACHE_TTL_SECONDS:
-            return _current_cache['payload']
-
-        provinces = geo_service.get_all_provinces()
-        sem = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
-        today = datetime.now().strftime('%Y-%m-%d')
-
-        async def fetch_one(province):
-            lat = province.get('latitude')
-            lon = province.get('longitude')
-            plate_code = province.get('plate_code')
-            name = province.get('name')
-
-            if lat is None or lon is None or not plate_code:
-                logger.warning('Skipping province without coordinates: %s (%s)', name, plate_code)
-                return None
+    def __init__(self, located: list[dict], priority: int):
+        self.located = located
+        self.entries: list[tuple[int, Optional[dict]]] = []
+        self._changed = asyncio.Event()
+        self._task = asyncio.ensure_future(self._run(priority))
+        self._task.add_done_callback(self._finish)
 
-            async with sem:
-                try:
-                    result = await open_meteo.get_current_weather(latitude=lat, longitude=lon)
-                    current = result.get('current', {})
-                    return {
-                        'plate_code': plate_code,
-                        'name': name,
-                        'temperature': current.get('temperature_2m', 0),
-                        'apparent_temperature': current.get('apparent_temperature', current.get('temperature_2m', 0)),
-                        'precipitation': current.get('precipitation', 0),
-                        'humidity': current.get('relative_humidity_2m', 0),
-                        'wind_speed': current.get('wind_speed_10m', 0),
-                        'wind_direction_10m': current.get('wind_direction_10m', 0),
-                        'pressure_msl': current.get('pressure_msl', 0),
-                        'visibility': current.get('visibility', 0),
-                        'cloud_cover': current.get('cloud_cover', 0),
-                        'weather_code': current.get('weather_code', 0),
-                        'icon': f"code_{current.get('weather_code', 0)}",
-                    }
-                except Exception as current_exc:
-                    logger.warning('Current weather failed for %s (%s): %s', name, plate_code, current_exc)
-
-                    try:
-                        fallback = await open_meteo.get_recent_weather(
-                            latitude=lat,
-                            longitude=lon,
-                            start_date=today,
-                            end_date=today,
-                            hourly=True,
-                        )
-                        hourly_data = fallback.get('hourly', {})
-                        temps = hourly_data.get('temperature_2m', [])
-                        idx = len(temps) - 1 if temps else 0
-
-                        return {
-                            'plate_code': plate_code,
-                            'name': name,
-                            'temperature': float(_safe_value(temps, idx, 0.0) or 0.0),
-                            'apparent_temperature': float(_safe_value(hourly_data.get('apparent_temperature', []), idx, _safe_value(temps, idx, 0.0) or 0.0) or 0.0),
-                            'precipitation': float(_safe_value(hourly_data.get('precipitation', []), idx, 0.0) or 0.0),
-                            'humidity': int(_safe_value(hourly_data.get('relative_humidity_2m', []), idx, 0) or 0),
-                            'wind_speed': float(_safe_value(hourly_data.get('wind_speed_10m', []), idx, 0.0) or 0.0),
-                            'wind_direction_10m': float(_safe_value(hourly_data.get('wind_direction_10m', []), idx, 0.0) or 0.0),
-                            'pressure_msl': float(_safe_value(hourly_data.get('pressure_msl', []), idx, 0.0) or 0.0),
-                            'visibility': float(_safe_value(hourly_data.get('visibility', []), idx, 0.0) or 0.0),
-                            'cloud_cover': int(_safe_value(hourly_data.get('cloud_cover', []), idx, 0) or 0),
-                            'weather_code': int(_safe_value(hourly_data.get('weather_code', []), idx, 0) or 0),
-                            'icon': f"code_{int(_safe_value(hourly_data.get('weather_code', []), idx, 0) or 0)}",
-                        }
-                    except Exception as fallback_exc:
-                        logger.error('Fallback weather failed for %s (%s): %s', name, plate_code, fallback_exc)
-                        return None
+    @property
+    def done(self) -> bool:
+        return self._task.done()
 
-        tasks = [fetch_one(province) for province in provinces]
-        results = await asyncio.gather(*tasks)
-        current_weathers = [item for item in results if item is not None]
+    async def _run(self, priority: int) -> tuple[dict, float]:
+        started = time.perf_counter()
+        async for index, item in _iter_current_entries(self.located, priority):
+            self.entries.append((index, item))
+            self._notify()
 
-        payload = {
-            'timestamp': datetime.utcnow().isoformat(),
-            'provinces': current_weathers,
-        }
-        _current_cache['timestamp'] = now
-        _current_cache['payload'] = payload
-        return payload
+        results: list[Optional[dict]] = [None] * len(self.located)
+        for index, item in self.entries:
+            results[index] = item
+        payload = _current_payload(results)
+        _record_fanout('current', started, len(payload['provinces']), len(self.located))
+        built_at = await _current_cache.set(CURRENT_CACHE_KEY, payload)
+        current_refresher.publish(payload, built_at)
+        return payload, built_at
+
+    def _notify(self):
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    def _finish(self, task: asyncio.Task):
+        self._notify()
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug('Current fan-out failed: %s', task.exception())
+
+    async def subscribe(self) -> AsyncIterator[tuple[int, Optional[dict]]]:
+        """Kayitlari bastan itibaren, fan-out bitene kadar uret."""
+        position = 0
+        while True:
+            while position < len(self.entries):
+                yield self.entries[position]
+                position += 1
+            if self.done:
+                return
+            await self._changed.wait()
+
+    async def result(self) -> tuple[dict, float]:
+        return await asyncio.shield(self._task)
+
+
+_current_fanout: Optional[_CurrentFanout] = None
+
+
+def _join_current_fanout(priority: int = BULK) -> _CurrentFanout:
+    """Suren anlik veri fan-out'una katil; yoksa yenisini baslat."""
+    global _current_fanout
+    if _current_fanout is None or _current_fanout.done:
+        _current_fanout = _CurrentFanout(_located_provinces(), priority)
+    return _current_fanout
+
+
+async def _refresh_current_payload() -> tuple[dict, float]:
+    # Baska bir worker yakin zamanda yeniledi ise paylasilan cache'teki kopya yeterli.
+    entry = await _current_cache.get_entry(CURRENT_CACHE_KEY)
+    if entry is not None and (time.time() - entry[1]) < current_refresher.interval_seconds:
+        return entry
+
+    # Periyodik yenileme etkilesimli isteklerin arkasinda kalir; suren bir akis fan-out'u varsa ona katilir.
+    return await _join_current_fanout(BACKGROUND).result()
+
+
+current_refresher = BackgroundRefresher(
+    'current',
+    _refresh_current_payload,
+    interval_seconds=CURRENT_CACHE_TTL_SECONDS - CURRENT_REFRESH_MARGIN_SECONDS,
+)
+
+
+@router.get('/weather/current')
+async def get_current_weather(request: Request):
+    """Tum iller icin anlik hava durumunu dondurur.
+
+    Son iyi payload hemen doner; yenileme arka planda yapilir. Verinin yasi
+    `Age` basliginda saniye olarak bildirilir; max-age yenileme araliginin
+    tamamidir, HTTP cache'leri kalan sureyi `Age`'i dusarek bulur.
+    """
+    try:
+        with span('load'):
+            payload, built_at = await current_refresher.get()
+        with span('encode'):
+            encoded = _encoded_bodies.encode(
+                ('current', CURRENT_CACHE_KEY),
+                payload,
+                built_at,
+                negotiate_media_type(request),
+                table_path=('provinces',),
+            )
+        return conditional_response(
+            request,
+            encoded,
+            f'public, max-age={int(current_refresher.interval_seconds)}',
+            headers={'Age': str(int(max(0.0, time.time() - built_at)))},
+        )
     except Exception as exc:
         raise HTTPException(status_code=500, detail=f'Anlik veri alinamadi: {exc}') from exc
+
+
+def _stream_summary(located: list[dict], entries: dict, source: str, built_at: float, started: float) -> dict:
+    failures = [
+        {'plate_code': province.get('plate_code'), 'name': province.get('name')}
+        for index, province in enumerate(located)
+        if entries.get(index) is None
+    ]
+    return {
+        'source': source,
+        'coverage': {
+            'available': len(located) - len(failures),
+            'total': len(located),
+        },
+        'failures': failures,
+        'age_seconds': int(max(0.0, time.time() - built_at)),
+        'elapsed_ms': round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+async def _stream_current_events(sse: bool) -> AsyncIterator[bytes]:
+    started = time.perf_counter()
+    located = _located_provinces()
+    latest = current_refresher.latest
+
+    if latest is not None:
+        payload, built_at = latest
+        by_code = {item.get('plate_code'): item for item in payload.get('provinces', [])}
+        entries = {}
+        for index, province in enumerate(located):
+            entries[index] = by_code.get(province.get('plate_code'))
+            if entries[index] is not None:
+                yield _stream_line('province', entries[index], sse)
+        yield _stream_line('summary', _stream_summary(located, entries, 'cache', built_at, started), sse)
+        return
+
+    fanout = _join_current_fanout()
+    entries = {}
+    async for index, item in fanout.subscribe():
+        entries[index] = item
+        if item is not None:
+            yield _stream_line('province', item, sse)
+
+    _, built_at = await fanout.result()
+    yield _stream_line('summary', _stream_summary(fanout.located, entries, 'live', built_at, started), sse)
+
+
+@router.get('/weather/current/stream')
+async def stream_current_weather(request: Request):
+    """Anlik hava durumunu il il akis olarak dondurur (NDJSON, ya da Accept: text/event-stream ile SSE).
+
+    Eldeki son payload varsa hemen akitilir; yoksa her il upstream'den
+    cozuldugu anda gonderilir. Eszamanli soguk akislar ve refresher tek bir
+    fan-out'u paylasir. Akis kapsama ve basarisiz illeri iceren bir
+    `summary` olayi ile biter.
+    """
+    sse = STREAM_SSE_MEDIA_TYPE in request.headers.get('accept', '')
+    return StreamingResponse(
+        _stream_current_events(sse),
+        media_type=STREAM_SSE_MEDIA_TYPE if sse else STREAM_NDJSON_MEDIA_TYPE,
+        headers={'Cache-Control': 'no-cache'},
+    )
@@ -18,9 +18,9 @@ class Settings:
         "http://localhost:5173,http://localhost:5174,http://localhost:3000,http://localhost:8000,https://huseyinsihat.github.io,https://huseyinsihat.github.io/havadurumu"
     ).split(",")
     
-    # Open-Meteo API
-    OPEN_METEO_BASE_URL = "https://api.open-meteo.com/v1/forecast"
-    OPEN_METEO_ARCHIVE_URL = "https://archive-api.open-meteo.com/v1/archive"
+    # Open-Meteo API (benchmark'larda yerel sahte sunucuya yönlendirilebilir)
+    OPEN_METEO_BASE_URL = os.getenv("OPEN_METEO_BASE_URL", "https://api.open-meteo.com/v1/forecast")
+    OPEN_METEO_ARCHIVE_URL = os.getenv("OPEN_METEO_ARCHIVE_URL", "https://archive-api.open-meteo.com/v1/archive")
     
     # Redis (opsiyonel)
     REDIS_URL = os.getenv("REDIS_URL", None)
@@ -31,4 +31,41 @@ class Settings:
     GEOJSON_PATH = str(BASE_DIR / "data" / "turkey_provinces.geojson")
     COORDINATES_PATH = str(BASE_DIR / "data" / "province_coordinates.json")
 
+    # Kalici arsiv deposu (bos birakilirsa devre disi)
+    ARCHIVE_DB_PATH = os.getenv("ARCHIVE_DB_PATH", str(BASE_DIR / "data" / "archive.sqlite3"))
+    ARCHIVE_MIN_AGE_DAYS = int(os.getenv("ARCHIVE_MIN_AGE_DAYS", 7))
+
+    # İklim normalleri referans dönemi ve gün penceresi (± gün)
+    CLIMATE_REFERENCE_START_YEAR = int(os.getenv("CLIMATE_REFERENCE_START_YEAR", 1991))
+    CLIMATE_REFERENCE_END_YEAR = int(os.getenv("CLIMATE_REFERENCE_END_YEAR", 2020))
+    CLIMATE_WINDOW_DAYS = int(os.getenv("CLIMATE_WINDOW_DAYS", 7))
+    # Açılışta normaller tablosunu arka planda doldur; her worker kendi işini başlatacağından
+    # varsayılan kapalıdır, tablo bir kez python -m app.services.climatology ile doldurulur
+    CLIMATE_PRECOMPUTE_ON_STARTUP = os.getenv("CLIMATE_PRECOMPUTE_ON_STARTUP", "False").lower() == "true"
+
+    # Open-Meteo devre kesici: ardışık hata eşiği ve açık kalma süresi (saniye)
+    CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", 5))
+    CIRCUIT_RESET_SECONDS = float(os.getenv("CIRCUIT_RESET_SECONDS", 30))
+
+    # İstek başına uçtan uca zaman bütçesi (saniye); frontend /weather için 25 sn bekliyor
+    REQUEST_DEADLINE_SECONDS = float(os.getenv("REQUEST_DEADLINE_SECONDS", 20))
+
+    # Open-Meteo paylaşılan istek zamanlayıcısı: uyarlanır eşzamanlılık sınırları,
+    # hız sınırı (saniyede istek, 0 = sınırsız) ve hedef gecikme
+    UPSTREAM_INITIAL_CONCURRENCY = float(os.getenv("UPSTREAM_INITIAL_CONCURRENCY", 10))
+    UPSTREAM_MIN_CONCURRENCY = float(os.getenv("UPSTREAM_MIN_CONCURRENCY", 2))
+    UPSTREAM_MAX_CONCURRENCY = float(os.getenv("UPSTREAM_MAX_CONCURRENCY", 32))
+    UPSTREAM_RATE_PER_SECOND = float(os.getenv("UPSTREAM_RATE_PER_SECOND", 10))
+    UPSTREAM_RATE_BURST = float(os.getenv("UPSTREAM_RATE_BURST", 20))
+    UPSTREAM_TARGET_LATENCY_SECONDS = float(os.getenv("UPSTREAM_TARGET_LATENCY_SECONDS", 2.0))
+
+    # Upstream kipi: live (canlı ağ), record (canlı + kayıt), replay (yalnızca kayıttan, ağsız)
+    UPSTREAM_MODE = os.getenv("UPSTREAM_MODE", "live").lower()
+    UPSTREAM_RECORDINGS_PATH = os.getenv("UPSTREAM_RECORDINGS_PATH", str(BASE_DIR / "data" / "upstream_recordings.sqlite3"))
+    UPSTREAM_REPLAY_LATENCY_MS = float(os.getenv("UPSTREAM_REPLAY_LATENCY_MS", 0))
+
+    # Yönetici anahtarı: ?profile=1 istekleri X-Admin-Token başlığında bunu göndermeli (boşsa profil kapalı)
+    ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", None)
+    PROFILE_DIR = os.getenv("PROFILE_DIR", str(BASE_DIR / "data" / "profiles"))
+
 settings = Settings()
@@ -0,0 +1,324 @@
+import asyncio
+import logging
+import math
+import sqlite3
+import threading
+import zlib
+from array import array
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.config import settings
+from app.services.open_meteo import DAILY_FIELDS, HOURLY_FIELDS
+from app.utils.helpers import DateRange, to_date_ranges
+from app.utils.lru_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+DAYS_PER_YEAR_BLOCK = 366
+HOURS_PER_DAY = 24
+INTEGER_FIELDS = {'relative_humidity_2m', 'cloud_cover', 'weather_code'}
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS series (
+    province TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    days BLOB NOT NULL,
+    columns BLOB NOT NULL,
+    PRIMARY KEY (province, kind, year)
+)
+'''
+
+
+def _kind(hourly: bool) -> str:
+    return 'hourly' if hourly else 'daily'
+
+
+def _fields(hourly: bool) -> List[str]:
+    return HOURLY_FIELDS if hourly else DAILY_FIELDS
+
+
+def _slots_per_day(hourly: bool) -> int:
+    return HOURS_PER_DAY if hourly else 1
+
+
+class _YearBlock:
+    """Bir il-yil icin kolon bazli seri: her degisken 366 gun x slot float32 dizisi."""
+
+    def __init__(self, hourly: bool, days: Optional[bytes] = None, columns: Optional[bytes] = None):
+        self.hourly = hourly
+        self.slots_per_day = _slots_per_day(hourly)
+        size = DAYS_PER_YEAR_BLOCK * self.slots_per_day
+        self.days = bytearray(days) if days else bytearray(DAYS_PER_YEAR_BLOCK)
+        self.columns: Dict[str, array] = {}
+
+        raw = zlib.decompress(columns) if columns else None
+        width = size * 4
+        for position, field in enumerate(_fields(hourly)):
+            if raw is not None:
+                column = array('f')
+                column.frombytes(raw[position * width:(position + 1) * width])
+            else:
+                column = array('f', [math.nan]) * size
+            self.columns[field] = column
+
+    def encode(self) -> Tuple[bytes, bytes]:
+        raw = b''.join(self.columns[field].tobytes() for field in _fields(self.hourly))
+        return bytes(self.days), zlib.compress(raw, 6)
+
+    def has_day(self, day_index: int) -> bool:
+        return bool(self.days[day_index])
+
+    def nbytes(self) -> int:
+        return len(self.days) + sum(column.itemsize * len(column) for column in self.columns.values())
+
+
+def _to_float(value) -> float:
+    if value is None:
+        return math.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _from_float(field: str, value: float):
+    if math.isnan(value):
+        return None
+    if field in INTEGER_FIELDS:
+        return int(round(value))
+    return round(value, 2)
+
+
+def _group_days_by_position(series: dict, hourly: bool) -> Dict[date, Dict[int, int]]:
+    """Serideki zaman damgalarini gun -> {slot: indeks} olarak grupla."""
+    grouped: Dict[date, Dict[int, int]] = {}
+    for index, timestamp in enumerate(series.get('time') or []):
+        try:
+            text = str(timestamp)
+            day = date.fromisoformat(text[:10])
+            slot = int(text[11:13]) if hourly else 0
+        except ValueError:
+            continue
+        if 0 <= slot < _slots_per_day(hourly):
+            grouped.setdefault(day, {})[slot] = index
+    return grouped
+
+
+class ArchiveStore:
+    """Gecmis tarihli arsiv serileri icin kalici, kolon bazli yerel depo.
+
+    Veriler SQLite icinde il-yil basina tek satirda, her degisken icin
+    sikistirilmis float32 dizisi olarak tutulur. Yalnizca degismeyecek
+    kadar eski (ARCHIVE_MIN_AGE_DAYS) gunler yazilir. Cozulmus yil bloklari
+    kucuk bir LRU'da tutulur; ayni yildan gun okuyan istekler bloku tekrar
+    acmaz. Ayni dosyadaki diger tablolar (iklim normalleri) tek baglanti ve
+    kilidi `connection` ile paylasir.
+    """
+
+    def __init__(self, path: Optional[str], min_age_days: int = 7, block_cache_bytes: int = 64 * 1024 * 1024):
+        self.path = path
+        self.min_age_days = min_age_days
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._schemas = [_SCHEMA]
+        self._blocks = LRUCache(block_cache_bytes, sizeof=_YearBlock.nbytes)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def open(self, path: Optional[str]):
+        """Depoyu verilen dosyaya yonlendir (testler ve ozel kurulumlar icin)."""
+        self.close()
+        self.path = path
+
+    def close(self):
+        with self._lock:
+            self._blocks.clear()
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def add_schema(self, schema: str):
+        """Ayni dosyada tutulacak ek bir tablo tanimi kaydet; baglanti acilirken uygulanir."""
+        with self._lock:
+            if schema in self._schemas:
+                return
+            self._schemas.append(schema)
+            if self._connection is not None:
+                self._connection.execute(schema)
+                self._connection.commit()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.execute('PRAGMA journal_mode=WAL')
+            for schema in self._schemas:
+                connection.execute(schema)
+            connection.commit()
+            self._connection = connection
+        return self._connection
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Paylasilan baglantiyi depo kilidi altinda ver."""
+        with self._lock:
+            yield self._connect()
+
+    def cutoff(self) -> date:
+        """Bu tarih ve oncesi degismez kabul edilir."""
+        return datetime.now().date() - timedelta(days=self.min_age_days)
+
+    def _load_blocks(self, province: str, hourly: bool, years: Iterable[int]) -> Dict[int, _YearBlock]:
+        """Yil bloklarini once LRU'dan, olmayanlari SQLite'tan cozerek dondur (kilit altinda cagrilir)."""
+        kind = _kind(hourly)
+        blocks: Dict[int, _YearBlock] = {}
+        for year in set(years):
+            block = self._blocks.get((province, kind, year))
+            if block is not None:
+                blocks[year] = block
+        years = sorted(set(years) - blocks.keys())
+        if not years:
+            return blocks
+        placeholders = ','.join('?' for _ in years)
+        rows = self._connect().execute(
+            f'SELECT year, days, columns FROM series WHERE province = ? AND kind = ? AND year IN ({placeholders})',
+            (province, kind, *years),
+        ).fetchall()
+        for year, days, columns in rows:
+            blocks[year] = _YearBlock(hourly, days, columns)
+            self._blocks.put((province, kind, year), blocks[year])
+        return blocks
+
+    def _read_range(self, province: str, start: date, end: date, hourly: bool) -> Tuple[Optional[dict], List[DateRange]]:
+        fields = _fields(hourly)
+        series: Dict[str, list] = {'time': [], **{field: [] for field in fields}}
+        missing_days: List[date] = []
+        cutoff = self.cutoff()
+
+        # Bloklar LRU'da yazmalarla paylasildigindan okuma da kilit altinda yapilir.
+        with self._lock:
+            blocks = self._load_blocks(province, hourly, range(start.year, min(end, cutoff).year + 1))
+
+            day = start
+            while day <= end:
+                block = blocks.get(day.year) if day <= cutoff else None
+                day_index = (day - date(day.year, 1, 1)).days
+                if block is None or not block.has_day(day_index):
+                    missing_days.append(day)
+                    day += timedelta(days=1)
+                    continue
+
+                base = day_index * block.slots_per_day
+                for slot in range(block.slots_per_day):
+                    series['time'].append(f'{day.isoformat()}T{slot:02d}:00' if hourly else day.isoformat())
+                    for field in fields:
+                        series[field].append(_from_float(field, block.columns[field][base + slot]))
+                day += timedelta(days=1)
+
+        return (series if series['time'] else None), to_date_ranges(missing_days)
+
+    def _write_many(self, items: List[Tuple[str, dict]], hourly: bool) -> int:
+        cutoff = self.cutoff()
+        with self._lock:
+            try:
+                return self._write_blocks(items, hourly, cutoff)
+            except Exception:
+                # LRU'daki bloklar yerinde degistirildi; yazilamadiysa diskle uyumsuz kalmasin.
+                self._blocks.clear()
+                raise
+
+    def _write_blocks(self, items: List[Tuple[str, dict]], hourly: bool, cutoff: date) -> int:
+        """Gunleri yil bloklarina isle ve kaydet (kilit altinda cagrilir)."""
+        slots = _slots_per_day(hourly)
+        fields = _fields(hourly)
+        written_days = 0
+        connection = self._connect()
+        for province, series in items:
+            grouped = {
+                day: positions
+                for day, positions in _group_days_by_position(series, hourly).items()
+                if day <= cutoff and len(positions) == slots
+            }
+            # Upstream henuz hazir olmayan gunler icin null doner; bunlar yazilmaz.
+            first_values = series.get(fields[0]) or []
+            grouped = {
+                day: positions
+                for day, positions in grouped.items()
+                if all(index < len(first_values) and first_values[index] is not None for index in positions.values())
+            }
+            if not grouped:
+                continue
+
+            blocks = self._load_blocks(province, hourly, (day.year for day in grouped))
+            for day, positions in grouped.items():
+                block = blocks.setdefault(day.year, _YearBlock(hourly))
+                day_index = (day - date(day.year, 1, 1)).days
+                base = day_index * slots
+                for field in fields:
+                    values = series.get(field) or []
+                    column = block.columns[field]
+                    for slot, index in positions.items():
+                        column[base + slot] = _to_float(values[index] if index < len(values) else None)
+                block.days[day_index] = 1
+                written_days += 1
+
+            for year, block in blocks.items():
+                days, columns = block.encode()
+                connection.execute(
+                    'INSERT OR REPLACE INTO series (province, kind, year, days, columns) VALUES (?, ?, ?, ?, ?)',
+                    (province, _kind(hourly), year, days, columns),
+                )
+                self._blocks.put((province, _kind(hourly), year), block)
+        connection.commit()
+        return written_days
+
+    async def read_range(self, province: str, start: date, end: date, hourly: bool) -> Tuple[Optional[dict], List[DateRange]]:
+        """Depodaki gunleri seri olarak, eksik gunleri ise tarih araliklari olarak dondur."""
+        if not self.enabled:
+            return None, [(start, end)]
+        try:
+            return await asyncio.to_thread(self._read_range, province, start, end, hourly)
+        except Exception as exc:
+            logger.warning('Archive store read failed for %s: %s', province, exc)
+            return None, [(start, end)]
+
+    async def read_day_many(self, provinces: List[str], day: date) -> Dict[str, dict]:
+        """Bir gun icin depoda tam saatlik serisi olan illeri dondur."""
+        if not self.enabled or day > self.cutoff():
+            return {}
+
+        def read_all():
+            found = {}
+            for province in provinces:
+                series, missing = self._read_range(province, day, day, True)
+                if series is not None and not missing:
+                    found[province] = series
+            return found
+
+        try:
+            return await asyncio.to_thread(read_all)
+        except Exception as exc:
+            logger.warning('Archive store read failed for %s: %s', day, exc)
+            return {}
+
+    async def write_many(self, items: List[Tuple[str, dict]], hourly: bool) -> int:
+        """Upstream arsiv serilerini depoya yaz; yazilan gun sayisini dondur."""
+        if not self.enabled or not items:
+            return 0
+        try:
+            return await asyncio.to_thread(self._write_many, items, hourly)
+        except Exception as exc:
+            logger.warning('Archive store write failed: %s', exc)
+            return 0
+
+    async def write_series(self, province: str, series: dict, hourly: bool) -> int:
+        return await self.write_many([(province, series)], hourly)
+
+
+archive_store = ArchiveStore(settings.ARCHIVE_DB_PATH, settings.ARCHIVE_MIN_AGE_DAYS)
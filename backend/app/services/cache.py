@@ -0,0 +1,346 @@
+import json
+import logging
+from abc import ABC, abstractmethod
+import time
+import zlib
+from typing import Any, Dict, List, Optional
+
+from app.config import settings
+from app.utils.lru_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'havadurumu'
+COMPRESS_MIN_BYTES = 1024
+BACKEND_RETRY_SECONDS = 30.0
+DEFAULT_L1_MAX_BYTES = 16 * 1024 * 1024
+
+_RAW_MARKER = b'j'
+_ZLIB_MARKER = b'z'
+
+
+def _encode_json(payload: Any, timestamp: float) -> bytes:
+    return json.dumps({'t': timestamp, 'p': payload}, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def _frame(raw: bytes) -> bytes:
+    if len(raw) >= COMPRESS_MIN_BYTES:
+        return _ZLIB_MARKER + zlib.compress(raw, 6)
+    return _RAW_MARKER + raw
+
+
+def serialize_payload(payload: Any, timestamp: float) -> bytes:
+    """Payload'u kompakt JSON olarak kodla; buyuk degerleri zlib ile sikistir."""
+    return _frame(_encode_json(payload, timestamp))
+
+
+def _decode(data: bytes) -> tuple[Any, float, int]:
+    """(payload, timestamp, acik JSON boyu); boy L1 butcesinde yeniden serilestirmeden kullanilir."""
+    marker, body = data[:1], data[1:]
+    if marker == _ZLIB_MARKER:
+        body = zlib.decompress(body)
+    elif marker != _RAW_MARKER:
+        raise ValueError('Bilinmeyen cache kodlamasi')
+
+    decoded = json.loads(body)
+    return decoded['p'], float(decoded['t']), len(body)
+
+
+def deserialize_payload(data: bytes) -> tuple[Any, float]:
+    """serialize_payload ciktisini (payload, timestamp) olarak coz."""
+    payload, timestamp, _ = _decode(data)
+    return payload, timestamp
+
+
+class CacheBackend(ABC):
+    """Worker'lar arasi paylasilan (L2) cache arayuzu."""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl_seconds: int) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        ...
+
+    async def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        return [await self.get(key) for key in keys]
+
+    async def set_many(self, items: Dict[str, bytes], ttl_seconds: int) -> None:
+        for key, value in items.items():
+            await self.set(key, value, ttl_seconds)
+
+    async def close(self) -> None:
+        return None
+
+
+class InMemoryCacheBackend(CacheBackend):
+    """Surec ici L2 backend; testlerde ve Redis olmayan kurulumlarda kullanilir."""
+
+    def __init__(self):
+        self._store: Dict[str, tuple[float, bytes]] = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._store.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if time.time() >= expires_at:
+            self._store.pop(key, None)
+            return None
+
+        return value
+
+    async def set(self, key: str, value: bytes, ttl_seconds: int) -> None:
+        self._store[key] = (time.time() + ttl_seconds, value)
+
+    async def delete(self, key: str) -> None:
+        self._store.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+
+class RedisCacheBackend(CacheBackend):
+    """Redis uzerinde L2 cache. Baglanti sorunlarinda cache atlanir, istek bozulmaz."""
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis_asyncio
+
+        self._client = redis_asyncio.from_url(
+            url,
+            socket_connect_timeout=0.5,
+            socket_timeout=0.5,
+        )
+        self._disabled_until = 0.0
+
+    def _available(self) -> bool:
+        return time.time() >= self._disabled_until
+
+    def _mark_failed(self, exc: Exception):
+        self._disabled_until = time.time() + BACKEND_RETRY_SECONDS
+        logger.warning('Redis cache unavailable, skipping for %.0fs: %s', BACKEND_RETRY_SECONDS, exc)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        if not self._available():
+            return None
+        try:
+            return await self._client.get(key)
+        except Exception as exc:
+            self._mark_failed(exc)
+            return None
+
+    async def set(self, key: str, value: bytes, ttl_seconds: int) -> None:
+        if not self._available():
+            return
+        try:
+            await self._client.set(key, value, ex=max(1, int(ttl_seconds)))
+        except Exception as exc:
+            self._mark_failed(exc)
+
+    async def delete(self, key: str) -> None:
+        if not self._available():
+            return
+        try:
+            await self._client.delete(key)
+        except Exception as exc:
+            self._mark_failed(exc)
+
+    async def get_many(self, keys: List[str]) -> List[Optional[bytes]]:
+        if not keys or not self._available():
+            return [None] * len(keys)
+        try:
+            return await self._client.mget(keys)
+        except Exception as exc:
+            self._mark_failed(exc)
+            return [None] * len(keys)
+
+    async def set_many(self, items: Dict[str, bytes], ttl_seconds: int) -> None:
+        if not items or not self._available():
+            return
+        try:
+            async with self._client.pipeline(transaction=False) as pipe:
+                for key, value in items.items():
+                    pipe.set(key, value, ex=max(1, int(ttl_seconds)))
+                await pipe.execute()
+        except Exception as exc:
+            self._mark_failed(exc)
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+def create_cache_backend(url: Optional[str]) -> Optional[CacheBackend]:
+    """REDIS_URL tanimliysa Redis backend'i olustur."""
+    if not url:
+        return None
+    try:
+        return RedisCacheBackend(url)
+    except Exception as exc:
+        logger.error('Redis cache backend could not be created: %s', exc)
+        return None
+
+
+_shared_backend: Optional[CacheBackend] = create_cache_backend(settings.REDIS_URL)
+
+
+def get_shared_backend() -> Optional[CacheBackend]:
+    return _shared_backend
+
+
+def set_shared_backend(backend: Optional[CacheBackend]):
+    """Paylasilan L2 backend'i degistir (testler ve ozel kurulumlar icin)."""
+    global _shared_backend
+    _shared_backend = backend
+
+
+async def close_shared_backend():
+    if _shared_backend is not None:
+        await _shared_backend.close()
+
+
+_registry: Dict[str, 'TieredCache'] = {}
+
+
+class TieredCache:
+    """Surec ici L1 cache ve opsiyonel paylasilan L2 backend.
+
+    L1 her worker'da sicak veriyi tutar; L2 (Redis) worker'lar arasinda
+    ayni veriyi bir kez uretmeyi saglar. Degerler L2'de zaman damgasiyla
+    birlikte saklandigi icin TTL tum worker'larda ayni andan sayilir.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        ttl_seconds: Optional[int] = None,
+        max_entries: Optional[int] = None,
+        max_bytes: int = DEFAULT_L1_MAX_BYTES,
+    ):
+        self.namespace = namespace
+        self.ttl_seconds = settings.CACHE_TTL if ttl_seconds is None else ttl_seconds
+        self.l2_hits = 0
+        self.l2_misses = 0
+        self._local = LRUCache(max_bytes=max_bytes, max_entries=max_entries, ttl_seconds=self.ttl_seconds)
+        _registry[namespace] = self
+
+    def _backend_key(self, key: str) -> str:
+        return f'{KEY_PREFIX}:{self.namespace}:{key}'
+
+    def _local_put(self, key: str, payload: Any, timestamp: float, size: Optional[int] = None):
+        self._local.put(key, payload, timestamp=timestamp, size=size)
+
+    def _local_get(self, key: str, now: float) -> Optional[tuple[Any, float]]:
+        return self._local.get_entry(key, now=now)
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = await self.get_entry(key)
+        return None if entry is None else entry[0]
+
+    async def _decode_backend_value(self, backend: CacheBackend, key: str, data: Optional[bytes], now: float):
+        if data is None:
+            self.l2_misses += 1
+            return None
+
+        try:
+            payload, timestamp, size = _decode(data)
+        except Exception as exc:
+            logger.warning('Discarding unreadable cache entry %s: %s', key, exc)
+            await backend.delete(self._backend_key(key))
+            return None
+
+        if (now - timestamp) > self.ttl_seconds:
+            self.l2_misses += 1
+            return None
+
+        self.l2_hits += 1
+        self._local_put(key, payload, timestamp, size)
+        return payload, timestamp
+
+    async def get_entry(self, key: str) -> Optional[tuple[Any, float]]:
+        """Kaydi olusturulma zamaniyla birlikte (payload, timestamp) olarak dondur."""
+        now = time.time()
+        entry = self._local_get(key, now)
+        if entry is not None:
+            return entry
+
+        backend = get_shared_backend()
+        if backend is None:
+            return None
+
+        data = await backend.get(self._backend_key(key))
+        return await self._decode_backend_value(backend, key, data, now)
+
+    async def get_many(self, keys: List[str]) -> List[Optional[Any]]:
+        """Birden cok anahtari oku; L1'de olmayanlar L2'den tek seferde istenir."""
+        now = time.time()
+        results: List[Optional[Any]] = []
+        remote_positions = []
+        for position, key in enumerate(keys):
+            entry = self._local_get(key, now)
+            results.append(None if entry is None else entry[0])
+            if entry is None:
+                remote_positions.append(position)
+
+        backend = get_shared_backend()
+        if backend is None or not remote_positions:
+            return results
+
+        remote_keys = [keys[position] for position in remote_positions]
+        values = await backend.get_many([self._backend_key(key) for key in remote_keys])
+        for position, key, data in zip(remote_positions, remote_keys, values):
+            entry = await self._decode_backend_value(backend, key, data, now)
+            if entry is not None:
+                results[position] = entry[0]
+        return results
+
+    async def set(self, key: str, payload: Any) -> float:
+        """Kaydi L1'e ve varsa L2'ye yaz; L2 varken payload bir kez serilestirilir ve boyu L1'e verilir."""
+        timestamp = time.time()
+        backend = get_shared_backend()
+        if backend is None:
+            self._local_put(key, payload, timestamp)
+            return timestamp
+
+        raw = _encode_json(payload, timestamp)
+        self._local_put(key, payload, timestamp, len(raw))
+        await backend.set(self._backend_key(key), _frame(raw), self.ttl_seconds)
+        return timestamp
+
+    async def set_many(self, items: Dict[str, Any]):
+        if not items:
+            return
+        timestamp = time.time()
+        backend = get_shared_backend()
+        if backend is None:
+            for key, payload in items.items():
+                self._local_put(key, payload, timestamp)
+            return
+
+        encoded = {}
+        for key, payload in items.items():
+            raw = _encode_json(payload, timestamp)
+            self._local_put(key, payload, timestamp, len(raw))
+            encoded[self._backend_key(key)] = _frame(raw)
+        await backend.set_many(encoded, self.ttl_seconds)
+
+    def clear_local(self):
+        """Yalnizca bu worker'daki L1 kayitlarini temizle."""
+        self._local.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'l1': self._local.stats(),
+            'l2_hits': self.l2_hits,
+            'l2_misses': self.l2_misses,
+        }
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Tum TieredCache ornekleri icin sayaclar."""
+    return {namespace: tiered_cache.stats() for namespace, tiered_cache in _registry.items()}
@@ -0,0 +1,397 @@
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+import warnings
+import zlib
+from calendar import isleap
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import settings
+from app.services.archive_store import ArchiveStore, archive_store
+from app.services.geo_service import geo_service
+from app.services.open_meteo import open_meteo
+from app.utils.helpers import merge_series, split_by_year
+from app.utils.request_scheduler import BACKGROUND
+from app.utils.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+CLIMATE_FIELDS = ['temperature_2m_mean', 'temperature_2m_max', 'temperature_2m_min', 'precipitation_sum']
+CLIMATE_STATS = ['mean', 'std', 'p10', 'p50', 'p90']
+PERCENTILES = (10, 50, 90)
+DAYS_PER_YEAR_SLOTS = 366
+FEBRUARY_29_SLOT = 59
+HISTORY_FETCH_CONCURRENCY = 4
+# On hesaplamada ayni anda islenen il sayisi ve basarisiz iller icin tekrar araligi (saniye).
+PRECOMPUTE_CONCURRENCY = 2
+PRECOMPUTE_RETRY_SECONDS = 300.0
+# Normalleri henuz tabloda olmayan il icin istemciye onerilen tekrar deneme suresi (saniye).
+NORMALS_RETRY_AFTER_SECONDS = 60
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS normals (
+    province TEXT NOT NULL,
+    reference TEXT NOT NULL,
+    built_at REAL NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (province, reference)
+)
+'''
+
+
+def day_slot(day: date) -> int:
+    """366 gunluk takvimde gunun yeri; 29 Subat her yil icin ayni slotta durur."""
+    index = day.timetuple().tm_yday - 1
+    if not isleap(day.year) and index >= FEBRUARY_29_SLOT:
+        index += 1
+    return index
+
+
+def rounded_list(values: np.ndarray) -> List[Optional[float]]:
+    return [None if np.isnan(value) else round(float(value), 2) for value in values]
+
+
+def slot_label(slot: int) -> str:
+    return (date(2000, 1, 1) + timedelta(days=slot)).strftime('%m-%d')
+
+
+def with_daily_mean(series: dict) -> dict:
+    """Gunluk seriye (max + min) / 2 olarak `temperature_2m_mean` ekle."""
+    highs = series.get('temperature_2m_max') or []
+    lows = series.get('temperature_2m_min') or []
+    means = [
+        round((high + low) / 2, 2) if high is not None and low is not None else None
+        for high, low in zip(highs, lows)
+    ]
+    return {**series, 'temperature_2m_mean': means}
+
+
+def compute_normals(series: dict, start_year: int, end_year: int, window_days: int) -> np.ndarray:
+    """Gunluk seriden gun-of-year normallerini hesapla: (degisken, istatistik, 366) float32.
+
+    Her degisken yil x 366 matrisine yerlestirilir; her gun icin +-window_days
+    komsu gunler (yil sinirinda sarmali) ayni ornekleme katilir ve istatistikler
+    tum matris uzerinde tek seferde alinir.
+    """
+    series = with_daily_mean(series)
+    years = end_year - start_year + 1
+    rows = []
+    slots = []
+    for timestamp in series.get('time') or []:
+        day = date.fromisoformat(str(timestamp)[:10])
+        rows.append(day.year - start_year)
+        slots.append(day_slot(day))
+    rows = np.asarray(rows, dtype=np.intp)
+    slots = np.asarray(slots, dtype=np.intp)
+    inside = (rows >= 0) & (rows < years)
+
+    normals = np.full((len(CLIMATE_FIELDS), len(CLIMATE_STATS), DAYS_PER_YEAR_SLOTS), np.nan, dtype=np.float32)
+    for position, field in enumerate(CLIMATE_FIELDS):
+        values = np.array([np.nan if value is None else value for value in series.get(field) or []], dtype=np.float64)
+        if values.size != rows.size:
+            continue
+        matrix = np.full((years, DAYS_PER_YEAR_SLOTS), np.nan)
+        matrix[rows[inside], slots[inside]] = values[inside]
+
+        sample = np.concatenate([np.roll(matrix, shift, axis=1) for shift in range(-window_days, window_days + 1)], axis=0)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            normals[position, 0] = np.nanmean(sample, axis=0)
+            normals[position, 1] = np.nanstd(sample, axis=0)
+            normals[position, 2:] = np.nanpercentile(sample, PERCENTILES, axis=0)
+    return normals
+
+
+class ClimateNormals:
+    """Bir il ve referans donemi icin hesaplanmis normaller: (degisken, istatistik, 366)."""
+
+    def __init__(self, province: str, reference: Tuple[int, int], values: np.ndarray, built_at: float):
+        self.province = province
+        self.reference = reference
+        self.values = values
+        self.built_at = built_at
+
+    def column(self, field: str, stat: str, slots: List[int]) -> np.ndarray:
+        return self.values[CLIMATE_FIELDS.index(field), CLIMATE_STATS.index(stat), slots].astype(np.float64)
+
+    def stat(self, field: str, stat: str, slots: List[int]) -> List[Optional[float]]:
+        return rounded_list(self.column(field, stat, slots))
+
+    def to_dict(self, slots: List[int]) -> dict:
+        payload = {
+            'reference': {'start_year': self.reference[0], 'end_year': self.reference[1]},
+            'days': [slot_label(slot) for slot in slots],
+        }
+        for field in CLIMATE_FIELDS:
+            payload[field] = {stat: self.stat(field, stat, slots) for stat in CLIMATE_STATS}
+        return payload
+
+
+def anomaly_series(series: dict, normals: ClimateNormals) -> dict:
+    """Gunluk seriyi normallerle karsilastir: deger, normal, sapma, z ve kategori.
+
+    Kategori gunun p10'unun altinda `below`, p90'inin ustunde `above`,
+    arada `normal`dir; deger ya da normal yoksa null kalir.
+    """
+    series = with_daily_mean(series)
+    times = [str(value)[:10] for value in series.get('time') or []]
+    slots = [day_slot(date.fromisoformat(value)) for value in times]
+    anomalies = {'time': times}
+    for field in CLIMATE_FIELDS:
+        values = np.full(len(times), np.nan)
+        raw = series.get(field) or []
+        values[:len(raw)] = [np.nan if value is None else value for value in raw[:len(times)]]
+        mean = normals.column(field, 'mean', slots)
+        std = normals.column(field, 'std', slots)
+        anomaly = values - mean
+        with np.errstate(divide='ignore', invalid='ignore'):
+            z_score = np.where(std > 0, anomaly / std, np.nan)
+        # Normaller float32 saklandigindan karsilastirma yanittaki hassasiyetle (2 hane) yapilir.
+        rounded = np.round(values, 2)
+        category = np.where(
+            rounded < np.round(normals.column(field, 'p10', slots), 2), 'below',
+            np.where(rounded > np.round(normals.column(field, 'p90', slots), 2), 'above', 'normal'),
+        )
+        known = ~np.isnan(anomaly)
+        anomalies[field] = {
+            'value': rounded_list(values),
+            'normal': rounded_list(mean),
+            'anomaly': rounded_list(anomaly),
+            'z': rounded_list(z_score),
+            'category': [label if ok else None for label, ok in zip(category.tolist(), known.tolist())],
+        }
+    return anomalies
+
+
+class NormalsNotReady(LookupError):
+    """Ilin normalleri henuz on hesaplanmamis; istek yolunda hesaplanmaz."""
+
+    def __init__(self, province: str):
+        super().__init__(f'{province} icin iklim normalleri henuz hesaplanmadi')
+        self.province = province
+        self.retry_after = NORMALS_RETRY_AFTER_SECONDS
+
+
+class ClimatologyService:
+    """Il bazinda gun-of-year iklim normalleri.
+
+    Normaller referans doneminin gunluk arsivinden bir kez hesaplanir ve
+    SQLite'ta il x referans basina tek satirlik sikistirilmis float32 tablo
+    olarak saklanir. Tablo `python -m app.services.climatology` ile (ya da
+    CLIMATE_PRECOMPUTE_ON_STARTUP acikken acilista `start` ile) onceden
+    doldurulur; istekler yalnizca `lookup`/`require` ile tablodan okur ve
+    upstream'e gitmez. Tablo arsiv deposuyla ayni dosyadadir ve deponun
+    baglantisini ve kilidini kullanir.
+    """
+
+    def __init__(self, store: ArchiveStore, start_year: int, end_year: int, window_days: int = 7):
+        self.store = store
+        self.store.add_schema(_SCHEMA)
+        self.start_year = start_year
+        self.end_year = end_year
+        self.window_days = window_days
+        self._normals: Dict[Tuple[str, str], ClimateNormals] = {}
+        self._flight = SingleFlight('climate_normals')
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def reference(self) -> Tuple[int, int]:
+        return self.start_year, self.end_year
+
+    def _reference_key(self) -> str:
+        return f'{self.start_year}-{self.end_year}|w{self.window_days}'
+
+    def clear(self):
+        """Bellekteki normalleri birak (depo baska dosyaya yonlendirildiginde)."""
+        self._normals.clear()
+
+    def _read(self, province: str) -> Optional[ClimateNormals]:
+        with self.store.connection() as connection:
+            row = connection.execute(
+                'SELECT built_at, data FROM normals WHERE province = ? AND reference = ?',
+                (province, self._reference_key()),
+            ).fetchone()
+        if row is None:
+            return None
+        values = np.frombuffer(zlib.decompress(row[1]), dtype=np.float32)
+        values = values.reshape(len(CLIMATE_FIELDS), len(CLIMATE_STATS), DAYS_PER_YEAR_SLOTS)
+        return ClimateNormals(province, self.reference, values, row[0])
+
+    def _write(self, normals: ClimateNormals):
+        with self.store.connection() as connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO normals (province, reference, built_at, data) VALUES (?, ?, ?, ?)',
+                (normals.province, self._reference_key(), normals.built_at, zlib.compress(normals.values.tobytes(), 6)),
+            )
+            connection.commit()
+
+    async def _load_history(self, province: str, latitude: float, longitude: float) -> dict:
+        """Referans doneminin gunluk serisi: once yerel arsiv, eksik yillar upstream'den paralel.
+
+        Herhangi bir yil alinamazsa hata yukselir; eksik veriyle normal hesaplanip saklanmaz.
+        """
+        start, end = date(self.start_year, 1, 1), date(self.end_year, 12, 31)
+        stored, missing = await archive_store.read_range(province, start, end, False)
+        sem = asyncio.Semaphore(HISTORY_FETCH_CONCURRENCY)
+
+        async def fetch(chunk_start: date, chunk_end: date) -> dict:
+            async with sem:
+                result = await open_meteo.get_historical_weather(
+                    latitude=latitude,
+                    longitude=longitude,
+                    start_date=chunk_start.isoformat(),
+                    end_date=chunk_end.isoformat(),
+                    hourly=False,
+                    priority=BACKGROUND,
+                )
+            series = result.get('daily') if isinstance(result, dict) else None
+            if not isinstance(series, dict):
+                raise ValueError(f'{province} {chunk_start}..{chunk_end} icin gunluk seri yok')
+            # Basarili yillar arsive yazilir; yarim kalan bir build tekrarlandiginda yalnizca eksikler cekilir.
+            await archive_store.write_series(province, series, False)
+            return series
+
+        chunks = [chunk for gap_start, gap_end in missing for chunk in split_by_year(gap_start, gap_end)]
+        fetched = await asyncio.gather(*(fetch(chunk_start, chunk_end) for chunk_start, chunk_end in chunks))
+        return merge_series(stored, *fetched)
+
+    async def lookup(self, province: str) -> Optional[ClimateNormals]:
+        """Hesaplanmis normalleri bellekten ya da tablodan oku; yoksa None (upstream'e gidilmez)."""
+        key = (province, self._reference_key())
+        normals = self._normals.get(key)
+        if normals is not None or not self.store.enabled:
+            return normals
+        try:
+            stored = await asyncio.to_thread(self._read, province)
+        except Exception as exc:
+            logger.warning('Climate normals read failed for %s: %s', province, exc)
+            return None
+        if stored is not None:
+            self._normals[key] = stored
+        return stored
+
+    async def require(self, province: str) -> ClimateNormals:
+        """`lookup` gibi, fakat il hazir degilse NormalsNotReady yukseltir."""
+        normals = await self.lookup(province)
+        if normals is None:
+            raise NormalsNotReady(province)
+        return normals
+
+    async def get_normals(self, province: str, latitude: float, longitude: float) -> ClimateNormals:
+        """Normalleri dondur; tabloda yoksa referans doneminin arsivinden hesapla ve sakla."""
+        key = (province, self._reference_key())
+        normals = self._normals.get(key)
+        if normals is not None:
+            return normals
+
+        async def build() -> ClimateNormals:
+            stored = await self.lookup(province)
+            if stored is not None:
+                return stored
+
+            history = await self._load_history(province, latitude, longitude)
+            if not history.get('time'):
+                raise ValueError(f'{province} icin referans donemi verisi alinamadi')
+            values = await asyncio.to_thread(compute_normals, history, self.start_year, self.end_year, self.window_days)
+            normals = ClimateNormals(province, self.reference, values, time.time())
+            if self.store.enabled:
+                try:
+                    await asyncio.to_thread(self._write, normals)
+                except Exception as exc:
+                    logger.warning('Climate normals write failed for %s: %s', province, exc)
+            self._normals[key] = normals
+            return normals
+
+        return await self._flight.do(f'{province}|{self._reference_key()}', build)
+
+    async def precompute(self, provinces: List[dict]) -> Dict[str, int]:
+        """Verilen iller icin tabloyu doldur; hazir olanlar yalnizca okunur.
+
+        Bir ilin hatasi digerlerini durdurmaz; hazir ve basarisiz il sayilari doner.
+        """
+        sem = asyncio.Semaphore(PRECOMPUTE_CONCURRENCY)
+        counts = {'ready': 0, 'failed': 0}
+
+        async def build(province: dict):
+            plate_code = province.get('plate_code')
+            async with sem:
+                try:
+                    await self.get_normals(plate_code, province.get('latitude'), province.get('longitude'))
+                    counts['ready'] += 1
+                except Exception as exc:
+                    logger.warning('Climate normals precompute failed for %s: %s', plate_code, exc)
+                    counts['failed'] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(build(province) for province in provinces))
+        logger.info(
+            'Climate normals precompute: %s ready, %s failed in %.1fs',
+            counts['ready'],
+            counts['failed'],
+            time.perf_counter() - started,
+        )
+        return counts
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def _precompute_until_ready(self, provinces: List[dict]):
+        while (await self.precompute(provinces))['failed']:
+            await asyncio.sleep(PRECOMPUTE_RETRY_SECONDS)
+
+    async def start(self, provinces: List[dict]):
+        """Tabloyu arka planda doldur; basarisiz iller PRECOMPUTE_RETRY_SECONDS sonra tekrar denenir."""
+        if self.running:
+            return
+        self._task = asyncio.create_task(self._precompute_until_ready(provinces))
+
+    async def stop(self):
+        if self.running:
+            self._task.cancel()
+            try:
+                await self._task
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._task = None
+
+
+climatology = ClimatologyService(
+    archive_store,
+    settings.CLIMATE_REFERENCE_START_YEAR,
+    settings.CLIMATE_REFERENCE_END_YEAR,
+    settings.CLIMATE_WINDOW_DAYS,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Iklim normalleri tablosunu iller icin onceden doldur.')
+    parser.add_argument('--province', nargs='+', help='Yalnizca bu plaka kodlari (varsayilan: 81 il)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    provinces = geo_service.get_all_provinces()
+    if args.province:
+        wanted = {code.zfill(2) for code in args.province}
+        provinces = [province for province in provinces if province.get('plate_code') in wanted]
+
+    async def run() -> Dict[str, int]:
+        try:
+            return await climatology.precompute(provinces)
+        finally:
+            await open_meteo.close()
+            archive_store.close()
+
+    counts = asyncio.run(run())
+    print(json.dumps(counts))
+    sys.exit(1 if counts['failed'] else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,23 @@
 import json
 import logging
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, Tuple
 from app.config import settings
+from app.utils.spatial import GeoIndex
 
 logger = logging.getLogger(__name__)
 
+_TURKISH_FOLD = str.maketrans({
+    "ç": "c", "ğ": "g", "ı": "i", "ö": "o", "ş": "s", "ü": "u",
+    "â": "a", "î": "i", "û": "u",
+})
+
+
+def normalize_province_name(name: str) -> str:
+    """İl adını Türkçe kurallarıyla küçült ve aksanlardan arındır (İSTANBUL, Ağrı -> istanbul, agri)."""
+    lowered = name.strip().replace("İ", "i").replace("I", "ı").lower()
+    return " ".join(lowered.translate(_TURKISH_FOLD).split())
+
+
 class GeoService:
     """Coğrafi veri servisi"""
     
@@ -12,6 +25,7 @@ class GeoService:
         self.provinces_cache = None
         self.coordinates_cache = None
         self._load_data()
+        self._build_indexes()
     
     def _load_data(self):
         """Varyları yükle"""
@@ -32,23 +46,36 @@ class GeoService:
             logger.error(f"❌ JSON parsing hatası: {e}")
             raise
     
+    def _build_indexes(self):
+        """Plaka kodu, normalize ad ve koordinat indekslerini oluştur"""
+        provinces = self.get_all_provinces()
+        self._by_code = {province.get("plate_code"): province for province in provinces}
+        self._by_name = {
+            normalize_province_name(province.get("name")): province
+            for province in provinces
+            if province.get("name")
+        }
+        self._geo_index = GeoIndex([
+            (province["latitude"], province["longitude"], province)
+            for province in provinces
+            if province.get("latitude") is not None and province.get("longitude") is not None
+        ])
+
     def get_all_provinces(self) -> List[Dict[str, Any]]:
         """Tüm illeri al"""
         return self.coordinates_data.get("provinces", [])
     
     def get_province_by_code(self, plate_code: str) -> Optional[Dict[str, Any]]:
         """Plaka koduna göre il al"""
-        for province in self.get_all_provinces():
-            if province.get("plate_code") == plate_code:
-                return province
-        return None
+        return self._by_code.get(plate_code)
     
     def get_province_by_name(self, name: str) -> Optional[Dict[str, Any]]:
-        """İle göre il al"""
-        for province in self.get_all_provinces():
-            if province.get("name").lower() == name.lower():
-                return province
-        return None
+        """İl adına göre il al (büyük/küçük harf ve Türkçe karakter duyarsız)"""
+        return self._by_name.get(normalize_province_name(name))
+
+    def get_nearest_provinces(self, latitude: float, longitude: float, k: int = 1) -> List[Tuple[Dict[str, Any], float]]:
+        """Koordinata en yakın k ili (il, mesafe_km) olarak döndür"""
+        return self._geo_index.nearest(latitude, longitude, k)
     
     def get_province_coordinates(self, plate_code: str) -> Optional[Dict[str, float]]:
         """İlinin koordinatlarını al"""
@@ -0,0 +1,127 @@
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.services.snapshot_cube import SnapshotCube
+
+NATIONAL_FIELDS = [
+    'temperature_2m',
+    'apparent_temperature',
+    'precipitation',
+    'relative_humidity_2m',
+    'wind_speed_10m',
+    'pressure_msl',
+    'cloud_cover',
+]
+# Gunluk il degeri saatlerin ortalamasidir; yagis icin toplamidir.
+DAILY_SUM_FIELDS = {'precipitation'}
+PERCENTILES = (10, 50, 90)
+
+
+def _rounded(values: np.ndarray) -> List[Optional[float]]:
+    missing = np.isnan(values)
+    return [None if is_missing else value for value, is_missing in zip(np.round(values, 2).tolist(), missing.tolist())]
+
+
+def column_stats(values: np.ndarray, plate_codes: List[str]) -> dict:
+    """il x zaman matrisinde her zaman adimi icin iller arasi istatistikler.
+
+    Ortalama, min/max, yuzdelikler ve uc degerdeki iller tek geciste
+    kolon bazli hesaplanir; hic verisi olmayan adimlar null olur.
+    """
+    steps = values.shape[1]
+    if not values.shape[0]:
+        empty = [None] * steps
+        stats = {name: list(empty) for name in ('mean', 'min', 'max', *(f'p{percentile}' for percentile in PERCENTILES))}
+        return {**stats, 'min_province': list(empty), 'max_province': list(empty)}
+
+    present = ~np.isnan(values)
+    counts = present.sum(axis=0)
+    has_data = counts > 0
+
+    mean = np.full(steps, np.nan)
+    mean[has_data] = np.nansum(values[:, has_data], axis=0) / counts[has_data]
+    low = np.where(present, values, np.inf)
+    high = np.where(present, values, -np.inf)
+    min_index = low.argmin(axis=0)
+    max_index = high.argmax(axis=0)
+    minimum = np.where(has_data, low.min(axis=0), np.nan)
+    maximum = np.where(has_data, high.max(axis=0), np.nan)
+
+    stats = {
+        'mean': _rounded(mean),
+        'min': _rounded(minimum),
+        'max': _rounded(maximum),
+    }
+    percentiles = np.full((len(PERCENTILES), steps), np.nan)
+    if has_data.any():
+        percentiles[:, has_data] = np.nanpercentile(values[:, has_data], PERCENTILES, axis=0)
+    for position, percentile in enumerate(PERCENTILES):
+        stats[f'p{percentile}'] = _rounded(percentiles[position])
+
+    stats['min_province'] = [plate_codes[index] if ok else None for index, ok in zip(min_index.tolist(), has_data.tolist())]
+    stats['max_province'] = [plate_codes[index] if ok else None for index, ok in zip(max_index.tolist(), has_data.tolist())]
+    return stats
+
+
+def _daily_values(hourly: np.ndarray, field: str) -> np.ndarray:
+    """il x saat matrisinden il basina gunluk deger (il x 1)."""
+    counts = (~np.isnan(hourly)).sum(axis=1)
+    sums = np.nansum(hourly, axis=1)
+    daily = sums if field in DAILY_SUM_FIELDS else sums / np.maximum(counts, 1)
+    return np.where(counts > 0, daily, np.nan)[:, None]
+
+
+def national_day_stats(cube: SnapshotCube, regions: Dict[str, Optional[str]]) -> dict:
+    """Bir gunun ulusal saatlik ve gunluk istatistikleri ile bolge ortalamalari.
+
+    Bolge anahtarlari `regions` icindeki tum bolgelerdir; o gun hic ili
+    raporlamayan bolge de null degerlerle yer alir, boylece gunler
+    `concat_columns` ile birlestirildiginde kolonlar hizali kalir.
+    """
+    grid = cube.hour_grid()
+    plate_codes = cube.plate_codes
+    region_names = [regions.get(code) for code in plate_codes]
+    region_rows = {
+        region: np.array([name == region for name in region_names], dtype=bool)
+        for region in sorted({name for name in regions.values() if name})
+    }
+    available = int((~np.isnan(cube.field_slice(grid, 'temperature_2m'))).any(axis=1).sum()) if grid.size else 0
+
+    hourly = {'time': [f'{cube.date}T{hour:02d}:00' for hour in range(grid.shape[1])]}
+    daily = {'time': [cube.date]}
+    regional: Dict[str, dict] = {}
+    for field in NATIONAL_FIELDS:
+        values = cube.field_slice(grid, field)
+        hourly[field] = column_stats(values, plate_codes)
+
+        per_province = _daily_values(values, field)
+        daily[field] = column_stats(per_province, plate_codes)
+        for region, rows in region_rows.items():
+            region_values = per_province[rows, 0]
+            present = region_values[~np.isnan(region_values)]
+            entry = regional.setdefault(region, {'time': [cube.date], 'provinces': [int(rows.sum())]})
+            entry[field] = [round(float(present.mean()), 2) if present.size else None]
+
+    return {
+        'coverage': {'time': [cube.date], 'available': [available], 'total': [cube.total]},
+        'hourly': hourly,
+        'daily': daily,
+        'regions': regional,
+    }
+
+
+def concat_columns(parts: List[dict]) -> dict:
+    """Ayni yapidaki kolon bazli payload'lari liste alanlarini uc uca ekleyerek birlestir."""
+    if not parts:
+        return {}
+    merged: dict = {}
+    for part in parts:
+        for key, value in part.items():
+            if isinstance(value, dict):
+                merged[key] = concat_columns([merged[key], value]) if key in merged else concat_columns([value])
+            elif isinstance(value, list):
+                merged[key] = merged.get(key, []) + value
+            else:
+                merged[key] = value
+    return merged
@@ -1,37 +1,76 @@
 import asyncio
 import httpx
 import logging
-from typing import Optional, Dict, Any
+import time
+from typing import Optional, Dict, Any, List, Sequence, Tuple
 
 from app.config import settings
+from app.services.upstream_transport import REPLAY_MODE, build_transport
+from app.utils.circuit_breaker import CircuitBreaker
+from app.utils.deadline import Deadline, DeadlineExceeded
+from app.utils.metrics import Histogram, register_collector
+from app.utils.request_scheduler import BULK, INTERACTIVE, RequestScheduler
+from app.utils.timing import record, span
 
 logger = logging.getLogger(__name__)
 
-HOURLY_VARIABLES = ','.join(
-    [
-        'temperature_2m',
-        'apparent_temperature',
-        'precipitation',
-        'wind_speed_10m',
-        'wind_direction_10m',
-        'relative_humidity_2m',
-        'pressure_msl',
-        'visibility',
-        'cloud_cover',
-        'weather_code',
-    ]
-)
+HOURLY_FIELDS = [
+    'temperature_2m',
+    'apparent_temperature',
+    'precipitation',
+    'wind_speed_10m',
+    'wind_direction_10m',
+    'relative_humidity_2m',
+    'pressure_msl',
+    'visibility',
+    'cloud_cover',
+    'weather_code',
+]
+HOURLY_VARIABLES = ','.join(HOURLY_FIELDS)
 
-DAILY_VARIABLES = ','.join(
-    [
-        'temperature_2m_max',
-        'temperature_2m_min',
-        'precipitation_sum',
-        'weather_code',
-    ]
+DAILY_FIELDS = [
+    'temperature_2m_max',
+    'temperature_2m_min',
+    'precipitation_sum',
+    'weather_code',
+]
+DAILY_VARIABLES = ','.join(DAILY_FIELDS)
+
+# Coklu konum isteginde tek cagriya sigdirilacak koordinat sayisi
+BATCH_CHUNK_SIZE = 30
+
+# Devre kesici ile izlenen upstream uclari
+ARCHIVE_ENDPOINT = 'archive'
+FORECAST_ENDPOINT = 'forecast'
+CURRENT_ENDPOINT = 'current'
+ENDPOINTS = (ARCHIVE_ENDPOINT, FORECAST_ENDPOINT, CURRENT_ENDPOINT)
+
+
+UPSTREAM_LATENCY = Histogram(
+    'openmeteo_request_duration_seconds',
+    'Open-Meteo HTTP denemelerinin suresi (uc ve sonuca gore).',
+    ('endpoint', 'outcome'),
 )
 
 
+def _status_outcome(status: int) -> str:
+    if status == 429:
+        return 'throttled'
+    if status >= 500:
+        return 'server_error'
+    if status >= 400:
+        return 'client_error'
+    return 'ok'
+
+
+def _is_upstream_failure(exc: Exception) -> bool:
+    """Ucun sagligini etkileyen hatalar: ag/zaman asimi, 5xx ve 429. Diger 4xx istek hatasidir."""
+    if isinstance(exc, httpx.HTTPStatusError):
+        status = exc.response.status_code
+        return status >= 500 or status == 429
+    return isinstance(exc, httpx.HTTPError)
+
+
 class OpenMeteoService:
     """Open-Meteo API ile iletisim servisi"""
 
@@ -40,54 +79,242 @@ class OpenMeteoService:
         self.archive_url = settings.OPEN_METEO_ARCHIVE_URL
         self.timeout = 12.0
         self.max_retries = 2
+        self.batch_size = BATCH_CHUNK_SIZE
+        self.breakers = {
+            endpoint: CircuitBreaker(
+                endpoint,
+                failure_threshold=settings.CIRCUIT_FAILURE_THRESHOLD,
+                reset_timeout=settings.CIRCUIT_RESET_SECONDS,
+            )
+            for endpoint in ENDPOINTS
+        }
+        self.mode = settings.UPSTREAM_MODE
+        self.scheduler = RequestScheduler(
+            initial_limit=settings.UPSTREAM_INITIAL_CONCURRENCY,
+            min_limit=settings.UPSTREAM_MIN_CONCURRENCY,
+            max_limit=settings.UPSTREAM_MAX_CONCURRENCY,
+            # Replay'de korunacak bir upstream yok; hiz siniri yalnizca olcumu yavaslatir.
+            rate_per_second=0 if self.mode == REPLAY_MODE else settings.UPSTREAM_RATE_PER_SECOND,
+            burst=settings.UPSTREAM_RATE_BURST,
+            target_latency=settings.UPSTREAM_TARGET_LATENCY_SECONDS,
+        )
+        limits = httpx.Limits(max_connections=120, max_keepalive_connections=40)
+        # record/replay kipinde cagrilar kayit deposundan gecer (UPSTREAM_MODE).
         self._client = httpx.AsyncClient(
-            limits=httpx.Limits(max_connections=120, max_keepalive_connections=40),
+            limits=limits,
             timeout=self.timeout,
+            transport=build_transport(
+                self.mode,
+                settings.UPSTREAM_RECORDINGS_PATH,
+                settings.UPSTREAM_REPLAY_LATENCY_MS,
+                limits,
+            ),
         )
 
     async def close(self):
         await self._client.aclose()
 
+    def is_available(self, endpoint: str) -> bool:
+        """Uc cagri kabul ediyor mu; acik devreli uclar fallback zincirinde atlanir."""
+        return not self.breakers[endpoint].is_open
+
+    def breaker_stats(self) -> Dict[str, Dict[str, Any]]:
+        return {endpoint: breaker.stats() for endpoint, breaker in self.breakers.items()}
+
+    async def _send(
+        self,
+        url: str,
+        params: Dict[str, Any],
+        request_timeout: float,
+        priority: int,
+        deadline: Optional[Deadline],
+        endpoint: Optional[str] = None,
+    ) -> httpx.Response:
+        """Tek bir HTTP denemesini paylasilan zamanlayicidan alinan slotla gonder.
+
+        Denemenin suresi uc ve sonuc etiketiyle UPSTREAM_LATENCY'ye, slot
+        icin kuyrukta gecen sure istegin `upstream_queue` parcasina yazilir.
+        """
+        queued = time.perf_counter()
+        async with self.scheduler.slot(priority, deadline) as ticket:
+            started = time.perf_counter()
+            record('upstream_queue', started - queued)
+            outcome = 'error'
+            pending = self._client.get(url, params=params, timeout=request_timeout)
+            try:
+                if deadline is None:
+                    response = await pending
+                else:
+                    # httpx zaman asimi adim basinadir; toplam sure butceyle ayrica sinirlanir.
+                    try:
+                        response = await asyncio.wait_for(pending, timeout=deadline.remaining())
+                    except asyncio.TimeoutError as exc:
+                        outcome = 'deadline'
+                        raise DeadlineExceeded('Open-Meteo istegi zaman butcesini asti') from exc
+            except httpx.TransportError as exc:
+                outcome = 'timeout' if isinstance(exc, httpx.TimeoutException) else 'transport_error'
+                ticket.observe(overloaded=True)
+                raise
+            else:
+                outcome = _status_outcome(response.status_code)
+                ticket.observe(overloaded=response.status_code == 429 or response.status_code >= 500)
+                return response
+            finally:
+                UPSTREAM_LATENCY.observe(time.perf_counter() - started, endpoint or 'other', outcome)
+
     async def _request_json(
         self,
         url: str,
         params: Dict[str, Any],
         timeout: Optional[float] = None,
         retries: Optional[int] = None,
-    ) -> Dict[str, Any]:
-        """Transient ag hatalarina karsi retry ile API cagrisi yap."""
+        endpoint: Optional[str] = None,
+        deadline: Optional[Deadline] = None,
+        priority: int = INTERACTIVE,
+    ) -> Any:
+        """Transient ag hatalarina karsi retry ile API cagrisi yap.
+
+        `endpoint` verilirse cagri o ucun devre kesicisinden gecer: devre
+        aciksa CircuitOpenError ile aninda reddedilir, tum denemeler
+        upstream hatasiyla biterse hata devreye yazilir.
+
+        `deadline` verilirse her deneme kalan butceyle sinirlanir; butce
+        bir sonraki bekleme + denemeye yetmiyorsa DeadlineExceeded yukselir.
+        Her deneme `priority` sinifiyla zamanlayicidan slot bekler; retry
+        beklemesi sirasinda slot tutulmaz. Cagrinin tamami (retry'lar dahil)
+        istegin `upstream_<uc>` parcasina yazilir.
+        """
+        started = time.perf_counter()
+        if deadline is not None:
+            deadline.check()
+        breaker = self.breakers.get(endpoint) if endpoint else None
+        if breaker is not None:
+            breaker.check()
+
         last_error: Exception | None = None
         max_retries = self.max_retries if retries is None else max(0, retries)
-        request_timeout = self.timeout if timeout is None else timeout
+        base_timeout = self.timeout if timeout is None else timeout
+        recorded = False
 
-        for attempt in range(max_retries + 1):
-            try:
-                response = await self._client.get(url, params=params, timeout=request_timeout)
-                response.raise_for_status()
-                return response.json()
-            except httpx.HTTPError as exc:
-                last_error = exc
-                if attempt >= max_retries:
-                    break
+        try:
+            for attempt in range(max_retries + 1):
+                request_timeout = base_timeout if deadline is None else deadline.timeout(base_timeout)
+                try:
+                    response = await self._send(url, params, request_timeout, priority, deadline, endpoint)
+                    response.raise_for_status()
+                    data = response.json()
+                except httpx.HTTPError as exc:
+                    last_error = exc
+                    if isinstance(exc, httpx.TimeoutException) and request_timeout < base_timeout:
+                        # Zaman asimi upstream'in degil butcenin; devreye yazilmaz.
+                        raise DeadlineExceeded(f'Open-Meteo istegi zaman butcesini asti: {exc}') from exc
+                    if not _is_upstream_failure(exc):
+                        # Uc cevap veriyor; istegin kendisi hatali, tekrar denemenin anlami yok.
+                        if breaker is not None:
+                            breaker.record_success()
+                            recorded = True
+                        break
+                    if attempt >= max_retries or (breaker is not None and breaker.is_open):
+                        if breaker is not None:
+                            breaker.record_failure()
+                            recorded = True
+                        break
+                else:
+                    if breaker is not None:
+                        breaker.record_success()
+                        recorded = True
+                    return data
 
                 wait_seconds = 0.5 * (attempt + 1)
+                if deadline is not None and deadline.remaining() <= wait_seconds:
+                    if breaker is not None:
+                        breaker.record_failure()
+                        recorded = True
+                    raise DeadlineExceeded(f'Tekrar deneme icin zaman butcesi yetersiz: {last_error}') from last_error
                 logger.warning(
                     'Open-Meteo request failed (attempt %s/%s): %s',
                     attempt + 1,
                     max_retries + 1,
-                    exc,
+                    last_error,
                 )
-                await asyncio.sleep(wait_seconds)
+                with span('upstream_retry'):
+                    await asyncio.sleep(wait_seconds)
+        finally:
+            if breaker is not None and not recorded:
+                breaker.release()
+            record(f'upstream_{endpoint or "other"}', time.perf_counter() - started)
 
         logger.error('Open-Meteo API error: %s', last_error)
         raise last_error if last_error else RuntimeError('Open-Meteo request failed')
 
+    async def _request_batch(
+        self,
+        url: str,
+        coordinates: Sequence[Tuple[float, float]],
+        params: Dict[str, Any],
+        timeout: Optional[float] = None,
+        retries: Optional[int] = None,
+        endpoint: Optional[str] = None,
+        deadline: Optional[Deadline] = None,
+        priority: int = BULK,
+    ) -> List[Optional[Dict[str, Any]]]:
+        """Koordinatlari parcalara bolup coklu konum istegi gonder.
+
+        Sonuc listesi koordinat sirasini korur; alinamayan konumlar None olur.
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(coordinates)
+
+        async def fetch_chunk(offset: int):
+            chunk = coordinates[offset:offset + self.batch_size]
+            chunk_params = dict(params)
+            chunk_params['latitude'] = ','.join(str(lat) for lat, _ in chunk)
+            chunk_params['longitude'] = ','.join(str(lon) for _, lon in chunk)
+
+            try:
+                data = await self._request_json(url, chunk_params, timeout=timeout, retries=retries, endpoint=endpoint, deadline=deadline, priority=priority)
+            except Exception as exc:
+                logger.warning('Open-Meteo batch request failed (%s locations): %s', len(chunk), exc)
+                return
+
+            items = data if isinstance(data, list) else [data]
+            if len(items) != len(chunk):
+                logger.warning(
+                    'Open-Meteo batch response size mismatch: expected %s, got %s',
+                    len(chunk),
+                    len(items),
+                )
+                return
+
+            for index, item in enumerate(items):
+                if isinstance(item, dict):
+                    results[offset + index] = item
+
+        await asyncio.gather(*(fetch_chunk(offset) for offset in range(0, len(coordinates), self.batch_size)))
+        return results
+
+    @staticmethod
+    def _range_params(start_date: str, end_date: Optional[str], hourly: bool) -> Dict[str, Any]:
+        params: Dict[str, Any] = {
+            'start_date': start_date,
+            'end_date': end_date or start_date,
+            'timezone': 'Europe/Istanbul',
+        }
+
+        if hourly:
+            params['hourly'] = HOURLY_VARIABLES
+        else:
+            params['daily'] = DAILY_VARIABLES
+
+        return params
+
     async def get_current_weather(
         self,
         latitude: float,
         longitude: float,
         timeout: Optional[float] = None,
         retries: Optional[int] = None,
+        deadline: Optional[Deadline] = None,
+        priority: int = INTERACTIVE,
     ) -> Dict[str, Any]:
         """Anlik hava durumu al"""
         params = {
@@ -96,7 +323,22 @@ class OpenMeteoService:
             'current': HOURLY_VARIABLES,
             'timezone': 'Europe/Istanbul',
         }
-        return await self._request_json(self.base_url, params, timeout=timeout, retries=retries)
+        return await self._request_json(self.base_url, params, timeout=timeout, retries=retries, endpoint=CURRENT_ENDPOINT, deadline=deadline, priority=priority)
+
+    async def get_current_weather_batch(
+        self,
+        coordinates: Sequence[Tuple[float, float]],
+        timeout: Optional[float] = None,
+        retries: Optional[int] = None,
+        deadline: Optional[Deadline] = None,
+        priority: int = BULK,
+    ) -> List[Optional[Dict[str, Any]]]:
+        """Birden cok konum icin anlik hava durumu al"""
+        params = {
+            'current': HOURLY_VARIABLES,
+            'timezone': 'Europe/Istanbul',
+        }
+        return await self._request_batch(self.base_url, coordinates, params, timeout=timeout, retries=retries, endpoint=CURRENT_ENDPOINT, deadline=deadline, priority=priority)
 
     async def get_historical_weather(
         self,
@@ -107,22 +349,31 @@ class OpenMeteoService:
         hourly: bool = True,
         timeout: Optional[float] = None,
         retries: Optional[int] = None,
+        deadline: Optional[Deadline] = None,
+        priority: int = INTERACTIVE,
     ) -> Dict[str, Any]:
         """Gecmis hava durumu al (saatlik veya gunluk)"""
-        params: Dict[str, Any] = {
+        params = {
             'latitude': latitude,
             'longitude': longitude,
-            'start_date': start_date,
-            'end_date': end_date or start_date,
-            'timezone': 'Europe/Istanbul',
+            **self._range_params(start_date, end_date, hourly),
         }
+        return await self._request_json(self.archive_url, params, timeout=timeout, retries=retries, endpoint=ARCHIVE_ENDPOINT, deadline=deadline, priority=priority)
 
-        if hourly:
-            params['hourly'] = HOURLY_VARIABLES
-        else:
-            params['daily'] = DAILY_VARIABLES
-
-        return await self._request_json(self.archive_url, params, timeout=timeout, retries=retries)
+    async def get_historical_weather_batch(
+        self,
+        coordinates: Sequence[Tuple[float, float]],
+        start_date: str,
+        end_date: Optional[str] = None,
+        hourly: bool = True,
+        timeout: Optional[float] = None,
+        retries: Optional[int] = None,
+        deadline: Optional[Deadline] = None,
+        priority: int = BULK,
+    ) -> List[Optional[Dict[str, Any]]]:
+        """Birden cok konum icin gecmis hava durumu al"""
+        params = self._range_params(start_date, end_date, hourly)
+        return await self._request_batch(self.archive_url, coordinates, params, timeout=timeout, retries=retries, endpoint=ARCHIVE_ENDPOINT, deadline=deadline, priority=priority)
 
     async def get_recent_weather(
         self,
@@ -133,22 +384,31 @@ class OpenMeteoService:
         hourly: bool = True,
         timeout: Optional[float] = None,
         retries: Optional[int] = None,
+        deadline: Optional[Deadline] = None,
+        priority: int = INTERACTIVE,
     ) -> Dict[str, Any]:
         """Forecast API ile yakin tarih araligi verisi al."""
-        params: Dict[str, Any] = {
+        params = {
             'latitude': latitude,
             'longitude': longitude,
-            'start_date': start_date,
-            'end_date': end_date or start_date,
-            'timezone': 'Europe/Istanbul',
+            **self._range_params(start_date, end_date, hourly),
         }
+        return await self._request_json(self.base_url, params, timeout=timeout, retries=retries, endpoint=FORECAST_ENDPOINT, deadline=deadline, priority=priority)
 
-        if hourly:
-            params['hourly'] = HOURLY_VARIABLES
-        else:
-            params['daily'] = DAILY_VARIABLES
-
-        return await self._request_json(self.base_url, params, timeout=timeout, retries=retries)
+    async def get_recent_weather_batch(
+        self,
+        coordinates: Sequence[Tuple[float, float]],
+        start_date: str,
+        end_date: Optional[str] = None,
+        hourly: bool = True,
+        timeout: Optional[float] = None,
+        retries: Optional[int] = None,
+        deadline: Optional[Deadline] = None,
+        priority: int = BULK,
+    ) -> List[Optional[Dict[str, Any]]]:
+        """Birden cok konum icin forecast API ile yakin tarih verisi al."""
+        params = self._range_params(start_date, end_date, hourly)
+        return await self._request_batch(self.base_url, coordinates, params, timeout=timeout, retries=retries, endpoint=FORECAST_ENDPOINT, deadline=deadline, priority=priority)
 
     async def get_forecast(
         self,
@@ -157,6 +417,8 @@ class OpenMeteoService:
         days: int = 7,
         timeout: Optional[float] = None,
         retries: Optional[int] = None,
+        deadline: Optional[Deadline] = None,
+        priority: int = INTERACTIVE,
     ) -> Dict[str, Any]:
         """7 gunluk tahmin al"""
         params = {
@@ -166,8 +428,31 @@ class OpenMeteoService:
             'forecast_days': days,
             'timezone': 'Europe/Istanbul',
         }
-        return await self._request_json(self.base_url, params, timeout=timeout, retries=retries)
+        return await self._request_json(self.base_url, params, timeout=timeout, retries=retries, endpoint=FORECAST_ENDPOINT, deadline=deadline, priority=priority)
 
 
 # Global instance
 open_meteo = OpenMeteoService()
+
+
+def _collect_upstream_metrics():
+    breakers = {endpoint: breaker.stats() for endpoint, breaker in open_meteo.breakers.items()}
+    yield 'openmeteo_circuit_open', 'gauge', 'Devre kesici acik mi (1) kapali mi (0).', [
+        ({'endpoint': endpoint}, 0 if stats['state'] == 'closed' else 1) for endpoint, stats in breakers.items()
+    ]
+    yield 'openmeteo_circuit_rejected_total', 'counter', 'Acik devre nedeniyle reddedilen cagrilar.', [
+        ({'endpoint': endpoint}, stats['rejected']) for endpoint, stats in breakers.items()
+    ]
+    yield 'openmeteo_circuit_trips_total', 'counter', 'Devrenin acilma sayisi.', [
+        ({'endpoint': endpoint}, stats['trips']) for endpoint, stats in breakers.items()
+    ]
+
+    scheduler = open_meteo.scheduler.stats()
+    yield 'openmeteo_scheduler_limit', 'gauge', 'Zamanlayicinin guncel eszamanlilik siniri.', [({}, scheduler['limit'])]
+    yield 'openmeteo_scheduler_in_flight', 'gauge', 'Su an upstream\'de olan cagrilar.', [({}, scheduler['in_flight'])]
+    yield 'openmeteo_scheduler_queued', 'gauge', 'Slot bekleyen cagrilar (oncelik sinifina gore).', [
+        ({'priority': priority}, queued) for priority, queued in scheduler['queued'].items()
+    ]
+
+
+register_collector(_collect_upstream_metrics)
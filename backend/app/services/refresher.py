@@ -0,0 +1,120 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+from app.utils.singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+BuildResult = Tuple[Any, float]
+
+
+class BackgroundRefresher:
+    """Bir payload'u suresi dolmadan arka planda yeniler (stale-while-revalidate).
+
+    `build` (payload, olusturulma_zamani) dondurur. Istekler her zaman elde
+    olan son iyi payload'u hemen alir; yenileme yalnizca hic veri yokken
+    beklenir.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        build: Callable[[], Awaitable[BuildResult]],
+        interval_seconds: float,
+        retry_seconds: float = 30.0,
+    ):
+        self.name = name
+        self.interval_seconds = interval_seconds
+        self.retry_seconds = retry_seconds
+        self._build = build
+        self._flight = SingleFlight(name)
+        self._latest: Optional[BuildResult] = None
+        self._task: Optional[asyncio.Task] = None
+        self._background: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def age_seconds(self) -> Optional[float]:
+        if self._latest is None:
+            return None
+        return max(0.0, time.time() - self._latest[1])
+
+    async def refresh(self) -> BuildResult:
+        """Payload'u yeniden uret; eszamanli yenilemeler tek build'de birlesir."""
+
+        async def build():
+            result = await self._build()
+            self._latest = result
+            return result
+
+        return await self._flight.do(self.name, build)
+
+    async def get(self) -> BuildResult:
+        """Son iyi payload'u dondur; bayatsa arka planda yenilemeyi tetikle."""
+        latest = self._latest
+        if latest is None:
+            return await self.refresh()
+
+        if (time.time() - latest[1]) >= self.interval_seconds and not self.running:
+            self._trigger_background_refresh()
+
+        return latest
+
+    def _trigger_background_refresh(self):
+        if self._background is not None and not self._background.done():
+            return
+
+        async def run():
+            try:
+                await self.refresh()
+            except Exception as exc:
+                logger.warning('Background refresh for %s failed: %s', self.name, exc)
+
+        self._background = asyncio.ensure_future(run())
+
+    async def _run(self):
+        while True:
+            try:
+                await self.refresh()
+                delay = max(1.0, self.interval_seconds - (self.age_seconds() or 0.0))
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning('Scheduled refresh for %s failed, retrying in %ss: %s', self.name, self.retry_seconds, exc)
+                delay = self.retry_seconds
+            await asyncio.sleep(delay)
+
+    async def start(self):
+        if self.running:
+            return
+        self._task = asyncio.create_task(self._run())
+        logger.info('Background refresher %s started (every %ss)', self.name, self.interval_seconds)
+
+    async def stop(self):
+        for task in (self._task, self._background):
+            if task is None or task.done():
+                continue
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._task = None
+        self._background = None
+
+    @property
+    def latest(self) -> Optional[BuildResult]:
+        return self._latest
+
+    def publish(self, payload: Any, timestamp: float):
+        """Baska bir yoldan uretilen payload'u, eldekinden yeniyse son iyi payload yap."""
+        if self._latest is None or timestamp > self._latest[1]:
+            self._latest = (payload, timestamp)
+
+    def clear(self):
+        """Eldeki payload'u unut (testler icin)."""
+        self._latest = None
@@ -0,0 +1,203 @@
+import math
+from typing import List
+
+import numpy as np
+
+from app.services.archive_store import INTEGER_FIELDS
+
+SNAPSHOT_FIELDS = [
+    'temperature_2m',
+    'apparent_temperature',
+    'precipitation',
+    'relative_humidity_2m',
+    'wind_speed_10m',
+    'wind_direction_10m',
+    'pressure_msl',
+    'visibility',
+    'cloud_cover',
+    'weather_code',
+]
+_FIELD_INDEX = {field: position for position, field in enumerate(SNAPSHOT_FIELDS)}
+HOURS_PER_DAY = 24
+
+
+def _hour_fraction(timestamp) -> float:
+    try:
+        time_part = str(timestamp).split('T', 1)[1]
+        hour_str, minute_str = time_part.split(':', 1)
+        return int(hour_str) + (int(minute_str[:2]) / 60.0)
+    except Exception:
+        return math.nan
+
+
+def _as_float(value) -> float:
+    if value is None:
+        return math.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+class SnapshotCube:
+    """Bir gunun saatlik snapshot verisi: il x saat x degisken float64 kup.
+
+    Saat ekseni (HH + MM/60) kurulurken bir kez cozumlenir; bir saat icin
+    snapshot almak her ilde en yakin saati vektorel olarak secip tek dilim
+    okumaktir. Eksik degerler NaN olarak tutulur.
+    """
+
+    def __init__(self, date: str, provinces: List[dict], total: int, built_at: float = 0.0):
+        self.date = date
+        self.total = total
+        self.built_at = built_at
+
+        rows = [item for item in provinces if (item.get('hourly') or {}).get('time')]
+        self.plate_codes = [item.get('plate_code') for item in rows]
+        self.names = [item.get('name') for item in rows]
+        self.times: List[list] = [list(item['hourly']['time']) for item in rows]
+
+        hours = max((len(times) for times in self.times), default=0)
+        self.hour_axis = np.full((len(rows), hours), np.nan)
+        self.values = np.full((len(rows), hours, len(SNAPSHOT_FIELDS)), np.nan)
+        for row, item in enumerate(rows):
+            hourly = item['hourly']
+            self.hour_axis[row, :len(self.times[row])] = [_hour_fraction(value) for value in self.times[row]]
+            for field, column in _FIELD_INDEX.items():
+                series = hourly.get(field)
+                if isinstance(series, list) and series:
+                    self.values[row, :len(series), column] = [_as_float(value) for value in series[:hours]]
+
+    @classmethod
+    def from_payload(cls, date: str, payload: dict, built_at: float = 0.0) -> 'SnapshotCube':
+        return cls(date, payload.get('provinces', []), payload.get('total', 81), built_at)
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.values.nbytes + self.hour_axis.nbytes) + 32 * sum(len(times) for times in self.times)
+
+    def is_complete(self) -> bool:
+        """Tum illerde gunun her saati icin sicaklik var mi."""
+        if len(self.times) != self.total or any(len(times) < HOURS_PER_DAY for times in self.times):
+            return False
+        return not np.isnan(self.values[:, :HOURS_PER_DAY, _FIELD_INDEX['temperature_2m']]).any()
+
+    def resolve_hour_indexes(self, target_hour: float) -> np.ndarray:
+        """Her il icin hedef saate en yakin saat indeksini (esitlikte ilki) dondur."""
+        if self.hour_axis.size == 0:
+            return np.zeros(len(self.times), dtype=np.intp)
+        distance = np.abs(self.hour_axis - target_hour)
+        distance[np.isnan(distance)] = np.inf
+        return np.argmin(distance, axis=1)
+
+    def select(self, target_hour: float) -> List[dict]:
+        """Hedef saatteki il kayitlarini snapshot satiri olarak dondur."""
+        if not self.times:
+            return []
+
+        rows = np.arange(len(self.times))
+        indexes = self.resolve_hour_indexes(target_hour)
+        sliced = self.values[rows, indexes]
+
+        def column(field: str) -> np.ndarray:
+            return sliced[:, _FIELD_INDEX[field]]
+
+        temperature = column('temperature_2m')
+        available = ~np.isnan(temperature)
+        apparent = column('apparent_temperature')
+        apparent = np.where(np.isnan(apparent) | (apparent == 0), temperature, apparent)
+
+        def filled(field: str) -> np.ndarray:
+            return np.nan_to_num(column(field), nan=0.0)
+
+        weather_codes = filled('weather_code').astype(np.int64)
+        columns = zip(
+            temperature.tolist(),
+            apparent.tolist(),
+            filled('precipitation').tolist(),
+            filled('relative_humidity_2m').astype(np.int64).tolist(),
+            filled('wind_speed_10m').tolist(),
+            filled('wind_direction_10m').tolist(),
+            filled('pressure_msl').tolist(),
+            filled('visibility').tolist(),
+            filled('cloud_cover').astype(np.int64).tolist(),
+            weather_codes.tolist(),
+            indexes.tolist(),
+            available.tolist(),
+        )
+
+        snapshot_data = []
+        for row, values in enumerate(columns):
+            (temperature_value, apparent_value, precipitation, humidity, wind_speed, wind_direction,
+             pressure, visibility, cloud_cover, weather_code, index, has_value) = values
+            if not has_value:
+                continue
+            snapshot_data.append(
+                {
+                    'plate_code': self.plate_codes[row],
+                    'name': self.names[row],
+                    'temperature': temperature_value,
+                    'apparent_temperature': apparent_value,
+                    'precipitation': precipitation,
+                    'humidity': humidity,
+                    'wind_speed': wind_speed,
+                    'wind_direction_10m': wind_direction,
+                    'pressure_msl': pressure,
+                    'visibility': visibility,
+                    'cloud_cover': cloud_cover,
+                    'weather_code': weather_code,
+                    'icon': f'code_{weather_code}',
+                    'resolved_time': self.times[row][index],
+                }
+            )
+        return snapshot_data
+
+    def hour_grid(self) -> np.ndarray:
+        """Her il icin 00:00..23:00 saatlerine en yakin degerler: il x 24 x degisken."""
+        if not self.hour_axis.size:
+            return np.full((len(self.times), HOURS_PER_DAY, len(SNAPSHOT_FIELDS)), np.nan)
+        hours = np.arange(HOURS_PER_DAY, dtype=np.float64)
+        distance = np.abs(self.hour_axis[:, None, :] - hours[None, :, None])
+        distance[np.isnan(distance)] = np.inf
+        indexes = np.argmin(distance, axis=2)
+        return self.values[np.arange(len(self.times))[:, None], indexes]
+
+    def field_slice(self, grid: np.ndarray, field: str) -> np.ndarray:
+        return grid[:, :, _FIELD_INDEX[field]]
+
+    def day_columns(self) -> dict:
+        """Gunun tum saatleri icin kolon bazli payload.
+
+        Il kodlari ve saatler bir kez gonderilir; her degisken il-oncelikli
+        (il x saat) duz bir dizidir, eksik degerler null olur. Saat h icin
+        degerler /weather/snapshot'in h:00 icin sectigi degerlerle aynidir.
+        """
+        grid = self.hour_grid()
+        variables = {}
+        for field, column in _FIELD_INDEX.items():
+            values = grid[:, :, column].ravel()
+            missing = np.isnan(values)
+            if field in INTEGER_FIELDS:
+                numbers = np.nan_to_num(values).astype(np.int64).tolist()
+                kind = 'int'
+            else:
+                numbers = values.tolist()
+                kind = 'float'
+            variables[field] = {
+                'type': kind,
+                'values': [None if is_missing else number for number, is_missing in zip(numbers, missing.tolist())],
+            }
+
+        available = int(np.count_nonzero(~np.isnan(grid[:, :, _FIELD_INDEX['temperature_2m']]).any(axis=1))) if grid.size else 0
+        return {
+            'date': self.date,
+            'plate_codes': self.plate_codes,
+            'names': self.names,
+            'times': [f'{self.date}T{hour:02d}:00' for hour in range(HOURS_PER_DAY)],
+            'shape': [len(self.plate_codes), HOURS_PER_DAY],
+            'variables': variables,
+            'coverage': {
+                'available': available,
+                'total': self.total,
+            },
+        }
@@ -0,0 +1,188 @@
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Optional, Tuple
+from urllib.parse import parse_qsl
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Upstream calisma kipleri: canli ag, canli + kayit, yalnizca kayittan cevap.
+LIVE_MODE = 'live'
+RECORD_MODE = 'record'
+REPLAY_MODE = 'replay'
+MODES = (LIVE_MODE, RECORD_MODE, REPLAY_MODE)
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS recordings (
+    key TEXT PRIMARY KEY,
+    request TEXT NOT NULL,
+    status INTEGER NOT NULL,
+    content_type TEXT,
+    body BLOB NOT NULL,
+    recorded_at REAL NOT NULL
+)
+'''
+
+Recording = Tuple[int, Optional[str], bytes]
+
+
+def normalize_request(request: httpx.Request) -> str:
+    """Kayit anahtari icin istegin kanonik bicimi: metod, host, yol ve sirali parametreler.
+
+    Parametre sirasi ve URL kodlamasi anahtari etkilemez; ayni sorgu her
+    zaman ayni kayda duser.
+    """
+    params = sorted(parse_qsl(request.url.query.decode('ascii'), keep_blank_values=True))
+    query = '&'.join(f'{name}={value}' for name, value in params)
+    return f'{request.method} {request.url.host}{request.url.path}?{query}'
+
+
+def recording_key(canonical: str) -> str:
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:32]
+
+
+class RecordingStore:
+    """Upstream cevaplari icin SQLite deposu; govdeler zlib ile sikistirilir."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute(_SCHEMA)
+            connection.commit()
+            self._connection = connection
+        return self._connection
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def get(self, key: str) -> Optional[Recording]:
+        with self._lock:
+            row = self._connect().execute(
+                'SELECT status, content_type, body FROM recordings WHERE key = ?',
+                (key,),
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0], row[1], zlib.decompress(row[2])
+
+    def put(self, key: str, canonical: str, status: int, content_type: Optional[str], body: bytes):
+        with self._lock:
+            connection = self._connect()
+            connection.execute(
+                'INSERT OR REPLACE INTO recordings (key, request, status, content_type, body, recorded_at) VALUES (?, ?, ?, ?, ?, ?)',
+                (key, canonical, status, content_type, zlib.compress(body, 6), time.time()),
+            )
+            connection.commit()
+
+    def count(self) -> int:
+        with self._lock:
+            return self._connect().execute('SELECT COUNT(*) FROM recordings').fetchone()[0]
+
+
+def _response(request: httpx.Request, status: int, content_type: Optional[str], body: bytes) -> httpx.Response:
+    headers = {'content-type': content_type} if content_type else {}
+    return httpx.Response(status, headers=headers, content=body, request=request)
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Istekleri asil transport'a iletir; basarili (2xx) cevaplari depoya yazar.
+
+    Hata cevaplari kaydedilmez: replay'de kaydi olmayan istek gibi
+    davranirlar ve fallback zinciri ayni sekilde isler.
+    """
+
+    def __init__(self, store: RecordingStore, transport: httpx.AsyncBaseTransport):
+        self.store = store
+        self.transport = transport
+        self.recorded = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await self.transport.handle_async_request(request)
+        try:
+            body = await response.aread()
+        finally:
+            await response.aclose()
+        content_type = response.headers.get('content-type')
+        if 200 <= response.status_code < 300:
+            canonical = normalize_request(request)
+            try:
+                await asyncio.to_thread(self.store.put, recording_key(canonical), canonical, response.status_code, content_type, body)
+                self.recorded += 1
+            except sqlite3.Error as exc:
+                logger.warning('Upstream recording write failed: %s', exc)
+        return _response(request, response.status_code, content_type, body)
+
+    async def aclose(self):
+        await self.transport.aclose()
+        self.store.close()
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """Kayitli cevaplari ag erisimi olmadan dondurur.
+
+    `latency_ms` verilirse her cevap o kadar geciktirilir. Kaydi olmayan
+    istekler 404 alir; 4xx tekrar denenmez ve devre kesiciye hata yazilmaz,
+    boylece fallback zinciri bir sonraki uca gecer.
+    """
+
+    def __init__(self, store: RecordingStore, latency_ms: float = 0.0):
+        self.store = store
+        self.latency_ms = latency_ms
+        self.hits = 0
+        self.misses = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        canonical = normalize_request(request)
+        recording = await asyncio.to_thread(self.store.get, recording_key(canonical))
+        if self.latency_ms > 0:
+            await asyncio.sleep(self.latency_ms / 1000)
+        if recording is None:
+            self.misses += 1
+            logger.debug('No upstream recording for %s', canonical)
+            return _response(
+                request,
+                404,
+                'application/json',
+                b'{"error": true, "reason": "no recording for request"}',
+            )
+        self.hits += 1
+        return _response(request, *recording)
+
+    async def aclose(self):
+        self.store.close()
+
+
+def build_transport(
+    mode: str,
+    recordings_path: Optional[str],
+    replay_latency_ms: float = 0.0,
+    limits: Optional[httpx.Limits] = None,
+) -> Optional[httpx.AsyncBaseTransport]:
+    """Kipe gore istemci transport'u; canli kipte None (httpx varsayilani) doner."""
+    if mode not in MODES:
+        raise ValueError(f'Bilinmeyen upstream kipi: {mode} (beklenen: {", ".join(MODES)})')
+    if mode == LIVE_MODE:
+        return None
+    if not recordings_path:
+        raise ValueError(f'{mode} kipi icin kayit dosyasi yolu gerekli')
+    store = RecordingStore(recordings_path)
+    if mode == RECORD_MODE:
+        return RecordingTransport(store, httpx.AsyncHTTPTransport(limits=limits or httpx.Limits()))
+    return ReplayTransport(store, replay_latency_ms)
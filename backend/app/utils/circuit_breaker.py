@@ -0,0 +1,117 @@
+import logging
+import time
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(RuntimeError):
+    """Devre acikken yapilan cagri upstream'e gitmeden reddedilir."""
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f'{name} devresi acik; {retry_in:.1f} sn sonra tekrar denenecek')
+        self.name = name
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """Ardisik hatalarda bir upstream ucunu gecici olarak devre disi birakir.
+
+    closed: cagrilar serbest, ardisik hatalar sayilir. Esik asilinca open:
+    cagrilar `reset_timeout` boyunca aninda reddedilir. Sure dolunca
+    half_open: tek bir deneme cagrisina izin verilir; basariliysa devre
+    kapanir, basarisizsa yeniden acilir.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_inflight = False
+        self.trips = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+            return HALF_OPEN
+        return self._state
+
+    @property
+    def is_open(self) -> bool:
+        """Devre su an cagrilari reddediyor mu (half_open deneme suruyorsa da acik sayilir)."""
+        state = self.state
+        return state == OPEN or (state == HALF_OPEN and self._probe_inflight)
+
+    def retry_in(self) -> float:
+        if self._state != OPEN:
+            return 0.0
+        return max(0.0, self.reset_timeout - (self._clock() - self._opened_at))
+
+    def allow(self) -> bool:
+        """Cagriya izin ver; half_open'da yalnizca tek deneme gecer."""
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and not self._probe_inflight:
+            self._state = HALF_OPEN
+            self._probe_inflight = True
+            return True
+        self.rejected += 1
+        return False
+
+    def check(self):
+        """Izin yoksa CircuitOpenError yukselt."""
+        if not self.allow():
+            raise CircuitOpenError(self.name, self.retry_in())
+
+    def record_success(self):
+        if self._state != CLOSED:
+            logger.info('Circuit %s closed', self.name)
+        self._state = CLOSED
+        self._failures = 0
+        self._probe_inflight = False
+
+    def record_failure(self):
+        self._failures += 1
+        if self._state == HALF_OPEN or (self._state == CLOSED and self._failures >= self.failure_threshold):
+            self._open()
+        self._probe_inflight = False
+
+    def _open(self):
+        self._state = OPEN
+        self._opened_at = self._clock()
+        self.trips += 1
+        logger.warning('Circuit %s opened after %s consecutive failures', self.name, self._failures)
+
+    def release(self):
+        """Sonucu kaydedilmeden biten (iptal edilen) deneme cagrisinin hakkini geri ver."""
+        self._probe_inflight = False
+
+    def reset(self):
+        self._state = CLOSED
+        self._failures = 0
+        self._probe_inflight = False
+
+    def stats(self) -> Dict[str, Optional[float]]:
+        return {
+            'state': self.state,
+            'consecutive_failures': self._failures,
+            'retry_in_seconds': round(self.retry_in(), 1) if self._state == OPEN else None,
+            'trips': self.trips,
+            'rejected': self.rejected,
+        }
@@ -0,0 +1,54 @@
+import asyncio
+import time
+from typing import Callable, Optional
+
+
+class DeadlineExceeded(TimeoutError):
+    """Istegin zaman butcesi bitti; kalan adimlar calistirilmaz."""
+
+
+class Deadline:
+    """Bir istegin uctan uca zaman butcesi.
+
+    Router'da baslatilir ve upstream cagrilarina kadar tasinir: her deneme,
+    bekleme ve fallback adimi kalan sureden pay alir. Butce yuzunden is
+    birakilirsa `degraded` isaretlenir; boyle sonuclar cache'e yazilmaz.
+    """
+
+    def __init__(self, seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.seconds = seconds
+        self._clock = clock
+        self.expires_at = clock() + seconds
+        self.degraded = False
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - self._clock())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def check(self):
+        if self.expired:
+            raise DeadlineExceeded(f'{self.seconds:.1f} sn zaman butcesi asildi')
+
+    def timeout(self, cap: Optional[float] = None) -> float:
+        """Bir adima verilecek sure: `cap` ile kalan butcenin kucugu; butce bittiyse hata."""
+        self.check()
+        remaining = self.remaining()
+        return remaining if cap is None else min(cap, remaining)
+
+    def mark_degraded(self):
+        self.degraded = True
+
+    async def wait(self, tasks: list) -> list:
+        """Task'lari kalan butce kadar bekle; yetismeyenler iptal edilip None doner."""
+        if not tasks:
+            return []
+        done, pending = await asyncio.wait(tasks, timeout=self.remaining())
+        for task in pending:
+            task.cancel()
+        if pending:
+            self.mark_degraded()
+        return [task.result() if task in done and not task.cancelled() and task.exception() is None else None for task in tasks]
+
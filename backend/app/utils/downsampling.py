@@ -0,0 +1,156 @@
+from datetime import date, timedelta
+from typing import List, Optional
+
+import numpy as np
+
+INTEGER_FIELDS = {'relative_humidity_2m', 'cloud_cover', 'weather_code'}
+
+# Varsayilan toplama ortalamadir; asagidaki degiskenler farkli toplanir.
+AGGREGATIONS = {
+    'precipitation': 'sum',
+    'precipitation_sum': 'sum',
+    'temperature_2m_max': 'max',
+    'temperature_2m_min': 'min',
+    'weather_code': 'max',
+    'wind_direction_10m': 'circular_mean',
+}
+
+
+def _column(values, size: int) -> np.ndarray:
+    column = np.full(size, np.nan)
+    if isinstance(values, list):
+        column[:len(values)] = [np.nan if value is None else value for value in values[:size]]
+    return column
+
+
+def _to_list(field: str, column: np.ndarray) -> List:
+    missing = np.isnan(column)
+    if field in INTEGER_FIELDS:
+        numbers = np.rint(np.nan_to_num(column)).astype(np.int64).tolist()
+    else:
+        numbers = np.round(column, 2).tolist()
+    return [None if is_missing else number for number, is_missing in zip(numbers, missing.tolist())]
+
+
+def _bucket_label(timestamp: str, resolution: str) -> str:
+    if resolution == 'hour':
+        return timestamp[:13] + ':00' if len(timestamp) > 10 else timestamp
+    if resolution == 'day':
+        return timestamp[:10]
+    if resolution == 'month':
+        return timestamp[:7] + '-01'
+    day = date.fromisoformat(timestamp[:10])
+    return (day - timedelta(days=day.weekday())).isoformat()
+
+
+def _reduce(column: np.ndarray, starts: np.ndarray, how: str) -> np.ndarray:
+    present = ~np.isnan(column)
+    counts = np.add.reduceat(present.astype(np.int64), starts)
+    if how == 'max':
+        reduced = np.fmax.reduceat(column, starts)
+    elif how == 'min':
+        reduced = np.fmin.reduceat(column, starts)
+    elif how == 'circular_mean':
+        radians = np.deg2rad(np.nan_to_num(column))
+        sin_sum = np.add.reduceat(np.where(present, np.sin(radians), 0.0), starts)
+        cos_sum = np.add.reduceat(np.where(present, np.cos(radians), 0.0), starts)
+        reduced = np.mod(np.rad2deg(np.arctan2(sin_sum, cos_sum)), 360.0)
+    else:
+        sums = np.add.reduceat(np.nan_to_num(column), starts)
+        reduced = sums if how == 'sum' else sums / np.maximum(counts, 1)
+    return np.where(counts > 0, reduced, np.nan)
+
+
+def aggregate_series(series: dict, resolution: str) -> dict:
+    """Seriyi saat/gun/hafta/ay kovalarina topla; kova etiketi kovanin baslangicidir.
+
+    Zaman damgalari sirali oldugundan kovalar ardisiktir ve her degisken
+    tek bir `reduceat` ile toplanir.
+    """
+    times = [str(value) for value in series.get('time') or []]
+    if not times:
+        return series
+
+    labels = [_bucket_label(value, resolution) for value in times]
+    boundaries = [0] + [index for index in range(1, len(labels)) if labels[index] != labels[index - 1]]
+    if len(boundaries) == len(labels) and labels == times:
+        return series
+
+    starts = np.asarray(boundaries, dtype=np.intp)
+    aggregated = {'time': [labels[index] for index in boundaries]}
+    for field, values in series.items():
+        if field == 'time':
+            continue
+        if not isinstance(values, list):
+            aggregated[field] = values
+            continue
+        column = _reduce(_column(values, len(times)), starts, AGGREGATIONS.get(field, 'mean'))
+        aggregated[field] = _to_list(field, column)
+    return aggregated
+
+
+def lttb_indices(values: np.ndarray, max_points: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets ile seriyi temsil eden indeksleri sec.
+
+    Ilk ve son nokta her zaman korunur; her kovada, bir onceki secilen
+    nokta ile sonraki kovanin ortalamasi arasinda en buyuk ucgeni olusturan
+    nokta secilir. Kova icindeki alan hesabi vektoreldir.
+    """
+    size = len(values)
+    if max_points >= size or max_points < 3:
+        return np.arange(size)
+
+    filled = values.copy()
+    missing = np.isnan(filled)
+    if missing.all():
+        return np.linspace(0, size - 1, max_points).round().astype(np.intp)
+    if missing.any():
+        positions = np.arange(size)
+        filled[missing] = np.interp(positions[missing], positions[~missing], filled[~missing])
+
+    edges = np.linspace(1, size - 1, max_points - 1).astype(np.intp)
+    selected = np.empty(max_points, dtype=np.intp)
+    selected[0] = 0
+    selected[-1] = size - 1
+
+    previous = 0
+    for bucket in range(max_points - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_start, next_end = end, edges[bucket + 2] if bucket + 2 < len(edges) else size
+        next_x = (next_start + next_end - 1) / 2.0
+        next_y = filled[next_start:next_end].mean()
+
+        candidates = np.arange(start, end)
+        areas = np.abs(
+            (previous - next_x) * (filled[candidates] - filled[previous])
+            - (previous - candidates) * (next_y - filled[previous])
+        )
+        previous = int(candidates[np.argmax(areas)])
+        selected[bucket + 1] = previous
+    return selected
+
+
+def downsample_series(series: dict, max_points: int, primary_field: str) -> dict:
+    """Tum degiskenleri birincil degiskenin LTTB ile secilen noktalarina indir."""
+    times = series.get('time') or []
+    if len(times) <= max_points:
+        return series
+
+    indexes = lttb_indices(_column(series.get(primary_field), len(times)), max_points).tolist()
+    sampled = {}
+    for field, values in series.items():
+        if isinstance(values, list):
+            sampled[field] = [values[index] if index < len(values) else None for index in indexes]
+        else:
+            sampled[field] = values
+    return sampled
+
+
+def reduce_series(series: dict, primary_field: str, resolution: Optional[str] = None, max_points: Optional[int] = None) -> dict:
+    """Once istenen cozunurluge topla, sonra gerekirse nokta sayisini sinirla."""
+    if resolution:
+        series = aggregate_series(series, resolution)
+    if max_points:
+        series = downsample_series(series, max_points, primary_field)
+    return series
+
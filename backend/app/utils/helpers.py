@@ -1 +1,103 @@
-# Placeholder: Helper fonksiyonları gelecek
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+DateRange = Tuple[date, date]
+
+
+def merge_series(*series_list: Optional[dict]) -> dict:
+    """Ayni degiskenlere sahip zaman serilerini `time` alanina gore birlestir.
+
+    Ayni zaman damgasi birden fazla seride varsa ilk gorulen deger korunur;
+    sonuc zamana gore siralidir.
+    """
+    parts = [series for series in series_list if isinstance(series, dict) and series.get('time')]
+    if not parts:
+        return {'time': []}
+    if len(parts) == 1:
+        return parts[0]
+
+    fields = []
+    for series in parts:
+        for field in series:
+            if field != 'time' and field not in fields:
+                fields.append(field)
+
+    rows = {}
+    for series in parts:
+        for index, timestamp in enumerate(series['time']):
+            if timestamp in rows:
+                continue
+            rows[timestamp] = (series, index)
+
+    ordered_times = sorted(rows)
+    merged = {'time': ordered_times}
+    for field in fields:
+        column = []
+        for timestamp in ordered_times:
+            series, index = rows[timestamp]
+            values = series.get(field)
+            column.append(values[index] if isinstance(values, list) and index < len(values) else None)
+        merged[field] = column
+    return merged
+
+
+def to_date_ranges(days: Iterable[date]) -> List[DateRange]:
+    """Gun listesini ardisik (baslangic, bitis) araliklarina donustur."""
+    ranges: List[DateRange] = []
+    for day in sorted(set(days)):
+        if ranges and ranges[-1][1] + timedelta(days=1) == day:
+            ranges[-1] = (ranges[-1][0], day)
+        else:
+            ranges.append((day, day))
+    return ranges
+
+
+def plan_fetch_ranges(missing_days: Iterable[date], max_bridge_days: int = 0) -> List[DateRange]:
+    """Eksik gunleri en az sayida upstream cagrisina bol.
+
+    Aralarinda en fazla `max_bridge_days` gun (zaten cache'te olan) bulunan
+    bosluklar tek araliga birlestirilir; birkac gunu tekrar cekmek ayri bir
+    cagridan ucuzdur.
+    """
+    planned: List[DateRange] = []
+    for start, end in to_date_ranges(missing_days):
+        if planned and (start - planned[-1][1]).days - 1 <= max_bridge_days:
+            planned[-1] = (planned[-1][0], end)
+        else:
+            planned.append((start, end))
+    return planned
+
+
+def split_by_year(start: date, end: date) -> List[DateRange]:
+    """Araligi takvim yili sinirlarindan parcalara bol."""
+    chunks: List[DateRange] = []
+    chunk_start = start
+    while chunk_start <= end:
+        chunk_end = min(end, date(chunk_start.year, 12, 31))
+        chunks.append((chunk_start, chunk_end))
+        chunk_start = chunk_end + timedelta(days=1)
+    return chunks
+
+
+def split_series_by_day(series: Optional[dict]) -> Dict[str, dict]:
+    """Zaman serisini `YYYY-MM-DD` anahtarli gunluk parcalara bol."""
+    if not isinstance(series, dict):
+        return {}
+
+    times = series.get('time') or []
+    fields = [field for field in series if field != 'time']
+    positions: Dict[str, List[int]] = {}
+    for index, timestamp in enumerate(times):
+        positions.setdefault(str(timestamp)[:10], []).append(index)
+
+    segments = {}
+    for day, indexes in positions.items():
+        segment = {'time': [times[index] for index in indexes]}
+        for field in fields:
+            values = series.get(field)
+            if isinstance(values, list):
+                segment[field] = [values[index] if index < len(values) else None for index in indexes]
+            else:
+                segment[field] = values
+        segments[day] = segment
+    return segments
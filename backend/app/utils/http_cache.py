@@ -0,0 +1,174 @@
+import gzip
+import hashlib
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Any, Hashable, Optional
+
+from fastapi import Request, Response
+
+from app.utils.lru_cache import LRUCache
+from app.utils.wire_formats import ARROW_MEDIA_TYPE, JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE, TablePath, arrow_available, encode, negotiate
+
+GZIP_MIN_BYTES = 512
+IMMUTABLE_MAX_AGE_SECONDS = 365 * 24 * 3600
+
+
+def compute_etag(body: bytes) -> str:
+    """Govde icerigine bagli guclu ETag."""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match basligi verilen ETag ile eslesiyor mu (W/ onekli ve '*' dahil)."""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate == '*':
+            return True
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def not_modified_since(if_modified_since: Optional[str], last_modified: float) -> bool:
+    """If-Modified-Since basligindaki zaman kaydin olusturulma zamanindan yeni mi."""
+    if not if_modified_since:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since).timestamp()
+    except (TypeError, ValueError, IndexError, OverflowError):
+        return False
+    return int(last_modified) <= since
+
+
+def http_date(timestamp: float) -> str:
+    return formatdate(timestamp, usegmt=True)
+
+
+def cache_control_for(ttl_seconds: float, timestamp: float, immutable: bool = False, now: Optional[float] = None) -> str:
+    """Kaydin kalan TTL'ine gore Cache-Control; degismeyecek veriler icin uzun omurlu."""
+    if immutable:
+        return f'public, max-age={IMMUTABLE_MAX_AGE_SECONDS}, immutable'
+    remaining = ttl_seconds - ((time.time() if now is None else now) - timestamp)
+    return f'public, max-age={max(0, int(remaining))}'
+
+
+def accepts_gzip(request: Request) -> bool:
+    return 'gzip' in request.headers.get('accept-encoding', '').lower()
+
+
+class PreparedResponse:
+    """Bir kez serilestirilmis, ETag'li ve onceden sikistirilmis sabit yanit."""
+
+    def __init__(
+        self,
+        body: bytes,
+        media_type: str = 'application/json',
+        cache_control: str = 'public, max-age=3600',
+    ):
+        self.body = body
+        self.media_type = media_type
+        self.cache_control = cache_control
+        self.etag = compute_etag(body)
+        self.gzip_body = gzip.compress(body, compresslevel=9, mtime=0) if len(body) >= GZIP_MIN_BYTES else None
+
+    def _headers(self) -> dict:
+        return {
+            'ETag': self.etag,
+            'Cache-Control': self.cache_control,
+            'Vary': 'Accept-Encoding',
+        }
+
+    def respond(self, request: Request) -> Response:
+        headers = self._headers()
+        if etag_matches(request.headers.get('if-none-match'), self.etag):
+            return Response(status_code=304, headers=headers)
+
+        if self.gzip_body is not None and accepts_gzip(request):
+            headers['Content-Encoding'] = 'gzip'
+            return Response(content=self.gzip_body, media_type=self.media_type, headers=headers)
+
+        return Response(content=self.body, media_type=self.media_type, headers=headers)
+
+
+class EncodedBody:
+    __slots__ = ('body', 'etag', 'last_modified', 'media_type')
+
+    def __init__(self, body: bytes, last_modified: float, media_type: str = JSON_MEDIA_TYPE):
+        self.body = body
+        self.etag = compute_etag(body)
+        self.last_modified = last_modified
+        self.media_type = media_type
+
+
+class EncodedBodyCache:
+    """Cache kayitlarinin serilestirilmis govdesini ve ETag'ini tutar.
+
+    Anahtar ve bicim (JSON/MessagePack/Arrow) basina tek govde saklanir ve
+    kaydin olusturulma zamaniyla dogrulanir; kayit yeniden uretildiginde
+    govde de yeniden serilestirilir.
+    """
+
+    def __init__(self, max_bytes: int):
+        self._bodies = LRUCache(max_bytes=max_bytes, sizeof=lambda encoded: len(encoded.body))
+
+    def lookup(self, key: Hashable, timestamp: float, media_type: str = JSON_MEDIA_TYPE) -> Optional[EncodedBody]:
+        """Ayni zaman damgasiyla serilestirilmis govde varsa dondur."""
+        encoded = self._bodies.get((key, media_type))
+        if encoded is not None and encoded.last_modified == timestamp:
+            return encoded
+        return None
+
+    def encode(
+        self,
+        key: Hashable,
+        payload: Any,
+        timestamp: float,
+        media_type: str = JSON_MEDIA_TYPE,
+        table_path: Optional[TablePath] = None,
+    ) -> EncodedBody:
+        encoded = self.lookup(key, timestamp, media_type)
+        if encoded is not None:
+            return encoded
+
+        encoded = EncodedBody(encode(payload, media_type, table_path), timestamp, media_type)
+        self._bodies.put((key, media_type), encoded)
+        return encoded
+
+    def clear(self):
+        self._bodies.clear()
+
+    def stats(self):
+        return self._bodies.stats()
+
+
+def negotiate_media_type(request: Request, arrow: bool = True) -> str:
+    """Accept basligina gore yanit bicimi; Arrow yalnizca tablo iceren yanitlar ve pyarrow kuruluysa sunulur."""
+    offered = [JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE]
+    if arrow and arrow_available():
+        offered.append(ARROW_MEDIA_TYPE)
+    return negotiate(request.headers.get('accept'), offered)
+
+
+def conditional_response(request: Request, encoded: EncodedBody, cache_control: str, headers: Optional[dict] = None) -> Response:
+    """ETag/Last-Modified basliklariyla yanit; kosullu istek eslesirse 304."""
+    headers = {
+        **(headers or {}),
+        'ETag': encoded.etag,
+        'Last-Modified': http_date(encoded.last_modified),
+        'Cache-Control': cache_control,
+        'Vary': 'Accept',
+    }
+
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match is not None:
+        not_modified = etag_matches(if_none_match, encoded.etag)
+    else:
+        not_modified = not_modified_since(request.headers.get('if-modified-since'), encoded.last_modified)
+    if not_modified:
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=encoded.body, media_type=encoded.media_type, headers=headers)
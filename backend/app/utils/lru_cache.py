@@ -0,0 +1,161 @@
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+# Sayi, bool ve null icin JSON'daki ortalama yer (ayrac dahil).
+SCALAR_BYTES = 8
+UNKNOWN_BYTES = 256
+
+
+def estimate_size(value: Any) -> int:
+    """Degerin yaklasik JSON boyutu (byte); serilestirmeden, yapiyi gezerek hesaplanir.
+
+    Listeler tek tip kabul edilir: ilk elemani kap (dict/list) olmayan
+    listenin boyu ilk elemandan carpilarak bulunur, boylece uzun zaman
+    serileri eleman sayisindan bagimsiz surede olculur.
+    """
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value)
+    if value is None or isinstance(value, (bool, int, float)):
+        return SCALAR_BYTES
+    if isinstance(value, dict):
+        return 2 + sum(len(str(key)) + 4 + estimate_size(item) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        if not value:
+            return 2
+        if not isinstance(value[0], (dict, list, tuple)):
+            return 2 + len(value) * estimate_size(value[0])
+        return 2 + sum(estimate_size(item) for item in value)
+    return UNKNOWN_BYTES
+
+
+class _Entry:
+    __slots__ = ('value', 'size', 'timestamp', 'expires_at')
+
+    def __init__(self, value: Any, size: int, timestamp: float, expires_at: Optional[float]):
+        self.value = value
+        self.size = size
+        self.timestamp = timestamp
+        self.expires_at = expires_at
+
+
+class LRUCache:
+    """O(1) get/put/evict yapan LRU + TTL cache; limit byte cinsinden tutulur.
+
+    Kayitlar erisim sirasina gore OrderedDict'te durur: okuma kaydi sona
+    tasir, tasma durumunda en eski kayit bastan atilir. Her kaydin kendi
+    TTL'i olabilir; suresi dolan kayit ilk okumada silinir.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        max_entries: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        sizeof: Callable[[Any], int] = estimate_size,
+    ):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.sizeof = sizeof
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.rejections = 0
+        self._entries: 'OrderedDict[Hashable, _Entry]' = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get_entry(key, count=False) is not None
+
+    def get_entry(self, key: Hashable, now: Optional[float] = None, count: bool = True) -> Optional[Tuple[Any, float]]:
+        """Kaydi (deger, olusturulma_zamani) olarak dondur; yoksa veya suresi dolduysa None."""
+        entry = self._entries.get(key)
+        if entry is None:
+            if count:
+                self.misses += 1
+            return None
+
+        if entry.expires_at is not None and (time.time() if now is None else now) > entry.expires_at:
+            self._remove(key)
+            self.expirations += 1
+            if count:
+                self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        if count:
+            self.hits += 1
+        return entry.value, entry.timestamp
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self.get_entry(key)
+        return default if entry is None else entry[0]
+
+    def put(
+        self,
+        key: Hashable,
+        value: Any,
+        ttl_seconds: Optional[float] = None,
+        timestamp: Optional[float] = None,
+        size: Optional[int] = None,
+    ) -> bool:
+        """Kaydi ekle; tek basina butceyi asan degerler saklanmaz (False doner)."""
+        timestamp = time.time() if timestamp is None else timestamp
+        size = self.sizeof(value) if size is None else size
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+
+        if key in self._entries:
+            self._remove(key)
+
+        if size > self.max_bytes:
+            self.rejections += 1
+            return False
+
+        expires_at = None if ttl is None else timestamp + ttl
+        self._entries[key] = _Entry(value, size, timestamp, expires_at)
+        self.current_bytes += size
+        self._evict()
+        return True
+
+    def pop(self, key: Hashable) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._remove(key)
+        return entry.value
+
+    def clear(self):
+        self._entries.clear()
+        self.current_bytes = 0
+
+    def _remove(self, key: Hashable):
+        entry = self._entries.pop(key)
+        self.current_bytes -= entry.size
+
+    def _evict(self):
+        while self._entries and (
+            self.current_bytes > self.max_bytes
+            or (self.max_entries is not None and len(self._entries) > self.max_entries)
+        ):
+            _, entry = self._entries.popitem(last=False)
+            self.current_bytes -= entry.size
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'entries': len(self._entries),
+            'bytes': self.current_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'rejections': self.rejections,
+        }
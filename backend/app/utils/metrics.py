@@ -0,0 +1,203 @@
+"""Prometheus metin bicimi (0.0.4) icin hafif metrik kaydi.
+
+Sicak yoldaki sayaclar duz dict artirimidir: tum guncellemeler tek event
+loop thread'inde yapildigindan kilit gerekmez. Cache ve devre kesici gibi
+zaten sayac tutan bilesenler kayit aninda degil, `/api/metrics`
+okunurken toplayici fonksiyonlarla (collector) cekilir.
+"""
+import time
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+Sample = Tuple[str, Dict[str, str], float]
+# Toplayicinin urettigi aile: (ad, tur, aciklama, [(etiketler, deger), ...])
+Family = Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Yerel cache'ten upstream fan-out'a kadar yayilan gecikmeler icin (saniye).
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_metrics: List['_Metric'] = []
+_collectors: List[Callable[[], Iterable[Family]]] = []
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric(ABC):
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        _metrics.append(self)
+
+    def _labels(self, values: LabelValues) -> Dict[str, str]:
+        return dict(zip(self.labelnames, values))
+
+    @abstractmethod
+    def samples(self) -> Iterable[Sample]:
+        ...
+
+    @abstractmethod
+    def reset(self):
+        ...
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def samples(self) -> Iterable[Sample]:
+        for labels, value in self._values.items():
+            yield self.name, self._labels(labels), value
+
+    def reset(self):
+        self._values.clear()
+
+
+class Gauge(_Metric):
+    kind = 'gauge'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, value: float, *labels: str):
+        self._values[labels] = value
+
+    def value(self, *labels: str) -> Optional[float]:
+        return self._values.get(labels)
+
+    def samples(self) -> Iterable[Sample]:
+        for labels, value in self._values.items():
+            yield self.name, self._labels(labels), value
+
+    def reset(self):
+        self._values.clear()
+
+
+class Histogram(_Metric):
+    """Sabit kovali histogram; gozlem bir ikili arama ve iki toplamadir."""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Etiket basina [kova sayaclari..., +Inf], toplam
+        self._series: Dict[LabelValues, list] = {}
+
+    def observe(self, value: float, *labels: str):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return 0 if series is None else sum(series[0])
+
+    def samples(self) -> Iterable[Sample]:
+        for labels, (counts, total) in self._series.items():
+            base = self._labels(labels)
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                yield f'{self.name}_bucket', {**base, 'le': _format_value(bound)}, cumulative
+            yield f'{self.name}_count', base, cumulative
+            yield f'{self.name}_sum', base, total
+
+    def reset(self):
+        self._series.clear()
+
+
+def register_collector(collect: Callable[[], Iterable[Family]]):
+    """Okuma aninda metrik aileleri ureten fonksiyon ekle (orn. mevcut cache sayaclari)."""
+    _collectors.append(collect)
+
+
+def render() -> str:
+    """Tum metrikleri Prometheus metin biciminde yaz."""
+    lines: List[str] = []
+
+    def family(name: str, kind: str, documentation: str, samples: Iterable[Sample]):
+        lines.append(f'# HELP {name} {documentation}')
+        lines.append(f'# TYPE {name} {kind}')
+        for sample_name, labels, value in samples:
+            lines.append(f'{sample_name}{_format_labels(labels)} {_format_value(value)}')
+
+    for metric in _metrics:
+        family(metric.name, metric.kind, metric.documentation, metric.samples())
+    for collect in _collectors:
+        for name, kind, documentation, samples in collect():
+            family(name, kind, documentation, ((name, labels, value) for labels, value in samples))
+    return '\n'.join(lines) + '\n'
+
+
+def reset():
+    """Sicak yol metriklerini sifirla (testler icin); toplayicilar etkilenmez."""
+    for metric in _metrics:
+        metric.reset()
+
+
+class MetricsMiddleware:
+    """Her HTTP istegi icin rota sablonu, metod ve durum koduyla gecikme olcer.
+
+    Saf ASGI middleware'dir; govde akisi bitene kadar gecen sure olculur,
+    boylece akis yanitlari da tam sureleriyle sayilir. Eslesmeyen yollar tek
+    `unmatched` etiketinde toplanir.
+    """
+
+    def __init__(self, app, histogram: 'Histogram'):
+        self.app = app
+        self.histogram = histogram
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = {'code': 500}
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                status['code'] = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get('route')
+            path = getattr(route, 'path', None) or 'unmatched'
+            self.histogram.observe(time.perf_counter() - started, path, scope.get('method', ''), str(status['code']))
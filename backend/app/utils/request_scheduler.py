@@ -0,0 +1,194 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable, Dict, List, Optional
+
+from app.utils.deadline import Deadline, DeadlineExceeded
+
+logger = logging.getLogger(__name__)
+
+# Oncelik siniflari: kucuk deger once calisir.
+INTERACTIVE = 0
+BULK = 1
+BACKGROUND = 2
+PRIORITY_NAMES = {INTERACTIVE: 'interactive', BULK: 'bulk', BACKGROUND: 'background'}
+
+
+class TokenBucket:
+    """Saniyede `rate` jeton uretip en fazla `capacity` biriktiren hiz sinirlayici.
+
+    `reserve` jetonu hemen dusurur ve jetonun hazir olmasina kalan sureyi
+    dondurur; borc birikebildigi icin bekleyenler sirayla dagitilir.
+    """
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = max(1.0, capacity)
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    @property
+    def tokens(self) -> float:
+        self._refill()
+        return self._tokens
+
+    def reserve(self) -> float:
+        self._refill()
+        self._tokens -= 1.0
+        return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+
+class _Ticket:
+    __slots__ = ('priority', 'started', 'overloaded')
+
+    def __init__(self, priority: int, started: float):
+        self.priority = priority
+        self.started = started
+        self.overloaded: Optional[bool] = None
+
+    def observe(self, overloaded: bool):
+        """Cagri sonucunu bildir: 429/5xx/ag hatasi overloaded, diger cevaplar basari."""
+        self.overloaded = overloaded
+
+
+class RequestScheduler:
+    """Tum upstream cagrilarinin paylastigi oncelikli, uyarlanir eszamanlilik siniri.
+
+    Slotlar oncelik sirasina gore (esitlikte gelis sirasi) dagitilir; boylece
+    tek illik etkilesimli istekler 81 illik toplu islerin onune gecer.
+    Eszamanlilik siniri AIMD ile ayarlanir: hedef gecikmenin altinda biten
+    her cagri siniri 1/sinir kadar artirir, 429/5xx/ag hatasi ya da hedefin
+    iki katini asan gecikme siniri `decrease_factor` ile carpar (en fazla
+    `decrease_interval` saniyede bir). Slot alan cagri ayrica token bucket
+    hiz sinirindan jeton bekler.
+    """
+
+    def __init__(
+        self,
+        initial_limit: float = 10,
+        min_limit: float = 2,
+        max_limit: float = 32,
+        rate_per_second: float = 0,
+        burst: float = 20,
+        target_latency: float = 2.0,
+        decrease_factor: float = 0.7,
+        decrease_interval: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max(min_limit, max_limit)
+        self.limit = min(self.max_limit, max(self.min_limit, initial_limit))
+        self.target_latency = target_latency
+        self.decrease_factor = decrease_factor
+        self.decrease_interval = decrease_interval
+        self._clock = clock
+        self.bucket = TokenBucket(rate_per_second, burst, clock) if rate_per_second > 0 else None
+        self.in_flight = 0
+        self._waiters: List[tuple] = []
+        self._sequence = itertools.count()
+        self._last_decrease = float('-inf')
+        self.granted = {name: 0 for name in PRIORITY_NAMES.values()}
+        self.increases = 0
+        self.decreases = 0
+        self.throttled_seconds = 0.0
+
+    def _has_capacity(self) -> bool:
+        return self.in_flight < max(1, int(self.limit))
+
+    def _dispatch(self):
+        while self._waiters and self._has_capacity():
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                continue
+            self.in_flight += 1
+            future.set_result(None)
+
+    async def _acquire(self, priority: int, deadline: Optional[Deadline]):
+        if not self._waiters and self._has_capacity():
+            self.in_flight += 1
+        else:
+            future = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+            try:
+                if deadline is None:
+                    await future
+                else:
+                    await asyncio.wait_for(asyncio.shield(future), timeout=deadline.remaining())
+            except BaseException as exc:
+                if future.done() and not future.cancelled():
+                    # Slot verilmisti ama bekleyen vazgecti; slotu geri birak.
+                    self._release()
+                else:
+                    future.cancel()
+                if isinstance(exc, asyncio.TimeoutError):
+                    raise DeadlineExceeded('Upstream kuyrugunda zaman butcesi doldu') from exc
+                raise
+
+        self.granted[PRIORITY_NAMES.get(priority, 'bulk')] += 1
+        if self.bucket is not None:
+            wait = self.bucket.reserve()
+            if wait > 0:
+                if deadline is not None and wait >= deadline.remaining():
+                    self._release()
+                    raise DeadlineExceeded('Hiz siniri beklemesi zaman butcesini asiyor')
+                self.throttled_seconds += wait
+                try:
+                    await asyncio.sleep(wait)
+                except BaseException:
+                    self._release()
+                    raise
+
+    def _release(self):
+        self.in_flight -= 1
+        self._dispatch()
+
+    def _record(self, ticket: _Ticket):
+        if ticket.overloaded is None:
+            return
+        latency = self._clock() - ticket.started
+        if ticket.overloaded or latency > 2 * self.target_latency:
+            now = self._clock()
+            if now - self._last_decrease >= self.decrease_interval:
+                self._last_decrease = now
+                self.limit = max(self.min_limit, self.limit * self.decrease_factor)
+                self.decreases += 1
+                logger.info('Upstream concurrency limit decreased to %.1f', self.limit)
+        elif latency <= self.target_latency and self.limit < self.max_limit:
+            self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+            self.increases += 1
+
+    @asynccontextmanager
+    async def slot(self, priority: int = INTERACTIVE, deadline: Optional[Deadline] = None) -> AsyncIterator[_Ticket]:
+        """Bir upstream cagrisi icin slot al; sonucu `ticket.observe` ile bildir."""
+        await self._acquire(priority, deadline)
+        ticket = _Ticket(priority, self._clock())
+        try:
+            yield ticket
+        finally:
+            self._record(ticket)
+            self._release()
+
+    def stats(self) -> Dict[str, object]:
+        queued = {name: 0 for name in PRIORITY_NAMES.values()}
+        for priority, _, future in self._waiters:
+            if not future.done():
+                queued[PRIORITY_NAMES.get(priority, 'bulk')] += 1
+        return {
+            'limit': round(self.limit, 2),
+            'in_flight': self.in_flight,
+            'queued': queued,
+            'granted': dict(self.granted),
+            'increases': self.increases,
+            'decreases': self.decreases,
+            'throttled_seconds': round(self.throttled_seconds, 3),
+            'tokens': None if self.bucket is None else round(self.bucket.tokens, 2),
+        }
@@ -0,0 +1,53 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+_registry: Dict[str, 'SingleFlight'] = {}
+
+
+class SingleFlight:
+    """Ayni anahtar icin eszamanli cagrilari tek bir calismada birlestirir.
+
+    Ilk cagiran isi baslatir, ayni anahtarla gelen diger cagiranlar ayni
+    sonucu (veya hatayi) bekler. Is ayri bir task olarak calistigi icin
+    ilk cagiranin baglantisi kopsa bile digerleri sonucu alir.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.leaders = 0
+        self.coalesced = 0
+        self._inflight: Dict[str, asyncio.Task] = {}
+        _registry[name] = self
+
+    async def do(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is not None and not task.done():
+            self.coalesced += 1
+            return await asyncio.shield(task)
+
+        self.leaders += 1
+        task = asyncio.ensure_future(factory())
+        self._inflight[key] = task
+        task.add_done_callback(lambda finished: self._finish(key, finished))
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            self._inflight.pop(key, None)
+        if not task.cancelled() and task.exception() is not None:
+            logger.debug('Single-flight %s/%s failed: %s', self.name, key, task.exception())
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'leaders': self.leaders,
+            'coalesced': self.coalesced,
+            'inflight': len(self._inflight),
+        }
+
+
+def singleflight_stats() -> Dict[str, Dict[str, int]]:
+    """Tum single-flight gruplarinin sayaclari."""
+    return {name: flight.stats() for name, flight in _registry.items()}
@@ -0,0 +1,96 @@
+import heapq
+import math
+from typing import Any, List, Optional, Sequence, Tuple
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Iki nokta arasindaki buyuk daire mesafesi (km)."""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class _Node:
+    __slots__ = ('point', 'item', 'axis', 'left', 'right')
+
+    def __init__(self, point: Tuple[float, float], item: Any, axis: int):
+        self.point = point
+        self.item = item
+        self.axis = axis
+        self.left: Optional['_Node'] = None
+        self.right: Optional['_Node'] = None
+
+
+class GeoIndex:
+    """Enlem/boylam noktalari icin k-d agaci ile en yakin komsu aramasi.
+
+    Noktalar veri kumesinin ortalama enlemine gore esit-alanli duzleme
+    izdusurulur; aday noktalar son adimda haversine mesafesiyle siralanir.
+    """
+
+    def __init__(self, points: Sequence[Tuple[float, float, Any]]):
+        self._size = len(points)
+        mean_lat = sum(lat for lat, _, _ in points) / self._size if points else 0.0
+        self._lon_scale = math.cos(math.radians(mean_lat))
+        projected = [(self._project(lat, lon), (lat, lon, item)) for lat, lon, item in points]
+        self._root = self._build(projected, 0)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _project(self, lat: float, lon: float) -> Tuple[float, float]:
+        return lon * self._lon_scale, lat
+
+    def _build(self, points: List, depth: int) -> Optional[_Node]:
+        if not points:
+            return None
+        axis = depth % 2
+        points.sort(key=lambda entry: entry[0][axis])
+        middle = len(points) // 2
+        node = _Node(points[middle][0], points[middle][1], axis)
+        node.left = self._build(points[:middle], depth + 1)
+        node.right = self._build(points[middle + 1:], depth + 1)
+        return node
+
+    def nearest(self, lat: float, lon: float, k: int = 1) -> List[Tuple[Any, float]]:
+        """En yakin k ogeyi (oge, mesafe_km) olarak yakindan uzaga dondur."""
+        if k <= 0 or self._root is None:
+            return []
+
+        target = self._project(lat, lon)
+        # Izdusum hatasini telafi icin biraz fazla aday toplanir.
+        candidate_count = min(self._size, k * 2 + 2)
+        heap: List[Tuple[float, int, Any]] = []
+        counter = 0
+
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+
+            dx = node.point[0] - target[0]
+            dy = node.point[1] - target[1]
+            distance_sq = dx * dx + dy * dy
+            counter += 1
+            if len(heap) < candidate_count:
+                heapq.heappush(heap, (-distance_sq, counter, node.item))
+            elif distance_sq < -heap[0][0]:
+                heapq.heapreplace(heap, (-distance_sq, counter, node.item))
+
+            diff = target[node.axis] - node.point[node.axis]
+            near, far = (node.left, node.right) if diff < 0 else (node.right, node.left)
+            if len(heap) < candidate_count or diff * diff < -heap[0][0]:
+                stack.append(far)
+            stack.append(near)
+
+        ranked = sorted(
+            ((item, haversine_km(lat, lon, item[0], item[1])) for _, _, item in heap),
+            key=lambda entry: entry[1],
+        )
+        return [(item[2], distance) for item, distance in ranked[:k]]
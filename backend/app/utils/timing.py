@@ -0,0 +1,177 @@
+"""Istek basina sure dokumu (Server-Timing) ve istege bagli profil.
+
+Aktif istegin `Timing` nesnesi bir ContextVar'da durur; `span` ve `record`
+istek disinda (arka plan yenileme vb.) cagrildiginda hicbir sey yapmaz.
+Ayni adli parcalar toplanir: 81 illik fan-out'ta `upstream_archive` tum
+cagrilarin toplam suresidir ve paralel parcalar `total`'i asabilir.
+"""
+import asyncio
+import cProfile
+import hmac
+import logging
+import re
+import time
+import uuid
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs
+
+from starlette.responses import JSONResponse
+
+logger = logging.getLogger(__name__)
+
+ADMIN_TOKEN_HEADER = 'x-admin-token'
+PROFILE_HEADER = 'x-profile-id'
+
+_current: ContextVar[Optional['Timing']] = ContextVar('request_timing', default=None)
+
+
+class Timing:
+    """Bir istegin adlandirilmis sure parcalari: ad -> [toplam saniye, adet]."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans: Dict[str, List[float]] = {}
+
+    def record(self, name: str, seconds: float):
+        entry = self.spans.get(name)
+        if entry is None:
+            self.spans[name] = [seconds, 1]
+        else:
+            entry[0] += seconds
+            entry[1] += 1
+
+    def header(self) -> str:
+        """Server-Timing basligi; birden fazla olculen parcalar adetini `desc` ile bildirir."""
+        parts = []
+        for name, (seconds, count) in self.spans.items():
+            part = f'{name};dur={seconds * 1000:.1f}'
+            if count > 1:
+                part += f';desc="{int(count)}x"'
+            parts.append(part)
+        parts.append(f'total;dur={(time.perf_counter() - self.started) * 1000:.1f}')
+        return ', '.join(parts)
+
+
+def current_timing() -> Optional[Timing]:
+    return _current.get()
+
+
+def record(name: str, seconds: float):
+    """Olculmus bir sureyi aktif istege yaz."""
+    timing = _current.get()
+    if timing is not None:
+        timing.record(name, seconds)
+
+
+class span:
+    """`with span('validate'):` blogunun suresini aktif istege yazar."""
+
+    __slots__ = ('name', '_timing', '_started')
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self) -> 'span':
+        self._timing = _current.get()
+        if self._timing is not None:
+            self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> bool:
+        if self._timing is not None:
+            self._timing.record(self.name, time.perf_counter() - self._started)
+        return False
+
+
+def _wants_profile(scope) -> bool:
+    values = parse_qs(scope.get('query_string', b'').decode('latin-1')).get('profile') or []
+    return any(value.lower() in ('1', 'true', 'yes') for value in values)
+
+
+def _header(scope, name: str) -> Optional[str]:
+    encoded = name.encode('latin-1')
+    for key, value in scope.get('headers') or []:
+        if key.lower() == encoded:
+            return value.decode('latin-1')
+    return None
+
+
+class ServerTimingMiddleware:
+    """Her yanita istegin span'larini `Server-Timing` basligi olarak ekler.
+
+    `?profile=1` ve dogru `X-Admin-Token` ile istek cProfile altinda calisir;
+    profil `profile_dir` altina pstats dosyasi olarak yazilir ve adi
+    `X-Profile-Id` basliginda doner (`python -m pstats <dosya>` ile okunur).
+    Profil event loop thread'ini kapsar: ayni anda calisan diger istekler de
+    profile girer, bu yuzden ayni anda tek profil alinir. `admin_token`
+    bos ise profil modu kapalidir.
+
+    Akis yanitlarinda baslik govdeden once gittigi icin yalnizca o ana
+    kadarki parcalari icerir.
+    """
+
+    def __init__(self, app, admin_token: Optional[str] = None, profile_dir: Optional[str] = None):
+        self.app = app
+        self.admin_token = admin_token
+        self.profile_dir = profile_dir
+        self._profiling = False
+
+    def _authorized(self, scope) -> bool:
+        token = _header(scope, ADMIN_TOKEN_HEADER)
+        return bool(self.admin_token) and token is not None and hmac.compare_digest(token, self.admin_token)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = None
+        if _wants_profile(scope):
+            if not self.admin_token or not self.profile_dir:
+                await JSONResponse({'detail': 'Profil modu kapali'}, status_code=403)(scope, receive, send)
+                return
+            if not self._authorized(scope):
+                await JSONResponse({'detail': 'Profil icin yetki yok'}, status_code=403)(scope, receive, send)
+                return
+            if self._profiling:
+                await JSONResponse({'detail': 'Baska bir profil suruyor'}, status_code=409)(scope, receive, send)
+                return
+            slug = re.sub(r'[^a-z0-9]+', '-', scope.get('path', '').lower()).strip('-') or 'root'
+            profile_id = f'{time.strftime("%Y%m%d-%H%M%S")}-{slug}-{uuid.uuid4().hex[:6]}'
+
+        timing = Timing()
+        token = _current.set(timing)
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                headers = list(message.get('headers') or [])
+                headers.append((b'server-timing', timing.header().encode('latin-1')))
+                if profile_id is not None:
+                    headers.append((PROFILE_HEADER.encode('latin-1'), profile_id.encode('latin-1')))
+                message = {**message, 'headers': headers}
+            await send(message)
+
+        profiler = None
+        if profile_id is not None:
+            self._profiling = True
+            profiler = cProfile.Profile()
+            profiler.enable()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            if profiler is not None:
+                profiler.disable()
+                self._profiling = False
+                await self._save(profiler, profile_id)
+
+    async def _save(self, profiler: cProfile.Profile, profile_id: str):
+        path = Path(self.profile_dir) / f'{profile_id}.prof'
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            await asyncio.to_thread(profiler.dump_stats, str(path))
+            logger.info('Request profile written to %s', path)
+        except OSError as exc:
+            logger.warning('Request profile %s could not be written: %s', profile_id, exc)
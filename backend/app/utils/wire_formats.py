@@ -0,0 +1,165 @@
+"""Hava durumu yanitlari icin ikili kodlamalar (MessagePack, Arrow IPC).
+
+MessagePack: payload yapisi JSON ile aynidir; yalnizca sayisal listeler
+`{'dtype': 'float32', 'data': <little-endian bytes>}` seklinde paketlenir.
+null degerler NaN olarak yazilir; istemci `Float32Array` ile okuyabilir.
+
+Arrow IPC stream: yanittaki ana tablo (saatlik/gunluk seri ya da il
+listesi) kolonlar halinde yazilir; geri kalan alanlar sema metadata'sinda
+`payload` anahtari altinda JSON olarak tasinir.
+"""
+import json
+import math
+import sys
+from array import array
+from typing import Any, List, Optional, Sequence, Tuple
+
+import msgpack
+
+try:
+    import pyarrow
+except ImportError:  # pragma: no cover - pyarrow opsiyonel
+    pyarrow = None
+
+JSON_MEDIA_TYPE = 'application/json'
+MSGPACK_MEDIA_TYPE = 'application/x-msgpack'
+ARROW_MEDIA_TYPE = 'application/vnd.apache.arrow.stream'
+
+TablePath = Tuple[str, ...]
+
+
+def arrow_available() -> bool:
+    return pyarrow is not None
+
+
+def negotiate(accept: Optional[str], offered: Sequence[str]) -> str:
+    """Accept basligina gore sunulan bicimlerden en uygununu sec; varsayilan JSON."""
+    if not accept:
+        return JSON_MEDIA_TYPE
+
+    best, best_quality = JSON_MEDIA_TYPE, 0.0
+    for part in accept.split(','):
+        media_type, *params = [piece.strip() for piece in part.split(';')]
+        quality = 1.0
+        for param in params:
+            if param.startswith('q='):
+                try:
+                    quality = float(param[2:])
+                except ValueError:
+                    quality = 0.0
+        if media_type in offered and quality > best_quality:
+            best, best_quality = media_type, quality
+    return best
+
+
+def _is_numeric_column(values: list) -> bool:
+    seen_number = False
+    for value in values:
+        if value is None:
+            continue
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return False
+        seen_number = True
+    return seen_number
+
+
+def _float32_column(values: list) -> Optional[array]:
+    """Sayisal listeyi float32 diziye cevir (null -> NaN); sayisal degilse None."""
+    if not values:
+        return None
+    try:
+        return array('f', values)
+    except TypeError:
+        pass
+    if not _is_numeric_column(values):
+        return None
+    return array('f', [math.nan if value is None else value for value in values])
+
+
+def _pack_columns(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {key: _pack_columns(item) for key, item in value.items()}
+    if isinstance(value, list):
+        column = _float32_column(value)
+        if column is None:
+            if not any(isinstance(item, (dict, list)) for item in value):
+                return value
+            return [_pack_columns(item) for item in value]
+        if sys.byteorder == 'big':
+            column.byteswap()
+        return {'dtype': 'float32', 'data': column.tobytes()}
+    return value
+
+
+def encode_msgpack(payload: Any) -> bytes:
+    return msgpack.packb(_pack_columns(payload), use_bin_type=True)
+
+
+def _resolve_path(payload: Any, path: TablePath) -> Any:
+    for key in path:
+        if not isinstance(payload, dict):
+            return None
+        payload = payload.get(key)
+    return payload
+
+
+def _without_path(payload: dict, path: TablePath) -> dict:
+    if not path:
+        return payload
+    head, rest = path[0], path[1:]
+    trimmed = dict(payload)
+    if rest and isinstance(trimmed.get(head), dict):
+        trimmed[head] = _without_path(trimmed[head], rest)
+    else:
+        trimmed.pop(head, None)
+    return trimmed
+
+
+def _records_to_columns(records: List[dict]) -> dict:
+    names: List[str] = []
+    for record in records:
+        for name in record:
+            if name not in names:
+                names.append(name)
+    return {name: [record.get(name) for record in records] for name in names}
+
+
+def encode(payload: Any, media_type: str, table_path: Optional[TablePath] = None) -> bytes:
+    """Payload'u istenen bicimde kodla."""
+    if media_type == MSGPACK_MEDIA_TYPE:
+        return encode_msgpack(payload)
+    if media_type == ARROW_MEDIA_TYPE:
+        return encode_arrow(payload, table_path or ())
+    return dump_json(payload)
+
+
+def dump_json(payload: Any) -> bytes:
+    """FastAPI'nin JSONResponse ciktisiyla ayni kompakt UTF-8 JSON."""
+    return json.dumps(payload, ensure_ascii=False, allow_nan=False, separators=(',', ':')).encode('utf-8')
+
+
+def encode_arrow(payload: dict, table_path: TablePath) -> bytes:
+    """Payload'u `table_path` altindaki tablo ve JSON metadata olarak Arrow IPC stream'e yaz."""
+    if pyarrow is None:
+        raise RuntimeError('pyarrow kurulu degil')
+
+    table = _resolve_path(payload, table_path)
+    columns = _records_to_columns(table) if isinstance(table, list) else dict(table or {})
+    arrays = {}
+    for name, values in columns.items():
+        if not isinstance(values, list):
+            continue
+        if _is_numeric_column(values):
+            arrays[name] = pyarrow.array(values, type=pyarrow.float32())
+        else:
+            arrays[name] = pyarrow.array(values)
+
+    metadata = {
+        'payload': json.dumps(_without_path(payload, table_path), ensure_ascii=False, separators=(',', ':')),
+        'table_path': '.'.join(table_path),
+    }
+    record_batch = pyarrow.RecordBatch.from_pydict(arrays, metadata=metadata)
+    sink = pyarrow.BufferOutputStream()
+    with pyarrow.ipc.new_stream(sink, record_batch.schema) as writer:
+        writer.write_batch(record_batch)
+    return sink.getvalue().to_pybytes()
@@ -0,0 +1,93 @@
+"""/api/provinces icin istek basina maliyet karsilastirmasi.
+
+Eski yol (her istekte pydantic modelleri kurup response_model ile dogrulama)
+ile bir kez serilestirilmis PreparedResponse yolunu ayni ASGI yiginindan
+olcer; eski yol da main.app ile ayni middleware'lerin arkasinda calisir.
+`bytes` agdan inen (gzip'te sikistirilmis) govde boyutudur.
+
+Calistirma (backend klasorunden):
+    python -m benchmarks.bench_provinces [--requests 2000]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import time
+
+import httpx
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+
+from app.api import metrics
+from app.api.provinces import _build_province_list
+from app.config import settings
+from app.models.province import ProvinceList
+from app.utils.metrics import MetricsMiddleware
+from app.utils.timing import ServerTimingMiddleware
+from main import app
+
+
+def _legacy_app() -> FastAPI:
+    legacy = FastAPI()
+    # Gecikme karsilastirmasi main.app ile ayni middleware yiginindan gecmeli.
+    legacy.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.ALLOWED_ORIGINS,
+        allow_credentials=True,
+        allow_methods=['*'],
+        allow_headers=['*'],
+        expose_headers=['Age', 'ETag', 'Last-Modified', 'Server-Timing', 'X-Profile-Id'],
+    )
+    legacy.add_middleware(ServerTimingMiddleware, admin_token=settings.ADMIN_TOKEN, profile_dir=settings.PROFILE_DIR)
+    legacy.add_middleware(MetricsMiddleware, histogram=metrics.HTTP_LATENCY)
+
+    @legacy.get('/api/provinces', response_model=ProvinceList)
+    async def get_provinces():
+        return _build_province_list()
+
+    return legacy
+
+
+async def _measure(target: FastAPI, requests: int, headers: dict) -> dict:
+    transport = httpx.ASGITransport(app=target)
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+        response = await client.get('/api/provinces', headers=headers)
+        # response.content gzip'i acilmis govdedir; tel uzerindeki boyut num_bytes_downloaded'dir.
+        body_bytes = response.num_bytes_downloaded
+
+        started = time.perf_counter()
+        for _ in range(requests):
+            await client.get('/api/provinces', headers=headers)
+        elapsed = time.perf_counter() - started
+
+    return {
+        'status': response.status_code,
+        'bytes': body_bytes,
+        'per_request_us': round(elapsed / requests * 1e6, 1),
+    }
+
+
+async def run(requests: int) -> dict:
+    identity = {'Accept-Encoding': 'identity'}
+    prepared = await _measure(app, requests, identity)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://bench') as client:
+        etag = (await client.get('/api/provinces')).headers['etag']
+    return {
+        'requests': requests,
+        'legacy_models': await _measure(_legacy_app(), requests, identity),
+        'prepared': prepared,
+        'prepared_gzip': await _measure(app, requests, {'Accept-Encoding': 'gzip'}),
+        'prepared_304': await _measure(app, requests, {'If-None-Match': etag}),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+    logging.getLogger('httpx').setLevel(logging.WARNING)
+    print(json.dumps(asyncio.run(run(args.requests)), indent=2))
+
+
+if __name__ == '__main__':
+    main()
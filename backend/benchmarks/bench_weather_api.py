@@ -0,0 +1,241 @@
+"""/api/weather, /api/weather/snapshot ve /api/weather/current icin yuk olcumu.
+
+Uygulama ayni surecte ASGI uzerinden calisir, upstream olarak yerel sahte
+Open-Meteo sunucusu (benchmarks.fake_open_meteo) kullanilir. Her senaryo
+iki fazda olculur:
+
+- cold: uygulama cache'leri ve arsiv deposu bos; her istek upstream'e
+  kadar gidebilir.
+- warm: ayni istek listesi cache'ler doluyken tekrar gonderilir.
+
+Faz basina verim (istek/sn), p50/p95/p99 gecikme, durum kodlari ve sahte
+upstream'e giden istek sayisi JSON olarak yazilir; `--output` ile dosyaya
+kaydedilen sonuclar `benchmarks.compare` ile commit'ler arasinda
+karsilastirilir. Istek listesi `--seed` ile belirlenir.
+
+Calistirma (backend klasorunden):
+    python -m benchmarks.bench_weather_api [--requests 200] [--concurrency 16] [--output before.json]
+"""
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import random
+import subprocess
+import tempfile
+import time
+from collections import Counter
+from dataclasses import asdict
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import httpx
+import numpy as np
+
+from app.api import climate, weather
+from app.config import settings
+from app.services.archive_store import archive_store
+from app.services.geo_service import geo_service
+from app.services.open_meteo import open_meteo
+from app.utils.request_scheduler import RequestScheduler
+from benchmarks.fake_open_meteo import FakeOpenMeteoServer, add_config_arguments, config_from_args
+from main import app
+
+SCENARIOS = ('weather', 'snapshot', 'current')
+PHASES = ('cold', 'warm')
+# Arsiv donemine dusen sabit tarihler; sonuclar calistirma gunune bagli kalmaz.
+BASE_DATE = date(2024, 1, 1)
+
+
+def reset_app_state(archive_path: str):
+    """Tum weather cache'lerini bosalt ve arsiv deposunu bos bir dosyaya yonlendir."""
+    for tiered_cache in (
+        weather._current_cache,
+        weather._snapshot_cache,
+        weather._snapshot_hourly_cache,
+        weather._weather_cache,
+        weather._weather_segment_cache,
+    ):
+        tiered_cache.clear_local()
+    weather._encoded_bodies.clear()
+    weather._snapshot_cubes.clear()
+    weather._weather_views.clear()
+    weather._national_days.clear()
+    weather.current_refresher.clear()
+    climate._encoded_bodies.clear()
+    archive_store.open(archive_path)
+    for breaker in open_meteo.breakers.values():
+        breaker.reset()
+
+
+def weather_paths(rng: random.Random, count: int, days: int, hourly: bool) -> List[str]:
+    plate_codes = [province['plate_code'] for province in geo_service.get_all_provinces()]
+    paths = []
+    for _ in range(count):
+        start = BASE_DATE + timedelta(days=rng.randrange(300))
+        end = start + timedelta(days=days - 1)
+        paths.append(
+            f'/api/weather?province={rng.choice(plate_codes)}&start_date={start.isoformat()}'
+            f'&end_date={end.isoformat()}&hourly={str(hourly).lower()}'
+        )
+    return paths
+
+
+def snapshot_paths(rng: random.Random, count: int, dates: int) -> List[str]:
+    days = [(BASE_DATE + timedelta(days=offset * 7)).isoformat() for offset in range(dates)]
+    return [f'/api/weather/snapshot?date={rng.choice(days)}&time={rng.randrange(24):02d}:00' for _ in range(count)]
+
+
+def current_paths(count: int) -> List[str]:
+    return ['/api/weather/current'] * count
+
+
+def summarize(latencies: List[float], statuses: Counter, elapsed: float) -> dict:
+    values = np.asarray(latencies) * 1000
+    ok = sum(count for status, count in statuses.items() if status < 400)
+    p50, p95, p99 = np.percentile(values, (50, 95, 99)) if values.size else (0.0, 0.0, 0.0)
+    return {
+        'requests': len(latencies),
+        'errors': len(latencies) - ok,
+        'statuses': {str(status): count for status, count in sorted(statuses.items())},
+        'duration_s': round(elapsed, 3),
+        'throughput_rps': round(len(latencies) / elapsed, 1) if elapsed else None,
+        'latency_ms': {
+            'mean': round(float(values.mean()), 2) if values.size else None,
+            'p50': round(float(p50), 2),
+            'p95': round(float(p95), 2),
+            'p99': round(float(p99), 2),
+            'max': round(float(values.max()), 2) if values.size else None,
+        },
+    }
+
+
+async def run_phase(client: httpx.AsyncClient, paths: List[str], concurrency: int) -> dict:
+    """Istek listesini `concurrency` esit istemciyle tuket; her istemci bir sonrakini bekler."""
+    pending = iter(paths)
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+
+    async def worker():
+        for path in pending:
+            started = time.perf_counter()
+            try:
+                response = await client.get(path)
+                status = response.status_code
+            except httpx.HTTPError:
+                status = 599
+            latencies.append(time.perf_counter() - started)
+            statuses[status] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, statuses, time.perf_counter() - started)
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    upstream: FakeOpenMeteoServer,
+    paths: List[str],
+    concurrency: int,
+    archive_path: str,
+) -> Dict[str, dict]:
+    reset_app_state(archive_path)
+    results = {}
+    for phase in PHASES:
+        upstream.reset_counters()
+        results[phase] = await run_phase(client, paths, concurrency)
+        results[phase]['upstream'] = upstream.stats()
+    return results
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+async def run(args) -> dict:
+    config = config_from_args(args)
+    rng = random.Random(args.seed)
+    builders: Dict[str, Callable[[], List[str]]] = {
+        'weather': lambda: weather_paths(rng, args.requests, args.weather_days, args.hourly),
+        'snapshot': lambda: snapshot_paths(rng, args.requests, args.snapshot_dates),
+        'current': lambda: current_paths(args.requests),
+    }
+
+    original = (open_meteo.base_url, open_meteo.archive_url, open_meteo.scheduler)
+    original_archive_path = archive_store.path
+    # Hiz siniri gercek Open-Meteo'yu korumak icindir; sahte sunucuda olcumu yalnizca yavaslatir.
+    open_meteo.scheduler = RequestScheduler(
+        initial_limit=settings.UPSTREAM_INITIAL_CONCURRENCY,
+        min_limit=settings.UPSTREAM_MIN_CONCURRENCY,
+        max_limit=settings.UPSTREAM_MAX_CONCURRENCY,
+        rate_per_second=args.upstream_rate,
+        burst=settings.UPSTREAM_RATE_BURST,
+        target_latency=settings.UPSTREAM_TARGET_LATENCY_SECONDS,
+    )
+    results = {}
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            async with FakeOpenMeteoServer(config) as upstream:
+                open_meteo.base_url = upstream.forecast_url
+                open_meteo.archive_url = upstream.archive_url
+                transport = httpx.ASGITransport(app=app)
+                async with httpx.AsyncClient(transport=transport, base_url='http://bench', timeout=None) as client:
+                    for scenario in args.scenarios:
+                        archive_path = str(Path(workdir) / f'{scenario}.sqlite3')
+                        results[scenario] = await run_scenario(client, upstream, builders[scenario](), args.concurrency, archive_path)
+    finally:
+        open_meteo.base_url, open_meteo.archive_url, open_meteo.scheduler = original
+        archive_store.open(original_archive_path)
+
+    return {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': datetime.utcnow().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'requests': args.requests,
+            'concurrency': args.concurrency,
+            'weather_days': args.weather_days,
+            'hourly': args.hourly,
+            'snapshot_dates': args.snapshot_dates,
+            'upstream_rate': args.upstream_rate,
+            'upstream': asdict(config),
+        },
+        'results': results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=200, help='Senaryo ve faz basina istek sayisi')
+    parser.add_argument('--concurrency', type=int, default=16, help='Eszamanli istemci sayisi')
+    parser.add_argument('--scenarios', nargs='+', choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument('--weather-days', type=int, default=7, help='/api/weather istek araligi (gun)')
+    parser.add_argument('--hourly', action=argparse.BooleanOptionalAction, default=True)
+    parser.add_argument('--snapshot-dates', type=int, default=3, help='Snapshot isteklerinin dagildigi gun sayisi')
+    parser.add_argument('--upstream-rate', type=float, default=0, help='Upstream hiz siniri (istek/sn, 0 = sinirsiz)')
+    parser.add_argument('--output', help='Sonuclari bu JSON dosyasina da yaz')
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.ERROR, force=True)
+    result = asyncio.run(run(args))
+    text = json.dumps(result, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + '\n', encoding='utf-8')
+    print(text)
+
+
+if __name__ == '__main__':
+    main()
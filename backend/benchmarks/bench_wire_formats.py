@@ -0,0 +1,69 @@
+"""Bir yillik saatlik seri icin JSON, MessagePack ve Arrow kodlama karsilastirmasi.
+
+Calistirma (backend klasorunden):
+    python -m benchmarks.bench_wire_formats [--repeat 20]
+"""
+import argparse
+import json
+import math
+import time
+from datetime import datetime, timedelta
+
+from app.services.open_meteo import HOURLY_FIELDS
+from app.utils.wire_formats import (
+    ARROW_MEDIA_TYPE,
+    JSON_MEDIA_TYPE,
+    MSGPACK_MEDIA_TYPE,
+    arrow_available,
+    encode,
+)
+
+INTEGER_FIELDS = {'relative_humidity_2m', 'cloud_cover', 'weather_code'}
+
+
+def build_year_payload(hours: int = 365 * 24) -> dict:
+    start = datetime(2023, 1, 1)
+    hourly = {'time': [(start + timedelta(hours=offset)).strftime('%Y-%m-%dT%H:%M') for offset in range(hours)]}
+    for position, field in enumerate(HOURLY_FIELDS):
+        values = [10 + 8 * math.sin((offset + position) / 24 * 2 * math.pi) + position for offset in range(hours)]
+        hourly[field] = [int(value) if field in INTEGER_FIELDS else round(value, 2) for value in values]
+    return {
+        'province': 'Ankara',
+        'plate_code': '06',
+        'coordinates': {'latitude': 39.93, 'longitude': 32.86},
+        'timezone': 'Europe/Istanbul',
+        'data': {'hourly': hourly, 'daily': None},
+        'timestamp': datetime.utcnow().isoformat(),
+    }
+
+
+def measure(payload: dict, media_type: str, repeat: int) -> dict:
+    body = encode(payload, media_type, ('data', 'hourly'))
+    started = time.perf_counter()
+    for _ in range(repeat):
+        encode(payload, media_type, ('data', 'hourly'))
+    elapsed = (time.perf_counter() - started) / repeat
+    return {'bytes': len(body), 'encode_ms': round(elapsed * 1000, 2)}
+
+
+def run(repeat: int) -> dict:
+    payload = build_year_payload()
+    media_types = [JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE]
+    if arrow_available():
+        media_types.append(ARROW_MEDIA_TYPE)
+    return {
+        'points': len(payload['data']['hourly']['time']),
+        'variables': len(HOURLY_FIELDS),
+        'results': {media_type: measure(payload, media_type, repeat) for media_type in media_types},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    print(json.dumps(run(args.repeat), indent=2))
+
+
+if __name__ == '__main__':
+    main()
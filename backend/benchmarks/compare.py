@@ -0,0 +1,95 @@
+"""Iki bench_weather_api sonucunu karsilastir; esigi asan gerilemelerde 1 ile cik.
+
+Gecikme (p50/p95/p99) artisi ve verim dususu `--threshold` oranini
+asarsa gerileme sayilir. Cok kucuk mutlak farklar (`--min-delta-ms`)
+olcum gurultusu kabul edilir.
+
+Calistirma (backend klasorunden):
+    python -m benchmarks.compare before.json after.json [--threshold 0.15]
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+LATENCY_KEYS = ('p50', 'p95', 'p99')
+
+
+def _change(before: Optional[float], after: Optional[float]) -> Optional[float]:
+    if not before or after is None:
+        return None
+    return (after - before) / before
+
+
+def compare(before: dict, after: dict, threshold: float, min_delta_ms: float) -> List[dict]:
+    """Senaryo x faz x metrik satirlari; `regression` esigi asan kotulesmeyi isaretler."""
+    rows = []
+    for scenario, phases in after.get('results', {}).items():
+        for phase, result in phases.items():
+            baseline = before.get('results', {}).get(scenario, {}).get(phase)
+            if baseline is None:
+                continue
+            for key in LATENCY_KEYS:
+                old, new = baseline['latency_ms'].get(key), result['latency_ms'].get(key)
+                change = _change(old, new)
+                regression = change is not None and change > threshold and new - old > min_delta_ms
+                rows.append({'scenario': scenario, 'phase': phase, 'metric': f'{key}_ms', 'before': old, 'after': new, 'change': change, 'regression': regression})
+            old, new = baseline.get('throughput_rps'), result.get('throughput_rps')
+            change = _change(old, new)
+            rows.append({
+                'scenario': scenario,
+                'phase': phase,
+                'metric': 'throughput_rps',
+                'before': old,
+                'after': new,
+                'change': change,
+                'regression': change is not None and change < -threshold,
+            })
+            old, new = baseline.get('errors', 0), result.get('errors', 0)
+            rows.append({'scenario': scenario, 'phase': phase, 'metric': 'errors', 'before': old, 'after': new, 'change': None, 'regression': new > old})
+    return rows
+
+
+def config_differences(before: dict, after: dict) -> List[str]:
+    """Olcum ayarlarindaki farklar (commit ve zaman haric); farkli ayarlarla olculen sonuclar kiyaslanamaz."""
+    ignored = {'commit', 'timestamp'}
+    old, new = before.get('meta', {}), after.get('meta', {})
+    return [key for key in sorted(set(old) | set(new)) if key not in ignored and old.get(key) != new.get(key)]
+
+
+def _format_change(change: Optional[float]) -> str:
+    return '' if change is None else f'{change * 100:+.1f}%'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('before')
+    parser.add_argument('after')
+    parser.add_argument('--threshold', type=float, default=0.15, help='Gerileme sayilacak goreli degisim')
+    parser.add_argument('--min-delta-ms', type=float, default=1.0, help='Bunun altindaki gecikme farklari yok sayilir')
+    parser.add_argument('--json', action='store_true', help='Tabloyu JSON olarak yaz')
+    args = parser.parse_args()
+
+    before = json.loads(Path(args.before).read_text(encoding='utf-8'))
+    after = json.loads(Path(args.after).read_text(encoding='utf-8'))
+    rows = compare(before, after, args.threshold, args.min_delta_ms)
+    differences = config_differences(before, after)
+    if differences:
+        print(f"warning: results were measured with different settings: {', '.join(differences)}", file=sys.stderr)
+
+    if args.json:
+        print(json.dumps({'before': before.get('meta', {}).get('commit'), 'after': after.get('meta', {}).get('commit'), 'rows': rows}, indent=2))
+    else:
+        print(f"{before.get('meta', {}).get('commit')} -> {after.get('meta', {}).get('commit')}")
+        for row in rows:
+            flag = 'REGRESSION' if row['regression'] else ''
+            print(
+                f"{row['scenario']:<9} {row['phase']:<5} {row['metric']:<15} "
+                f"{row['before']!s:>10} {row['after']!s:>10} {_format_change(row['change']):>8} {flag}"
+            )
+    sys.exit(1 if any(row['regression'] for row in rows) else 0)
+
+
+if __name__ == '__main__':
+    main()
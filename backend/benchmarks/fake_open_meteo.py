@@ -0,0 +1,197 @@
+"""Benchmark'lar icin yerel sahte Open-Meteo sunucusu (aiohttp).
+
+`/v1/forecast` ve `/v1/archive` uclarini Open-Meteo bicimiyle cevaplar:
+tek konum icin nesne, virgulle ayrilmis coklu konum icin liste. Degerler
+enlem ve saatten deterministik uretilir. Gecikme, jitter, hata orani ve
+ek degiskenlerle sisirilmis govde boyutu ayarlanabilir; rastgelelik sabit
+tohumla uretildigi icin ayni ayarlar ayni hata/gecikme dizisini verir.
+
+Tek basina calistirma (backend klasorunden); uvicorn ile calisan API'yi
+OPEN_METEO_BASE_URL / OPEN_METEO_ARCHIVE_URL ile yazdirilan adreslere yonlendirin:
+    python -m benchmarks.fake_open_meteo [--port 8765] [--latency-ms 80] [--error-rate 0.02]
+"""
+import argparse
+import asyncio
+import json
+import math
+import random
+from dataclasses import asdict, dataclass
+from datetime import date, timedelta
+from typing import List, Optional
+
+from aiohttp import web
+
+INTEGER_FIELDS = {'relative_humidity_2m', 'cloud_cover', 'weather_code'}
+
+
+@dataclass
+class FakeUpstreamConfig:
+    latency_ms: float = 50.0
+    jitter_ms: float = 20.0
+    # Bu oranda istek 503 ile cevaplanir (gecikme yine uygulanir).
+    error_rate: float = 0.0
+    # Her seriye eklenen `pad_<n>` degiskeni sayisi; upstream govdesini buyutur.
+    pad_variables: int = 0
+    seed: int = 1
+
+
+def _field_value(field: str, latitude: float, hour: int):
+    value = round(latitude + 8 * math.sin((hour + len(field)) / 24 * 2 * math.pi), 2)
+    if field in INTEGER_FIELDS:
+        return int(abs(value)) % 100
+    return value
+
+
+def _days(params) -> List[str]:
+    if 'start_date' in params:
+        start = date.fromisoformat(params['start_date'])
+        end = date.fromisoformat(params.get('end_date') or params['start_date'])
+    else:
+        start = date.today() - timedelta(days=int(params.get('past_days', 0)))
+        end = date.today() + timedelta(days=max(1, int(params.get('forecast_days', 1))) - 1)
+    return [(start + timedelta(days=offset)).isoformat() for offset in range((end - start).days + 1)]
+
+
+def _fields(params, key: str, pad_variables: int) -> List[str]:
+    return params[key].split(',') + [f'pad_{index}' for index in range(pad_variables)]
+
+
+def location_payload(params, latitude: float, pad_variables: int = 0) -> dict:
+    if 'current' in params:
+        current = {field: _field_value(field, latitude, 12) for field in _fields(params, 'current', pad_variables)}
+        current['time'] = f'{date.today().isoformat()}T12:00'
+        return {'latitude': latitude, 'current': current}
+
+    days = _days(params)
+    if 'hourly' in params:
+        hourly = {'time': [f'{day}T{hour:02d}:00' for day in days for hour in range(24)]}
+        for field in _fields(params, 'hourly', pad_variables):
+            column = [_field_value(field, latitude, hour) for hour in range(24)]
+            hourly[field] = column * len(days)
+        return {'latitude': latitude, 'hourly': hourly}
+
+    daily = {'time': days}
+    for field in _fields(params, 'daily', pad_variables):
+        if field == 'temperature_2m_min':
+            daily[field] = [_field_value('temperature_2m', latitude, 4)] * len(days)
+        elif field == 'precipitation_sum':
+            daily[field] = [0.0] * len(days)
+        else:
+            daily[field] = [_field_value(field, latitude, 14)] * len(days)
+    return {'latitude': latitude, 'daily': daily}
+
+
+class FakeOpenMeteoServer:
+    """Ayni event loop'ta calisan sahte upstream; istek ve hata sayilarini tutar."""
+
+    def __init__(self, config: Optional[FakeUpstreamConfig] = None, host: str = '127.0.0.1', port: int = 0):
+        self.config = config or FakeUpstreamConfig()
+        self.host = host
+        self.port = port
+        self.requests = 0
+        self.locations = 0
+        self.errors = 0
+        self.bytes_sent = 0
+        self._random = random.Random(self.config.seed)
+        self._runner: Optional[web.AppRunner] = None
+
+    @property
+    def base_url(self) -> str:
+        return f'http://{self.host}:{self.port}'
+
+    @property
+    def forecast_url(self) -> str:
+        return f'{self.base_url}/v1/forecast'
+
+    @property
+    def archive_url(self) -> str:
+        return f'{self.base_url}/v1/archive'
+
+    def reset_counters(self):
+        self.requests = self.locations = self.errors = self.bytes_sent = 0
+
+    def stats(self) -> dict:
+        return {'requests': self.requests, 'locations': self.locations, 'errors': self.errors, 'bytes': self.bytes_sent}
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        config = self.config
+        self.requests += 1
+        delay = max(0.0, config.latency_ms + self._random.uniform(-config.jitter_ms, config.jitter_ms)) / 1000
+        failed = self._random.random() < config.error_rate
+        if delay:
+            await asyncio.sleep(delay)
+        if failed:
+            self.errors += 1
+            return web.json_response({'error': True, 'reason': 'fake upstream error'}, status=503)
+
+        params = request.query
+        latitudes = [float(value) for value in params['latitude'].split(',')]
+        self.locations += len(latitudes)
+        items = [location_payload(params, latitude, config.pad_variables) for latitude in latitudes]
+        body = json.dumps(items if len(items) > 1 else items[0]).encode()
+        self.bytes_sent += len(body)
+        return web.Response(body=body, content_type='application/json')
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get('/v1/forecast', self._handle)
+        app.router.add_get('/v1/archive', self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        if not self.port:
+            self.port = self._runner.addresses[0][1]
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> 'FakeOpenMeteoServer':
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.stop()
+
+
+def add_config_arguments(parser: argparse.ArgumentParser):
+    defaults = FakeUpstreamConfig()
+    parser.add_argument('--latency-ms', type=float, default=defaults.latency_ms)
+    parser.add_argument('--jitter-ms', type=float, default=defaults.jitter_ms)
+    parser.add_argument('--error-rate', type=float, default=defaults.error_rate)
+    parser.add_argument('--pad-variables', type=int, default=defaults.pad_variables)
+    parser.add_argument('--seed', type=int, default=defaults.seed)
+
+
+def config_from_args(args) -> FakeUpstreamConfig:
+    return FakeUpstreamConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        pad_variables=args.pad_variables,
+        seed=args.seed,
+    )
+
+
+async def serve(config: FakeUpstreamConfig, host: str, port: int):
+    async with FakeOpenMeteoServer(config, host, port) as server:
+        print(json.dumps({'forecast_url': server.forecast_url, 'archive_url': server.archive_url, **asdict(config)}), flush=True)
+        await asyncio.Event().wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    add_config_arguments(parser)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(config_from_args(args), args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -4,9 +4,16 @@ import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.api import health, provinces, weather
+from app.api import climate, health, metrics, provinces, weather
+from app.api.weather import current_refresher
 from app.config import settings
+from app.services.archive_store import archive_store
+from app.services.cache import close_shared_backend
+from app.services.climatology import climatology
+from app.services.geo_service import geo_service
 from app.services.open_meteo import open_meteo
+from app.utils.metrics import MetricsMiddleware
+from app.utils.timing import ServerTimingMiddleware
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -16,8 +23,15 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     """Uygulama baslangic ve kapanis islemleri."""
     logger.info('Uygulama baslatiliyor...')
+    await current_refresher.start()
+    if settings.CLIMATE_PRECOMPUTE_ON_STARTUP:
+        await climatology.start(geo_service.get_all_provinces())
     yield
+    await climatology.stop()
+    await current_refresher.stop()
     await open_meteo.close()
+    await close_shared_backend()
+    archive_store.close()
     logger.info('Uygulama kapatiliyor...')
 
 
@@ -34,11 +48,16 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=['*'],
     allow_headers=['*'],
+    expose_headers=['Age', 'ETag', 'Last-Modified', 'Server-Timing', 'X-Profile-Id'],
 )
+app.add_middleware(ServerTimingMiddleware, admin_token=settings.ADMIN_TOKEN, profile_dir=settings.PROFILE_DIR)
+app.add_middleware(MetricsMiddleware, histogram=metrics.HTTP_LATENCY)
 
 app.include_router(health.router, prefix='/api', tags=['Health'])
 app.include_router(provinces.router, prefix='/api', tags=['Provinces'])
 app.include_router(weather.router, prefix='/api', tags=['Weather'])
+app.include_router(climate.router, prefix='/api', tags=['Climate'])
+app.include_router(metrics.router, prefix='/api', tags=['Metrics'])
 
 
 @app.get('/')
@@ -0,0 +1,139 @@
+import asyncio
+from datetime import date, timedelta
+
+import httpx
+import pytest
+
+from app.api import climate, weather
+from app.services import cache
+from app.services.archive_store import archive_store
+from app.services.climatology import climatology
+from app.services.open_meteo import open_meteo
+from app.utils.request_scheduler import RequestScheduler
+
+HOURLY_FIELDS = [
+	"temperature_2m",
+	"apparent_temperature",
+	"precipitation",
+	"wind_speed_10m",
+	"wind_direction_10m",
+	"relative_humidity_2m",
+	"pressure_msl",
+	"visibility",
+	"cloud_cover",
+	"weather_code",
+]
+INTEGER_FIELDS = {"relative_humidity_2m", "cloud_cover", "weather_code"}
+
+
+def _field_value(field, value):
+	return int(value) if field in INTEGER_FIELDS else value
+
+
+class FakeOpenMeteo:
+	"""Open-Meteo yerine cevap veren yerel sahte upstream; istekleri sayar."""
+
+	def __init__(self):
+		self.requests = []
+		self.fail_batches = False
+		self.failing_hosts = {}
+		self.delay = 0.0
+		# Verilirse gecikme yalnizca bu kosulu saglayan isteklere uygulanir.
+		self.slow_requests = None
+
+	def _location_payload(self, params, latitude):
+		if "current" in params:
+			current = {field: _field_value(field, latitude) for field in HOURLY_FIELDS}
+			current["time"] = "2024-01-15T12:00"
+			return {"current": current}
+
+		start = date.fromisoformat(params["start_date"])
+		end = date.fromisoformat(params["end_date"])
+		days = [(start + timedelta(days=offset)).isoformat() for offset in range((end - start).days + 1)]
+		value = round(latitude, 1)
+
+		if "hourly" in params:
+			hourly = {"time": [f"{day}T{hour:02d}:00" for day in days for hour in range(24)]}
+			for field in HOURLY_FIELDS:
+				hourly[field] = [_field_value(field, value + hour) for _ in days for hour in range(24)]
+			return {"hourly": hourly}
+
+		return {
+			"daily": {
+				"time": days,
+				"temperature_2m_max": [value] * len(days),
+				"temperature_2m_min": [value - 10] * len(days),
+				"precipitation_sum": [0.0] * len(days),
+				"weather_code": [1] * len(days),
+			}
+		}
+
+	async def handler(self, request: httpx.Request) -> httpx.Response:
+		self.requests.append(request)
+		params = dict(request.url.params)
+		if self.delay and (self.slow_requests is None or self.slow_requests(params)):
+			await asyncio.sleep(self.delay)
+		latitudes = [float(value) for value in params["latitude"].split(",")]
+
+		if request.url.host in self.failing_hosts:
+			return httpx.Response(self.failing_hosts[request.url.host], json={"error": True, "reason": "host down"})
+
+		if self.fail_batches and len(latitudes) > 1:
+			return httpx.Response(500, json={"error": True, "reason": "batch disabled"})
+
+		items = [self._location_payload(params, latitude) for latitude in latitudes]
+		return httpx.Response(200, json=items if len(items) > 1 else items[0])
+
+
+def clear_weather_caches():
+	for tiered_cache in (
+		weather._current_cache,
+		weather._snapshot_cache,
+		weather._snapshot_hourly_cache,
+		weather._weather_cache,
+		weather._weather_segment_cache,
+	):
+		tiered_cache.clear_local()
+	weather._encoded_bodies.clear()
+	weather._snapshot_cubes.clear()
+	weather._weather_views.clear()
+	weather._national_days.clear()
+	weather.current_refresher.clear()
+	weather._current_fanout = None
+	climate._encoded_bodies.clear()
+
+
+@pytest.fixture
+def fake_upstream(tmp_path):
+	fake = FakeOpenMeteo()
+	original_archive_path = archive_store.path
+	archive_store.open(str(tmp_path / "archive.sqlite3"))
+	climatology.clear()
+	original_client = open_meteo._client
+	open_meteo._client = httpx.AsyncClient(transport=httpx.MockTransport(fake.handler))
+	for breaker in open_meteo.breakers.values():
+		breaker.reset()
+	# Sahte upstream hiz siniri gerektirmez; genis bir zamanlayici testleri yavaslatmaz.
+	original_scheduler = open_meteo.scheduler
+	open_meteo.scheduler = RequestScheduler(initial_limit=64, max_limit=64)
+
+	clear_weather_caches()
+
+	yield fake
+
+	open_meteo._client = original_client
+	open_meteo.scheduler = original_scheduler
+	for breaker in open_meteo.breakers.values():
+		breaker.reset()
+	archive_store.open(original_archive_path)
+	climatology.clear()
+	clear_weather_caches()
+
+
+@pytest.fixture
+def shared_cache():
+	backend = cache.InMemoryCacheBackend()
+	original_backend = cache.get_shared_backend()
+	cache.set_shared_backend(backend)
+	yield backend
+	cache.set_shared_backend(original_backend)
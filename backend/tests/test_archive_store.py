@@ -0,0 +1,103 @@
+import asyncio
+from datetime import date, datetime, timedelta
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app.api import weather
+from app.services.archive_store import ArchiveStore
+from app.services.climatology import CLIMATE_FIELDS, CLIMATE_STATS, ClimateNormals, ClimatologyService
+from app.utils.lru_cache import LRUCache
+from main import app
+
+client = TestClient(app)
+
+
+def _hourly_series(start: date, days: int, value=1.5):
+	times = [f"{(start + timedelta(days=offset)).isoformat()}T{hour:02d}:00" for offset in range(days) for hour in range(24)]
+	return {
+		"time": times,
+		"temperature_2m": [value] * len(times),
+		"relative_humidity_2m": [55] * len(times),
+		"visibility": [None] * len(times),
+	}
+
+def _requested_ranges(fake_upstream):
+	return [(request.url.params["start_date"], request.url.params["end_date"]) for request in fake_upstream.requests]
+
+
+def test_store_roundtrip_reports_missing_ranges(tmp_path):
+	store = ArchiveStore(str(tmp_path / "archive.sqlite3"))
+	asyncio.run(store.write_series("06", _hourly_series(date(2020, 12, 30), 3), hourly=True))
+
+	series, missing = asyncio.run(store.read_range("06", date(2020, 12, 29), date(2021, 1, 2), hourly=True))
+	assert missing == [(date(2020, 12, 29), date(2020, 12, 29)), (date(2021, 1, 2), date(2021, 1, 2))]
+	assert len(series["time"]) == 72
+	assert series["time"][0] == "2020-12-30T00:00"
+	assert series["temperature_2m"][0] == 1.5
+	assert series["relative_humidity_2m"][0] == 55
+	assert series["visibility"][0] is None
+
+def test_store_survives_reopen(tmp_path):
+	path = str(tmp_path / "archive.sqlite3")
+	first = ArchiveStore(path)
+	asyncio.run(first.write_series("06", _hourly_series(date(2021, 3, 1), 1), hourly=True))
+	first.close()
+
+	series, missing = asyncio.run(ArchiveStore(path).read_range("06", date(2021, 3, 1), date(2021, 3, 1), hourly=True))
+	assert missing == []
+	assert len(series["time"]) == 24
+
+def test_store_skips_recent_and_unavailable_days(tmp_path):
+	store = ArchiveStore(str(tmp_path / "archive.sqlite3"), min_age_days=7)
+	recent = datetime.now().date() - timedelta(days=2)
+	assert asyncio.run(store.write_series("06", _hourly_series(recent, 1), hourly=True)) == 0
+	assert asyncio.run(store.write_series("06", _hourly_series(date(2021, 3, 1), 1, value=None), hourly=True)) == 0
+
+def test_store_reuses_decoded_year_blocks(tmp_path):
+	store = ArchiveStore(str(tmp_path / "archive.sqlite3"))
+	asyncio.run(store.write_many([(code, _hourly_series(date(2021, 3, 1), 2)) for code in ("06", "34")], hourly=True))
+	store._blocks = LRUCache(store._blocks.max_bytes, sizeof=store._blocks.sizeof)
+
+	for day in (date(2021, 3, 1), date(2021, 3, 2)):
+		assert set(asyncio.run(store.read_day_many(["06", "34"], day))) == {"06", "34"}
+	assert store._blocks.stats()["misses"] == 2
+	assert store._blocks.stats()["hits"] == 2
+
+	asyncio.run(store.write_series("06", _hourly_series(date(2021, 3, 3), 1, value=4.0), hourly=True))
+	series, missing = asyncio.run(store.read_range("06", date(2021, 3, 3), date(2021, 3, 3), hourly=True))
+	assert missing == []
+	assert series["temperature_2m"][0] == 4.0
+
+def test_climatology_shares_store_connection(tmp_path):
+	store = ArchiveStore(str(tmp_path / "archive.sqlite3"))
+	service = ClimatologyService(store, 2020, 2021)
+	normals = ClimateNormals("06", service.reference, np.zeros((len(CLIMATE_FIELDS), len(CLIMATE_STATS), 366), dtype=np.float32), 1.0)
+	service._write(normals)
+
+	with store.connection() as connection:
+		assert connection.execute("SELECT COUNT(*) FROM normals").fetchone()[0] == 1
+	assert service._read("06").province == "06"
+
+def test_weather_fetches_only_days_missing_from_store(fake_upstream):
+	params = {"province": "06", "start_date": "2024-03-01", "end_date": "2024-03-10", "hourly": "true"}
+	assert client.get("/api/weather", params=params).status_code == 200
+	assert _requested_ranges(fake_upstream) == [("2024-03-01", "2024-03-10")]
+
+	weather._weather_cache.clear_local()
+	params.update(start_date="2024-03-05", end_date="2024-03-15")
+	response = client.get("/api/weather", params=params)
+	assert response.status_code == 200
+	assert _requested_ranges(fake_upstream)[-1] == ("2024-03-11", "2024-03-15")
+	assert len(response.json()["data"]["hourly"]["time"]) == 11 * 24
+
+def test_snapshot_reads_stored_days_after_restart(fake_upstream):
+	params = {"date": "2024-01-15", "time": "12:00"}
+	first = client.get("/api/weather/snapshot", params=params)
+	upstream_calls = len(fake_upstream.requests)
+
+	weather._snapshot_cache.clear_local()
+	weather._snapshot_hourly_cache.clear_local()
+	second = client.get("/api/weather/snapshot", params=params)
+	assert second.json()["provinces"] == first.json()["provinces"]
+	assert len(fake_upstream.requests) == upstream_calls
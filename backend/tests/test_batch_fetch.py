@@ -0,0 +1,40 @@
+import math
+
+from fastapi.testclient import TestClient
+
+from app.services.open_meteo import open_meteo
+from main import app
+
+client = TestClient(app)
+
+EXPECTED_BATCH_CALLS = math.ceil(81 / open_meteo.batch_size)
+
+
+def test_current_weather_uses_batched_requests(fake_upstream):
+	response = client.get("/api/weather/current")
+	assert response.status_code == 200
+	assert len(response.json()["provinces"]) == 81
+	assert len(fake_upstream.requests) == EXPECTED_BATCH_CALLS
+
+def test_snapshot_uses_batched_requests(fake_upstream):
+	response = client.get("/api/weather/snapshot", params={"date": "2024-01-15", "time": "12:00"})
+	assert response.status_code == 200
+	payload = response.json()
+	assert payload["coverage"]["available"] == 81
+	assert len(fake_upstream.requests) == EXPECTED_BATCH_CALLS
+
+def test_batch_split_keeps_province_order(fake_upstream):
+	response = client.get("/api/weather/snapshot", params={"date": "2024-01-15", "time": "00:00"})
+	provinces = response.json()["provinces"]
+	assert [item["plate_code"] for item in provinces] == sorted(item["plate_code"] for item in provinces)
+	adana = provinces[0]
+	assert adana["plate_code"] == "01"
+	assert adana["temperature"] == 37.0
+
+def test_batch_failure_falls_back_per_province(fake_upstream):
+	fake_upstream.fail_batches = True
+	response = client.get("/api/weather/snapshot", params={"date": "2024-01-15", "time": "12:00"})
+	assert response.status_code == 200
+	assert response.json()["coverage"]["available"] == 81
+	single_calls = [request for request in fake_upstream.requests if "," not in request.url.params["latitude"]]
+	assert len(single_calls) == 81
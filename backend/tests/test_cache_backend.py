@@ -0,0 +1,83 @@
+import asyncio
+import json
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import weather
+from app.services.cache import CacheBackend, RedisCacheBackend, TieredCache, deserialize_payload, serialize_payload
+from main import app
+
+client = TestClient(app)
+
+
+def test_serialized_payload_roundtrip_and_compression():
+	payload = {"values": [round(value * 0.1, 1) for value in range(2000)]}
+	data = serialize_payload(payload, 123.0)
+	assert data[:1] == b"z"
+	assert len(data) < len(str(payload))
+	assert deserialize_payload(data) == (payload, 123.0)
+
+def test_second_worker_reads_from_shared_backend(shared_cache):
+	first_worker = TieredCache("test", ttl_seconds=60)
+	second_worker = TieredCache("test", ttl_seconds=60)
+
+	asyncio.run(first_worker.set("key", {"a": 1}))
+	assert len(shared_cache) == 1
+	assert asyncio.run(second_worker.get("key")) == {"a": 1}
+
+def test_set_serializes_payload_once_for_both_tiers(shared_cache, monkeypatch):
+	calls = []
+	original_dumps = json.dumps
+
+	def counting_dumps(*args, **kwargs):
+		calls.append(1)
+		return original_dumps(*args, **kwargs)
+
+	monkeypatch.setattr(json, "dumps", counting_dumps)
+	writer = TieredCache("test", ttl_seconds=60)
+	asyncio.run(writer.set("key", {"values": list(range(1000))}))
+	asyncio.run(writer.set_many({"a": {"x": 1}, "b": {"y": 2}}))
+	assert len(calls) == 3
+	assert writer.stats()["l1"]["bytes"] > 0
+
+def test_expired_shared_entry_is_ignored(shared_cache):
+	writer = TieredCache("test", ttl_seconds=60)
+	reader = TieredCache("test", ttl_seconds=0)
+	asyncio.run(writer.set("key", {"a": 1}))
+	asyncio.run(asyncio.sleep(0.01))
+	assert asyncio.run(reader.get("key")) is None
+
+def test_current_weather_served_from_shared_cache_after_l1_loss(fake_upstream, shared_cache):
+	first = client.get("/api/weather/current")
+	assert first.status_code == 200
+	upstream_calls = len(fake_upstream.requests)
+
+	weather._current_cache.clear_local()
+	second = client.get("/api/weather/current")
+	assert second.status_code == 200
+	assert second.json() == first.json()
+	assert len(fake_upstream.requests) == upstream_calls
+
+def test_backend_without_required_methods_cannot_be_created():
+	class PartialBackend(CacheBackend):
+		async def get(self, key):
+			return None
+
+	with pytest.raises(TypeError):
+		PartialBackend()
+
+@pytest.mark.skipif(not os.getenv("TEST_REDIS_URL"), reason="TEST_REDIS_URL tanimli degil")
+def test_redis_backend_roundtrip():
+	async def roundtrip():
+		backend = RedisCacheBackend(os.environ["TEST_REDIS_URL"])
+		try:
+			await backend.set("havadurumu:test:key", b"value", 5)
+			value = await backend.get("havadurumu:test:key")
+			await backend.delete("havadurumu:test:key")
+			return value
+		finally:
+			await backend.close()
+
+	assert asyncio.run(roundtrip()) == b"value"
@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+
+from app.services.open_meteo import ARCHIVE_ENDPOINT, open_meteo
+from app.utils.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from main import app
+
+client = TestClient(app)
+
+ARCHIVE_HOST = "archive-api.open-meteo.com"
+
+
+class FakeClock:
+	def __init__(self):
+		self.now = 0.0
+
+	def __call__(self):
+		return self.now
+
+
+def test_breaker_opens_and_recovers_through_half_open():
+	clock = FakeClock()
+	breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=10, clock=clock)
+	breaker.record_failure()
+	assert breaker.state == CLOSED
+	breaker.record_failure()
+	assert breaker.state == OPEN
+	assert not breaker.allow()
+	assert breaker.stats()["rejected"] == 1
+
+	clock.now = 10
+	assert breaker.state == HALF_OPEN
+	assert breaker.allow()
+	assert not breaker.allow()
+	breaker.record_failure()
+	assert breaker.state == OPEN
+
+	clock.now = 20
+	assert breaker.allow()
+	breaker.record_success()
+	assert breaker.state == CLOSED
+	assert breaker.stats()["trips"] == 2
+
+def test_open_archive_breaker_is_skipped(fake_upstream, monkeypatch):
+	monkeypatch.setattr(open_meteo, "max_retries", 0)
+	monkeypatch.setattr(open_meteo.breakers[ARCHIVE_ENDPOINT], "failure_threshold", 1)
+	fake_upstream.failing_hosts[ARCHIVE_HOST] = 503
+	day = datetime.now().date() - timedelta(days=30)
+
+	first = client.get("/api/weather", params={"province": "06", "start_date": day.isoformat(), "hourly": "false"})
+	assert first.status_code == 200
+	assert open_meteo.breakers[ARCHIVE_ENDPOINT].state == OPEN
+
+	archive_calls = sum(request.url.host == ARCHIVE_HOST for request in fake_upstream.requests)
+	second = client.get("/api/weather", params={"province": "34", "start_date": day.isoformat(), "hourly": "false"})
+	assert second.status_code == 200
+	assert second.json()["data"]["daily"]["time"] == [day.isoformat()]
+	assert sum(request.url.host == ARCHIVE_HOST for request in fake_upstream.requests) == archive_calls
+
+	health = client.get("/api/health").json()
+	assert health["status"] == "degraded"
+	assert health["upstream"]["archive"]["state"] == OPEN
+	assert health["upstream"]["forecast"]["state"] == CLOSED
+
+def test_client_errors_do_not_trip_the_breaker(fake_upstream, monkeypatch):
+	monkeypatch.setattr(open_meteo.breakers[ARCHIVE_ENDPOINT], "failure_threshold", 1)
+	fake_upstream.failing_hosts[ARCHIVE_HOST] = 400
+	day = datetime.now().date() - timedelta(days=30)
+
+	response = client.get("/api/weather", params={"province": "06", "start_date": day.isoformat(), "hourly": "false"})
+	assert response.status_code == 200
+	assert sum(request.url.host == ARCHIVE_HOST for request in fake_upstream.requests) == 1
+	assert open_meteo.breakers[ARCHIVE_ENDPOINT].state == CLOSED
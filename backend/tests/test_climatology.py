@@ -0,0 +1,119 @@
+import asyncio
+import time
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.services.climatology import CLIMATE_FIELDS, CLIMATE_STATS, NORMALS_RETRY_AFTER_SECONDS, climatology, compute_normals, day_slot
+from app.services.geo_service import geo_service
+from main import app
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def short_reference(fake_upstream):
+	original = climatology.start_year, climatology.end_year
+	climatology.start_year, climatology.end_year = 2020, 2021
+	yield fake_upstream
+	climatology.start_year, climatology.end_year = original
+
+
+def _daily_series(start, end, value_for):
+	days = [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+	return {
+		"time": [day.isoformat() for day in days],
+		"temperature_2m_max": [value_for(day) + 5 for day in days],
+		"temperature_2m_min": [value_for(day) - 5 for day in days],
+		"precipitation_sum": [1.0 for _ in days],
+	}
+
+
+def test_day_slot_keeps_february_29_apart():
+	assert day_slot(date(2021, 2, 28)) == 58
+	assert day_slot(date(2020, 2, 29)) == 59
+	assert day_slot(date(2021, 3, 1)) == day_slot(date(2020, 3, 1)) == 60
+	assert day_slot(date(2021, 12, 31)) == 365
+
+def test_compute_normals_uses_window_around_each_day():
+	series = _daily_series(date(2020, 1, 1), date(2021, 12, 31), lambda day: day.year - 2020)
+	normals = compute_normals(series, 2020, 2021, window_days=1)
+	assert normals.shape == (len(CLIMATE_FIELDS), len(CLIMATE_STATS), 366)
+
+	mean = normals[CLIMATE_FIELDS.index("temperature_2m_mean")]
+	# 2020 ortalamasi 0, 2021 ortalamasi 1: her gunun normali 0.5, std 0.5.
+	assert mean[0, 100] == pytest.approx(0.5)
+	assert mean[1, 100] == pytest.approx(0.5)
+	assert mean[2, 100] == pytest.approx(0.0)
+	assert mean[4, 100] == pytest.approx(1.0)
+	assert normals[CLIMATE_FIELDS.index("precipitation_sum"), 0, 200] == pytest.approx(1.0)
+
+def _precompute(*plate_codes):
+	provinces = [geo_service.get_province_by_code(code) for code in plate_codes]
+	return asyncio.run(climatology.precompute(provinces))
+
+def test_normals_are_read_only_from_precomputed_table(short_reference):
+	params = {"province": "6", "start_date": "2024-07-01", "end_date": "2024-07-03"}
+	pending = client.get("/api/climate/normals", params=params)
+	assert pending.status_code == 503
+	assert pending.headers["retry-after"] == str(NORMALS_RETRY_AFTER_SECONDS)
+	assert short_reference.requests == []
+
+	assert _precompute("06") == {"ready": 1, "failed": 0}
+	upstream_calls = len(short_reference.requests)
+	assert upstream_calls == 2
+
+	response = client.get("/api/climate/normals", params=params)
+	assert response.status_code == 200
+	payload = response.json()
+	assert payload["plate_code"] == "06"
+	assert payload["reference"] == {"start_year": 2020, "end_year": 2021}
+	assert payload["days"] == ["07-01", "07-02", "07-03"]
+	assert len(payload["temperature_2m_mean"]["p90"]) == 3
+
+	climatology._normals.clear()
+	full = client.get("/api/climate/normals", params={"province": "06"}).json()
+	assert len(full["days"]) == 366
+	assert _precompute("06") == {"ready": 1, "failed": 0}
+	assert len(short_reference.requests) == upstream_calls
+
+def test_precompute_counts_failed_provinces(short_reference):
+	short_reference.failing_hosts = {"archive-api.open-meteo.com": 500, "api.open-meteo.com": 500}
+	assert _precompute("34") == {"ready": 0, "failed": 1}
+	assert client.get("/api/climate/normals", params={"province": "34"}).status_code == 503
+
+def test_lifespan_precomputes_normals(short_reference, monkeypatch):
+	monkeypatch.setattr(settings, "CLIMATE_PRECOMPUTE_ON_STARTUP", True)
+	provinces = [geo_service.get_province_by_code("06")]
+	monkeypatch.setattr(geo_service, "get_all_provinces", lambda: provinces)
+	with TestClient(app) as lifespan_client:
+		deadline = time.time() + 2
+		while climatology.running and time.time() < deadline:
+			time.sleep(0.01)
+		assert lifespan_client.get("/api/climate/normals", params={"province": "06"}).status_code == 200
+	assert not climatology.running
+
+def test_anomaly_against_normals(short_reference):
+	day = datetime.now().date() - timedelta(days=30)
+	params = {"province": "06", "date": day.isoformat()}
+	assert client.get("/api/weather/anomaly", params=params).status_code == 503
+
+	_precompute("06")
+	response = client.get("/api/weather/anomaly", params=params)
+	assert response.status_code == 200
+	daily = response.json()["daily"]
+	assert daily["time"] == [day.isoformat()]
+
+	temperature = daily["temperature_2m_max"]
+	assert temperature["value"] == temperature["normal"]
+	assert temperature["anomaly"] == [0.0]
+	assert temperature["z"] == [None]
+	assert temperature["category"] == ["normal"]
+
+def test_anomaly_rejects_long_ranges(short_reference):
+	response = client.get("/api/weather/anomaly", params={"province": "06", "date": "2022-01-01", "end_date": "2023-06-01"})
+	assert response.status_code == 400
+	assert client.get("/api/climate/normals", params={"province": "99"}).status_code == 404
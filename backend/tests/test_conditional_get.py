@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+
+from main import app
+
+client = TestClient(app)
+
+
+def test_past_weather_range_is_immutable_and_revalidates(fake_upstream):
+	params = {"province": "06", "start_date": "2024-03-01", "end_date": "2024-03-02"}
+	response = client.get("/api/weather", params=params)
+	assert response.status_code == 200
+	assert "immutable" in response.headers["cache-control"]
+	etag = response.headers["etag"]
+	assert response.headers["last-modified"].endswith("GMT")
+
+	calls = len(fake_upstream.requests)
+	revalidated = client.get("/api/weather", params=params, headers={"If-None-Match": etag})
+	assert revalidated.status_code == 304
+	assert revalidated.content == b""
+	assert revalidated.headers["etag"] == etag
+	assert len(fake_upstream.requests) == calls
+
+	by_date = client.get("/api/weather", params=params, headers={"If-Modified-Since": response.headers["last-modified"]})
+	assert by_date.status_code == 304
+
+def test_recent_weather_uses_remaining_ttl(fake_upstream):
+	today = datetime.now().date().isoformat()
+	response = client.get("/api/weather", params={"province": "06", "start_date": today})
+	assert response.status_code == 200
+	cache_control = response.headers["cache-control"]
+	assert "immutable" not in cache_control
+	assert 0 < int(cache_control.split("max-age=")[1]) <= 900
+
+	stale = client.get("/api/weather", params={"province": "06", "start_date": today}, headers={"If-None-Match": '"other"'})
+	assert stale.status_code == 200
+	assert stale.json() == response.json()
+
+def test_snapshot_and_current_send_validators(fake_upstream):
+	day = (datetime.now().date() - timedelta(days=30)).isoformat()
+	snapshot = client.get("/api/weather/snapshot", params={"date": day, "time": "12:00"})
+	assert snapshot.status_code == 200
+	assert snapshot.headers["etag"]
+	again = client.get("/api/weather/snapshot", params={"date": day, "time": "12:00"}, headers={"If-None-Match": snapshot.headers["etag"]})
+	assert again.status_code == 304
+
+	current = client.get("/api/weather/current")
+	assert current.status_code == 200
+	assert "age" in current.headers
+	assert client.get("/api/weather/current", headers={"If-None-Match": current.headers["etag"]}).status_code == 304
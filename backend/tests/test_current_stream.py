@@ -0,0 +1,72 @@
+import asyncio
+import json
+import math
+
+import httpx
+from fastapi.testclient import TestClient
+
+from app.api import weather
+from app.services.open_meteo import BATCH_CHUNK_SIZE
+from main import app
+
+client = TestClient(app)
+
+
+def _ndjson(response):
+	return [json.loads(line) for line in response.text.splitlines() if line]
+
+def test_stream_live_fanout_ends_with_summary(fake_upstream):
+	fake_upstream.fail_batches = True
+	response = client.get("/api/weather/current/stream")
+	assert response.status_code == 200
+	assert response.headers["content-type"].startswith("application/x-ndjson")
+
+	events = _ndjson(response)
+	assert [event["type"] for event in events[:-1]] == ["province"] * (len(events) - 1)
+	summary = events[-1]
+	assert summary["type"] == "summary"
+	assert summary["data"]["source"] == "live"
+	assert summary["data"]["coverage"]["available"] == len(events) - 1
+	assert summary["data"]["failures"] == []
+
+	# Akis sonunda payload cache'e yazilir; normal uc tekrar upstream'e gitmez.
+	calls = len(fake_upstream.requests)
+	current = client.get("/api/weather/current").json()
+	assert len(fake_upstream.requests) == calls
+	assert {item["plate_code"] for item in current["provinces"]} == {event["data"]["plate_code"] for event in events[:-1]}
+
+def test_stream_serves_cached_payload_as_sse(fake_upstream):
+	client.get("/api/weather/current")
+	calls = len(fake_upstream.requests)
+
+	response = client.get("/api/weather/current/stream", headers={"Accept": "text/event-stream"})
+	assert response.headers["content-type"].startswith("text/event-stream")
+	blocks = [block for block in response.text.split("\n\n") if block]
+	assert blocks[-1].startswith("event: summary\ndata: ")
+	summary = json.loads(blocks[-1].split("data: ", 1)[1])
+	assert summary["source"] == "cache"
+	assert len(blocks) - 1 == summary["coverage"]["available"]
+	assert len(fake_upstream.requests) == calls
+	assert weather.current_refresher.latest is not None
+
+def test_concurrent_cold_streams_share_one_fanout(fake_upstream):
+	fake_upstream.delay = 0.05
+
+	async def run():
+		transport = httpx.ASGITransport(app=app)
+		async with httpx.AsyncClient(transport=transport, base_url="http://test") as async_client:
+			return await asyncio.gather(
+				async_client.get("/api/weather/current/stream"),
+				async_client.get("/api/weather/current/stream"),
+				async_client.get("/api/weather/current"),
+			)
+
+	first, second, current = asyncio.run(run())
+	# 81 il tek fan-out'ta BATCH_CHUNK_SIZE'lik toplu isteklerle cekilir.
+	assert len(fake_upstream.requests) == math.ceil(len(weather._located_provinces()) / BATCH_CHUNK_SIZE)
+	first_events, second_events = _ndjson(first), _ndjson(second)
+	assert first_events[-1]["data"]["source"] == second_events[-1]["data"]["source"] == "live"
+	assert sorted(event["data"]["plate_code"] for event in first_events[:-1]) == sorted(
+		event["data"]["plate_code"] for event in second_events[:-1]
+	)
+	assert len(current.json()["provinces"]) == len(first_events) - 1
@@ -0,0 +1,141 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api import weather
+from app.config import settings
+from app.services.open_meteo import ARCHIVE_ENDPOINT, open_meteo
+from app.utils.deadline import Deadline, DeadlineExceeded
+from main import app
+
+client = TestClient(app)
+
+
+class FakeClock:
+	def __init__(self):
+		self.now = 0.0
+
+	def __call__(self):
+		return self.now
+
+
+def test_deadline_caps_each_step():
+	clock = FakeClock()
+	deadline = Deadline(5, clock=clock)
+	assert deadline.timeout(12) == 5
+	clock.now = 4
+	assert deadline.timeout(0.5) == 0.5
+	assert deadline.timeout(12) == 1
+	clock.now = 5
+	assert deadline.expired
+	with pytest.raises(DeadlineExceeded):
+		deadline.timeout(12)
+
+def test_request_stops_at_deadline_without_tripping_breaker(fake_upstream):
+	fake_upstream.delay = 1.0
+
+	async def run():
+		return await open_meteo.get_historical_weather(39.9, 32.8, "2024-01-15", deadline=Deadline(0.1))
+
+	started = time.monotonic()
+	with pytest.raises(DeadlineExceeded):
+		asyncio.run(run())
+	assert time.monotonic() - started < 0.5
+	assert open_meteo.breakers[ARCHIVE_ENDPOINT].stats()["consecutive_failures"] == 0
+
+def test_weather_fails_fast_when_budget_is_spent(fake_upstream, monkeypatch):
+	monkeypatch.setattr(settings, "REQUEST_DEADLINE_SECONDS", 0.2)
+	fake_upstream.delay = 1.0
+	day = datetime.now().date() - timedelta(days=30)
+
+	started = time.monotonic()
+	response = client.get("/api/weather", params={"province": "06", "start_date": day.isoformat(), "hourly": "false"})
+	assert response.status_code == 504
+	assert time.monotonic() - started < 1.0
+
+def test_snapshot_drops_slow_provinces(fake_upstream, monkeypatch):
+	monkeypatch.setattr(settings, "REQUEST_DEADLINE_SECONDS", 0.5)
+	fake_upstream.fail_batches = True
+	fake_upstream.delay = 2.0
+	fake_upstream.slow_requests = lambda params: "," not in params["latitude"] and float(params["latitude"]) > 40.5
+
+	started = time.monotonic()
+	response = client.get("/api/weather/snapshot", params={"date": "2024-01-15", "time": "12:00"})
+	assert time.monotonic() - started < 1.5
+	assert response.status_code == 200
+	coverage = response.json()["coverage"]
+	assert 0 < coverage["available"] < coverage["total"]
+	assert response.headers["cache-control"] == "no-store"
+	assert asyncio.run(weather._snapshot_hourly_cache.get_entry("2024-01-15")) is None
+
+def test_weather_follower_shares_leader_degraded_flag(fake_upstream, monkeypatch):
+	async def partial_payload(province, province_data, start_dt, end_dt, hourly_bool, deadline=None):
+		await asyncio.sleep(0.05)
+		deadline.mark_degraded()
+		return {"daily": {"time": []}}
+
+	monkeypatch.setattr(weather, "_fetch_weather_payload", partial_payload)
+	start = datetime(2024, 1, 15)
+
+	async def run():
+		province_data = {"latitude": 39.9, "longitude": 32.8}
+		leader = asyncio.ensure_future(weather._load_weather_entry("06", province_data, start, start, False, Deadline(5)))
+		await asyncio.sleep(0)
+		follower = await weather._load_weather_entry("06", province_data, start, start, False, Deadline(5))
+		return await leader, follower
+
+	leader, follower = asyncio.run(run())
+	assert leader[2] is True
+	assert follower[2] is True
+	assert asyncio.run(weather._weather_cache.get_entry(weather._weather_cache_key("06", start, start, False))) is None
+
+def test_snapshot_maps_spent_budget_to_504(fake_upstream, monkeypatch):
+	async def spent(date, time_value, target_hour, deadline=None):
+		raise DeadlineExceeded("butce doldu")
+
+	monkeypatch.setattr(weather, "_build_snapshot_payload", spent)
+	response = client.get("/api/weather/snapshot", params={"date": "2024-01-15", "time": "12:00"})
+	assert response.status_code == 504
+
+def test_snapshot_day_is_bounded_by_deadline(fake_upstream, monkeypatch):
+	monkeypatch.setattr(settings, "REQUEST_DEADLINE_SECONDS", 0.5)
+	fake_upstream.fail_batches = True
+	fake_upstream.delay = 2.0
+	fake_upstream.slow_requests = lambda params: "," not in params["latitude"] and float(params["latitude"]) > 40.5
+
+	started = time.monotonic()
+	response = client.get("/api/weather/snapshot/day", params={"date": "2024-01-15"})
+	assert time.monotonic() - started < 1.5
+	assert response.status_code == 200
+	assert response.headers["cache-control"] == "no-store"
+
+def test_snapshot_day_maps_errors(fake_upstream, monkeypatch):
+	async def broken(date, deadline=None):
+		raise RuntimeError("kup bozuk")
+
+	monkeypatch.setattr(weather, "_load_snapshot_cube", broken)
+	response = client.get("/api/weather/snapshot/day", params={"date": "2024-01-15"})
+	assert response.status_code == 500
+	assert "kup bozuk" in response.json()["detail"]
+
+def test_national_is_bounded_by_deadline(fake_upstream, monkeypatch):
+	monkeypatch.setattr(settings, "REQUEST_DEADLINE_SECONDS", 0.5)
+	fake_upstream.fail_batches = True
+	fake_upstream.delay = 2.0
+	fake_upstream.slow_requests = lambda params: "," not in params["latitude"] and float(params["latitude"]) > 40.5
+
+	started = time.monotonic()
+	response = client.get("/api/weather/national", params={"date": "2024-01-15"})
+	assert time.monotonic() - started < 1.5
+	assert response.status_code == 200
+	assert response.headers["cache-control"] == "no-store"
+
+def test_national_maps_errors(fake_upstream, monkeypatch):
+	async def spent(date, deadline=None):
+		raise DeadlineExceeded("butce doldu")
+
+	monkeypatch.setattr(weather, "_load_snapshot_cube", spent)
+	assert client.get("/api/weather/national", params={"date": "2024-01-15"}).status_code == 504
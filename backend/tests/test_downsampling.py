@@ -0,0 +1,62 @@
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app.api import weather
+from app.utils.downsampling import aggregate_series, lttb_indices
+from main import app
+
+client = TestClient(app)
+
+PARAMS = {"province": "06", "start_date": "2024-03-01", "end_date": "2024-03-31"}
+
+
+def test_lttb_keeps_endpoints_and_peaks():
+	values = np.zeros(1000)
+	values[437] = 50.0
+	values[812] = -30.0
+	indexes = lttb_indices(values, 50)
+	assert len(indexes) == 50
+	assert indexes[0] == 0 and indexes[-1] == 999
+	assert 437 in indexes and 812 in indexes
+	assert np.all(np.diff(indexes) > 0)
+
+def test_aggregate_series_per_field_rules():
+	series = {
+		"time": ["2024-03-01T00:00", "2024-03-01T12:00", "2024-03-02T00:00"],
+		"temperature_2m": [10.0, 20.0, None],
+		"precipitation": [1.5, 2.0, None],
+		"wind_direction_10m": [350.0, 10.0, 90.0],
+		"weather_code": [3, 61, 0],
+	}
+	daily = aggregate_series(series, "day")
+	assert daily["time"] == ["2024-03-01", "2024-03-02"]
+	assert daily["temperature_2m"] == [15.0, None]
+	assert daily["precipitation"] == [3.5, None]
+	assert daily["wind_direction_10m"][0] in (0.0, 360.0)
+	assert daily["weather_code"] == [61, 0]
+
+	weekly = aggregate_series(series, "week")
+	assert weekly["time"] == ["2024-02-26"]
+
+def test_weather_max_points_and_resolution(fake_upstream):
+	full = client.get("/api/weather", params=PARAMS).json()
+	assert len(full["data"]["hourly"]["time"]) == 31 * 24
+
+	sampled = client.get("/api/weather", params={**PARAMS, "max_points": 200}).json()
+	assert len(sampled["data"]["hourly"]["time"]) == 200
+	assert sampled["downsampling"] == {"resolution": None, "max_points": 200, "source_points": 744, "points": 200}
+	assert sampled["data"]["hourly"]["time"][0] == full["data"]["hourly"]["time"][0]
+
+	daily = client.get("/api/weather", params={**PARAMS, "resolution": "day"}).json()
+	assert len(daily["data"]["hourly"]["time"]) == 31
+	assert daily["data"]["hourly"]["time"][0] == "2024-03-01"
+
+	calls = len(fake_upstream.requests)
+	view = weather._weather_views.get(("06|2024-03-01|2024-03-31|True", "day", None))
+	assert client.get("/api/weather", params={**PARAMS, "resolution": "day"}).json() == daily
+	assert weather._weather_views.get(("06|2024-03-01|2024-03-31|True", "day", None)) is view
+	assert len(fake_upstream.requests) == calls
+
+def test_invalid_resolution_is_rejected():
+	response = client.get("/api/weather", params={**PARAMS, "resolution": "decade"})
+	assert response.status_code == 422
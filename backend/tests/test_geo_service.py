@@ -0,0 +1,39 @@
+from fastapi.testclient import TestClient
+
+from app.services.geo_service import geo_service, normalize_province_name
+from app.utils.spatial import haversine_km
+from main import app
+
+client = TestClient(app)
+
+
+def test_turkish_aware_name_lookup():
+	assert normalize_province_name("İSTANBUL") == "istanbul"
+	assert normalize_province_name("  Ağrı ") == "agri"
+	assert geo_service.get_province_by_name("ISTANBUL")["plate_code"] == "34"
+	assert geo_service.get_province_by_name("Ağrı")["plate_code"] == "04"
+	assert geo_service.get_province_by_name("Atlantis") is None
+
+def test_code_lookup_uses_index():
+	assert geo_service.get_province_by_code("06")["name"] == "Ankara"
+	assert geo_service.get_province_by_code("99") is None
+
+def test_nearest_matches_brute_force():
+	provinces = geo_service.get_all_provinces()
+	for latitude, longitude in [(41.0, 29.0), (37.2, 44.5), (36.5, 27.0), (39.9, 32.8)]:
+		expected = sorted(provinces, key=lambda item: haversine_km(latitude, longitude, item["latitude"], item["longitude"]))[:4]
+		nearest = geo_service.get_nearest_provinces(latitude, longitude, 4)
+		assert [item["plate_code"] for item, _ in nearest] == [item["plate_code"] for item in expected]
+
+def test_nearest_endpoint():
+	response = client.get("/api/provinces/nearest", params={"lat": 39.93, "lon": 32.85, "k": 3})
+	assert response.status_code == 200
+	payload = response.json()
+	assert payload["total"] == 3
+	assert payload["provinces"][0]["plate_code"] == "06"
+	distances = [item["distance_km"] for item in payload["provinces"]]
+	assert distances == sorted(distances)
+
+def test_nearest_endpoint_validates_input():
+	assert client.get("/api/provinces/nearest", params={"lat": 95, "lon": 32}).status_code == 422
+	assert client.get("/api/provinces/nearest", params={"lat": 39, "lon": 32, "k": 0}).status_code == 422
@@ -0,0 +1,94 @@
+import json
+import time
+from datetime import date
+
+from fastapi.testclient import TestClient
+
+from app.api import weather
+from app.config import settings
+from app.utils.helpers import split_by_year
+from main import app
+
+client = TestClient(app)
+
+PARAMS = {"province": "06", "start_date": "2019-11-20", "end_date": "2022-02-10", "hourly": "false"}
+
+
+def test_split_by_year():
+	assert split_by_year(date(2019, 11, 20), date(2021, 2, 10)) == [
+		(date(2019, 11, 20), date(2019, 12, 31)),
+		(date(2020, 1, 1), date(2020, 12, 31)),
+		(date(2021, 1, 1), date(2021, 2, 10)),
+	]
+	assert split_by_year(date(2020, 3, 1), date(2020, 3, 1)) == [(date(2020, 3, 1), date(2020, 3, 1))]
+
+def test_long_range_is_fetched_in_year_chunks(fake_upstream):
+	payload = client.get("/api/weather", params=PARAMS).json()
+	assert len(payload["data"]["daily"]["time"]) == (date(2022, 2, 10) - date(2019, 11, 20)).days + 1
+
+	ranges = sorted((request.url.params["start_date"], request.url.params["end_date"]) for request in fake_upstream.requests)
+	assert ranges == [
+		("2019-11-20", "2019-12-31"),
+		("2020-01-01", "2020-12-31"),
+		("2021-01-01", "2021-12-31"),
+		("2022-01-01", "2022-02-10"),
+	]
+
+def test_ndjson_streams_chunks_in_order(fake_upstream):
+	response = client.get("/api/weather", params=PARAMS, headers={"Accept": "application/x-ndjson"})
+	assert response.status_code == 200
+	assert response.headers["content-type"].startswith("application/x-ndjson")
+
+	events = [json.loads(line) for line in response.text.splitlines()]
+	assert events[0]["type"] == "meta"
+	assert events[0]["data"]["plate_code"] == "06"
+	chunks = [event["data"] for event in events if event["type"] == "chunk"]
+	assert [chunk["start_date"] for chunk in chunks] == ["2019-11-20", "2020-01-01", "2021-01-01", "2022-01-01"]
+	assert chunks[1]["data"]["daily"]["time"][0] == "2020-01-01"
+	assert len(chunks[1]["data"]["daily"]["time"]) == 366
+	assert chunks[1]["degraded"] is False
+	assert events[-1] == {"type": "summary", "data": {"chunks": 4, "degraded": 0, "points": 814, "failures": []}}
+
+	# Her parca kendi anahtariyla cache'lenir.
+	assert weather._weather_cache._local.get_entry("06|2020-01-01|2020-12-31|False") is not None
+
+def test_ndjson_rejects_downsampling(fake_upstream):
+	for extra in ({"max_points": 100}, {"resolution": "month"}):
+		response = client.get("/api/weather", params={**PARAMS, **extra}, headers={"Accept": "application/x-ndjson"})
+		assert response.status_code == 400
+	assert fake_upstream.requests == []
+
+def test_ndjson_chunks_that_miss_their_budget_are_errors(fake_upstream, monkeypatch):
+	monkeypatch.setattr(settings, "REQUEST_DEADLINE_SECONDS", 0.2)
+	fake_upstream.delay = 1.0
+
+	started = time.monotonic()
+	response = client.get("/api/weather", params=PARAMS, headers={"Accept": "application/x-ndjson"})
+	assert time.monotonic() - started < 1.0
+	events = [json.loads(line) for line in response.text.splitlines()]
+	assert [event["type"] for event in events] == ["meta", "error", "error", "error", "error", "summary"]
+	assert events[-1]["data"]["chunks"] == 0
+
+def test_ndjson_budget_is_per_chunk(fake_upstream, monkeypatch):
+	monkeypatch.setattr(settings, "REQUEST_DEADLINE_SECONDS", 0.4)
+	fake_upstream.delay = 0.15
+	params = {**PARAMS, "start_date": "2012-01-01"}
+
+	started = time.monotonic()
+	response = client.get("/api/weather", params=params, headers={"Accept": "application/x-ndjson"})
+	assert time.monotonic() - started > 0.4
+	summary = [json.loads(line) for line in response.text.splitlines()][-1]["data"]
+	assert summary["chunks"] == 11
+	assert summary["failures"] == []
+
+def test_ndjson_marks_degraded_chunks(fake_upstream, monkeypatch):
+	async def partial_payload(province, province_data, start_dt, end_dt, hourly_bool, deadline=None):
+		deadline.mark_degraded()
+		return {"data": {"daily": {"time": [start_dt.isoformat()]}}}
+
+	monkeypatch.setattr(weather, "_fetch_weather_payload", partial_payload)
+	response = client.get("/api/weather", params=PARAMS, headers={"Accept": "application/x-ndjson"})
+	events = [json.loads(line) for line in response.text.splitlines()]
+	assert all(event["data"]["degraded"] for event in events if event["type"] == "chunk")
+	assert events[-1]["data"]["degraded"] == 4
+	assert weather._weather_cache._local.get_entry("06|2020-01-01|2020-12-31|False") is None
@@ -0,0 +1,62 @@
+import json
+import time
+
+from app.utils.lru_cache import LRUCache, estimate_size
+
+
+def test_least_recently_used_entry_is_evicted_first():
+	cache = LRUCache(max_bytes=1000, max_entries=2)
+	cache.put("a", 1)
+	cache.put("b", 2)
+	assert cache.get("a") == 1
+	cache.put("c", 3)
+
+	assert "b" not in cache
+	assert cache.get("a") == 1
+	assert cache.get("c") == 3
+	assert cache.evictions == 1
+
+def test_byte_budget_counts_payload_size():
+	cache = LRUCache(max_bytes=100)
+	cache.put("small", "x" * 10)
+	cache.put("large", "y" * 80)
+	assert cache.current_bytes == 90
+
+	cache.put("another", "z" * 20)
+	assert "small" not in cache
+	assert cache.current_bytes == 100
+
+def test_oversized_value_is_rejected():
+	cache = LRUCache(max_bytes=10)
+	assert cache.put("big", "x" * 11) is False
+	assert len(cache) == 0
+	assert cache.rejections == 1
+
+def test_per_entry_ttl_and_counters():
+	cache = LRUCache(max_bytes=1000, ttl_seconds=60)
+	now = time.time()
+	cache.put("short", 1, ttl_seconds=1, timestamp=now - 5)
+	cache.put("default", 2, timestamp=now - 5)
+
+	assert cache.get("short") is None
+	assert cache.get("default") == 2
+	assert cache.get("missing") is None
+	stats = cache.stats()
+	assert (stats["hits"], stats["misses"], stats["expirations"]) == (1, 2, 1)
+	assert stats["bytes"] == estimate_size(2)
+
+def test_replacing_a_key_updates_byte_count():
+	cache = LRUCache(max_bytes=1000)
+	cache.put("key", "x" * 50)
+	cache.put("key", "x" * 5)
+	assert cache.current_bytes == 5
+	assert cache.get_entry("key")[0] == "x" * 5
+
+def test_size_estimate_walks_structure_without_serializing(monkeypatch):
+	hours = [f"2024-01-01T{hour:02d}:00" for hour in range(24)] * 365
+	payload = {"data": {"hourly": {"time": hours, "temperature_2m": [12.34] * len(hours)}}}
+	actual = len(json.dumps(payload, separators=(",", ":")))
+
+	monkeypatch.setattr(json, "dumps", None)
+	estimate = estimate_size(payload)
+	assert 0.5 * actual < estimate < 2 * actual
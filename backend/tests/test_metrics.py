@@ -0,0 +1,67 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app.utils import metrics
+from app.utils.metrics import Counter, Histogram
+from main import app
+
+client = TestClient(app)
+
+
+def _sample(text, line_prefix):
+	for line in text.splitlines():
+		if line.startswith(line_prefix + " "):
+			return float(line.rsplit(" ", 1)[1])
+	return None
+
+
+def test_histogram_renders_cumulative_buckets():
+	histogram = Histogram("test_duration_seconds", "test", ("route",), buckets=(0.1, 1.0))
+	histogram.observe(0.05, "/a")
+	histogram.observe(0.5, "/a")
+	histogram.observe(5.0, "/a")
+	counter = Counter("test_events_total", "test", ("kind",))
+	counter.inc('say "hi"')
+
+	text = metrics.render()
+	assert "# TYPE test_duration_seconds histogram" in text
+	assert _sample(text, 'test_duration_seconds_bucket{route="/a",le="0.1"}') == 1
+	assert _sample(text, 'test_duration_seconds_bucket{route="/a",le="1"}') == 2
+	assert _sample(text, 'test_duration_seconds_bucket{route="/a",le="+Inf"}') == 3
+	assert _sample(text, 'test_duration_seconds_count{route="/a"}') == 3
+	assert _sample(text, 'test_duration_seconds_sum{route="/a"}') == 5.55
+	assert _sample(text, 'test_events_total{kind="say \\"hi\\""}') == 1
+
+def test_metrics_endpoint_reports_routes_upstream_caches_and_fallbacks(fake_upstream):
+	metrics.reset()
+	assert client.get("/api/weather/snapshot", params={"date": "2024-01-15", "time": "12:00"}).status_code == 200
+	assert client.get("/api/weather/snapshot", params={"date": "2024-01-15", "time": "12:00"}).status_code == 200
+
+	response = client.get("/api/metrics")
+	assert response.status_code == 200
+	assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+	text = response.text
+
+	assert _sample(text, 'http_request_duration_seconds_count{route="/api/weather/snapshot",method="GET",status="200"}') == 2
+	assert _sample(text, 'openmeteo_request_duration_seconds_count{endpoint="archive",outcome="ok"}') == 3
+	assert _sample(text, 'weather_fallback_total{chain="snapshot",path="archive_batch"}') == 81
+	assert _sample(text, 'weather_fanout_coverage_ratio{fanout="snapshot"}') == 1
+	assert _sample(text, 'weather_cache_hits_total{cache="snapshot",tier="l1"}') >= 1
+	assert _sample(text, 'openmeteo_circuit_open{endpoint="archive"}') == 0
+
+def test_unmatched_paths_share_one_label():
+	metrics.reset()
+	client.get("/api/does-not-exist/1")
+	client.get("/api/does-not-exist/2")
+	text = client.get("/api/metrics").text
+	assert _sample(text, 'http_request_duration_seconds_count{route="unmatched",method="GET",status="404"}') == 2
+
+def test_metric_without_samples_cannot_be_created():
+	class Partial(metrics._Metric):
+		def reset(self):
+			pass
+
+	registered = len(metrics._metrics)
+	with pytest.raises(TypeError):
+		Partial("havadurumu_partial", "Eksik metrik")
+	assert len(metrics._metrics) == registered
@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app.api import weather
+from app.services.geo_service import geo_service
+from app.services.national_stats import column_stats, concat_columns, national_day_stats
+from app.services.snapshot_cube import SnapshotCube
+from main import app
+
+client = TestClient(app)
+
+
+def test_column_stats_per_step():
+	values = np.array([[1.0, np.nan], [3.0, np.nan], [5.0, np.nan]])
+	stats = column_stats(values, ["01", "02", "03"])
+	assert stats["mean"] == [3.0, None]
+	assert stats["min"] == [1.0, None]
+	assert stats["max"] == [5.0, None]
+	assert stats["p50"] == [3.0, None]
+	assert stats["min_province"] == ["01", None]
+	assert stats["max_province"] == ["03", None]
+
+def _cube(date, plate_codes):
+	provinces = [
+		{"plate_code": code, "hourly": {"time": [f"{date}T{hour:02d}:00" for hour in range(24)], "temperature_2m": [10.0] * 24}}
+		for code in plate_codes
+	]
+	return SnapshotCube(date, provinces, total=3)
+
+def test_region_without_reporting_provinces_keeps_columns_aligned():
+	regions = {"01": "Akdeniz", "06": "Ic Anadolu", "34": "Marmara"}
+	first = national_day_stats(_cube("2024-01-15", ["01", "06", "34"]), regions)
+	second = national_day_stats(_cube("2024-01-16", ["01", "06"]), regions)
+	merged = concat_columns([first, second])
+
+	assert set(merged["regions"]) == {"Akdeniz", "Ic Anadolu", "Marmara"}
+	marmara = merged["regions"]["Marmara"]
+	assert marmara["time"] == ["2024-01-15", "2024-01-16"]
+	assert marmara["provinces"] == [1, 0]
+	assert marmara["temperature_2m"] == [10.0, None]
+	assert merged["regions"]["Akdeniz"]["temperature_2m"] == [10.0, 10.0]
+
+def test_every_province_has_a_region():
+	provinces = geo_service.get_all_provinces()
+	assert len(provinces) == 81
+	assert len({province["region"] for province in provinces}) == 7
+
+def test_national_endpoint_for_a_range(fake_upstream):
+	end = datetime.now().date() - timedelta(days=30)
+	start = end - timedelta(days=1)
+	response = client.get("/api/weather/national", params={"date": start.isoformat(), "end_date": end.isoformat()})
+	assert response.status_code == 200
+	payload = response.json()
+
+	assert payload["daily"]["time"] == [start.isoformat(), end.isoformat()]
+	assert len(payload["hourly"]["time"]) == 48
+	temperature = payload["hourly"]["temperature_2m"]
+	assert len(temperature["mean"]) == 48
+	assert all(low <= mean <= high for low, mean, high in zip(temperature["min"], temperature["mean"], temperature["max"]))
+	assert payload["coverage"]["available"] == [81, 81]
+	assert set(payload["regions"]) == {province["region"] for province in geo_service.get_all_provinces()}
+	assert len(payload["regions"]["Marmara"]["temperature_2m"]) == 2
+
+	# Fake upstream degeri enlemle artar; en yuksek deger en kuzeydeki ilde olmali.
+	northern = max(geo_service.get_all_provinces(), key=lambda province: province["latitude"])
+	assert payload["daily"]["temperature_2m"]["max_province"][0] == northern["plate_code"]
+
+	calls = len(fake_upstream.requests)
+	stats = weather._national_days.get(start.isoformat())
+	assert client.get("/api/weather/national", params={"date": start.isoformat()}).status_code == 200
+	assert weather._national_days.get(start.isoformat()) is stats
+	assert len(fake_upstream.requests) == calls
+
+def test_national_rejects_long_ranges():
+	response = client.get("/api/weather/national", params={"date": "2024-01-01", "end_date": "2024-03-01"})
+	assert response.status_code == 400
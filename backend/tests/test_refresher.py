@@ -0,0 +1,82 @@
+import asyncio
+import math
+import time
+
+from fastapi.testclient import TestClient
+
+from app.api import weather
+from app.config import settings
+from app.services.open_meteo import open_meteo
+from app.services.refresher import BackgroundRefresher
+from main import app
+
+client = TestClient(app)
+
+EXPECTED_BATCH_CALLS = math.ceil(81 / open_meteo.batch_size)
+
+
+def test_stale_payload_is_served_while_refreshing():
+	builds = []
+
+	async def build():
+		builds.append(1)
+		await asyncio.sleep(0.05)
+		return {"build": len(builds)}, time.time()
+
+	async def run():
+		refresher = BackgroundRefresher("test_refresh", build, interval_seconds=60)
+		first = await refresher.get()
+		refresher._latest = (first[0], time.time() - 120)
+
+		started = time.perf_counter()
+		stale = await refresher.get()
+		elapsed = time.perf_counter() - started
+		await asyncio.sleep(0.1)
+		fresh = await refresher.get()
+		return stale, elapsed, fresh
+
+	stale, elapsed, fresh = asyncio.run(run())
+	assert stale[0] == {"build": 1}
+	assert elapsed < 0.01
+	assert fresh[0] == {"build": 2}
+
+def test_failed_refresh_keeps_last_good_payload():
+	calls = []
+
+	async def build():
+		calls.append(1)
+		if len(calls) > 1:
+			raise RuntimeError("upstream down")
+		return {"ok": True}, time.time() - 120
+
+	async def run():
+		refresher = BackgroundRefresher("test_refresh_fail", build, interval_seconds=60)
+		await refresher.get()
+		stale = await refresher.get()
+		await asyncio.sleep(0.01)
+		return stale, await refresher.get()
+
+	stale, after_failure = asyncio.run(run())
+	assert stale[0] == {"ok": True}
+	assert after_failure[0] == {"ok": True}
+
+def test_current_weather_reports_age(fake_upstream):
+	response = client.get("/api/weather/current")
+	assert response.status_code == 200
+	assert int(response.headers["age"]) >= 0
+	# Age ile birlikte gonderilen max-age yasi ikinci kez dusmemeli.
+	assert response.headers["cache-control"] == f"public, max-age={int(weather.current_refresher.interval_seconds)}"
+
+def test_lifespan_starts_and_stops_refresher(fake_upstream, monkeypatch):
+	monkeypatch.setattr(settings, "CLIMATE_PRECOMPUTE_ON_STARTUP", False)
+	with TestClient(app) as lifespan_client:
+		deadline = time.time() + 2
+		while weather.current_refresher.age_seconds() is None and time.time() < deadline:
+			time.sleep(0.01)
+		assert weather.current_refresher.running
+		response = lifespan_client.get("/api/weather/current")
+		assert response.status_code == 200
+		assert len(response.json()["provinces"]) == 81
+
+	assert not weather.current_refresher.running
+	assert len(fake_upstream.requests) == EXPECTED_BATCH_CALLS
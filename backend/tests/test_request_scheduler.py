@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+from app.utils.deadline import Deadline, DeadlineExceeded
+from app.utils.request_scheduler import BACKGROUND, BULK, INTERACTIVE, RequestScheduler, TokenBucket
+
+
+class FakeClock:
+	def __init__(self):
+		self.now = 0.0
+
+	def __call__(self):
+		return self.now
+
+
+def test_interactive_requests_jump_the_queue():
+	scheduler = RequestScheduler(initial_limit=1, min_limit=1, max_limit=1)
+	order = []
+
+	async def call(name, priority, hold):
+		async with scheduler.slot(priority) as ticket:
+			order.append(name)
+			await hold.wait()
+			ticket.observe(overloaded=False)
+
+	async def run():
+		first_done = asyncio.Event()
+		released = asyncio.Event()
+		released.set()
+		first = asyncio.ensure_future(call("first", BULK, first_done))
+		await asyncio.sleep(0)
+		waiting = [
+			asyncio.ensure_future(call("background", BACKGROUND, released)),
+			asyncio.ensure_future(call("bulk", BULK, released)),
+			asyncio.ensure_future(call("interactive", INTERACTIVE, released)),
+		]
+		await asyncio.sleep(0)
+		assert scheduler.stats()["queued"] == {"interactive": 1, "bulk": 1, "background": 1}
+		first_done.set()
+		await asyncio.gather(first, *waiting)
+
+	asyncio.run(run())
+	assert order == ["first", "interactive", "bulk", "background"]
+
+def test_limit_adapts_additively_and_backs_off_multiplicatively():
+	clock = FakeClock()
+	scheduler = RequestScheduler(initial_limit=4, min_limit=2, max_limit=8, target_latency=1.0, decrease_interval=1.0, clock=clock)
+
+	async def call(overloaded, latency=0.1):
+		async with scheduler.slot(BULK) as ticket:
+			clock.now += latency
+			ticket.observe(overloaded=overloaded)
+
+	async def run():
+		for _ in range(4):
+			await call(False)
+		grown = scheduler.limit
+		await call(True)
+		after_error = scheduler.limit
+		await call(True)
+		return grown, after_error
+
+	grown, after_error = asyncio.run(run())
+	assert grown > 4.9
+	assert after_error == pytest.approx(grown * 0.7)
+	# Ayni pencere icindeki ikinci hata siniri tekrar dusurmez.
+	assert scheduler.limit == after_error
+	assert scheduler.stats()["decreases"] == 1
+
+def test_token_bucket_paces_after_burst():
+	clock = FakeClock()
+	bucket = TokenBucket(rate=2, capacity=2, clock=clock)
+	assert bucket.reserve() == 0
+	assert bucket.reserve() == 0
+	assert bucket.reserve() == pytest.approx(0.5)
+	assert bucket.reserve() == pytest.approx(1.0)
+	clock.now = 2
+	assert bucket.reserve() == 0
+
+def test_queue_wait_respects_deadline():
+	scheduler = RequestScheduler(initial_limit=1, min_limit=1, max_limit=1)
+
+	async def run():
+		hold = asyncio.Event()
+
+		async def holder():
+			async with scheduler.slot(BULK):
+				await hold.wait()
+
+		task = asyncio.ensure_future(holder())
+		await asyncio.sleep(0)
+		with pytest.raises(DeadlineExceeded):
+			async with scheduler.slot(INTERACTIVE, Deadline(0.05)):
+				pass
+		hold.set()
+		await task
+
+	asyncio.run(run())
+	assert scheduler.in_flight == 0
@@ -0,0 +1,83 @@
+from datetime import date
+
+from fastapi.testclient import TestClient
+
+from app.api import weather
+from app.services.archive_store import archive_store
+from app.utils.helpers import plan_fetch_ranges, split_series_by_day
+from main import app
+
+client = TestClient(app)
+
+
+def _get_range(start_date, end_date, hourly="true"):
+	weather._weather_cache.clear_local()
+	params = {"province": "06", "start_date": start_date, "end_date": end_date, "hourly": hourly}
+	response = client.get("/api/weather", params=params)
+	assert response.status_code == 200
+	return response.json()
+
+def _requested_ranges(fake_upstream):
+	return [(request.url.params["start_date"], request.url.params["end_date"]) for request in fake_upstream.requests]
+
+
+def test_plan_fetch_ranges_bridges_small_gaps():
+	missing = [date(2024, 3, day) for day in (1, 2, 3, 6, 7, 20)]
+	assert plan_fetch_ranges(missing) == [
+		(date(2024, 3, 1), date(2024, 3, 3)),
+		(date(2024, 3, 6), date(2024, 3, 7)),
+		(date(2024, 3, 20), date(2024, 3, 20)),
+	]
+	assert plan_fetch_ranges(missing, max_bridge_days=2) == [
+		(date(2024, 3, 1), date(2024, 3, 7)),
+		(date(2024, 3, 20), date(2024, 3, 20)),
+	]
+
+def test_split_series_by_day():
+	series = {"time": ["2024-03-01T00:00", "2024-03-01T01:00", "2024-03-02T00:00"], "temperature_2m": [1, 2, 3]}
+	segments = split_series_by_day(series)
+	assert list(segments) == ["2024-03-01", "2024-03-02"]
+	assert segments["2024-03-02"] == {"time": ["2024-03-02T00:00"], "temperature_2m": [3]}
+
+def test_overlapping_range_fetches_only_the_gap(fake_upstream):
+	archive_store.open(None)
+	_get_range("2024-03-01", "2024-03-10")
+	payload = _get_range("2024-03-05", "2024-03-15")
+
+	assert _requested_ranges(fake_upstream) == [("2024-03-01", "2024-03-10"), ("2024-03-11", "2024-03-15")]
+	times = payload["data"]["hourly"]["time"]
+	assert len(times) == 11 * 24
+	assert times[0] == "2024-03-05T00:00"
+	assert times[-1] == "2024-03-15T23:00"
+
+def test_gaps_are_merged_into_few_calls(fake_upstream):
+	archive_store.open(None)
+	_get_range("2024-03-01", "2024-03-10", hourly="false")
+	_get_range("2024-03-14", "2024-03-16", hourly="false")
+	fake_upstream.requests.clear()
+
+	payload = _get_range("2024-03-01", "2024-03-25", hourly="false")
+	assert _requested_ranges(fake_upstream) == [("2024-03-11", "2024-03-25")]
+	assert len(payload["data"]["daily"]["time"]) == 25
+
+def test_fully_cached_range_makes_no_upstream_call(fake_upstream):
+	archive_store.open(None)
+	_get_range("2024-03-01", "2024-03-10")
+	calls = len(fake_upstream.requests)
+	_get_range("2024-03-03", "2024-03-04")
+	assert len(fake_upstream.requests) == calls
+
+def test_single_day_gap_in_range_skips_snapshot(fake_upstream, monkeypatch):
+	archive_store.open(None)
+	_get_range("2024-03-01", "2024-03-01")
+	_get_range("2024-03-03", "2024-03-03")
+	fake_upstream.requests.clear()
+
+	async def unusable_archive(*args, **kwargs):
+		return {"hourly": {"time": []}}
+
+	monkeypatch.setattr(weather, "_fetch_archive_range", unusable_archive)
+	payload = _get_range("2024-03-01", "2024-03-03")
+	assert len(payload["data"]["hourly"]["time"]) == 48
+	assert fake_upstream.requests == []
+	assert weather._snapshot_cubes.get("2024-03-02") is None
@@ -0,0 +1,71 @@
+import pstats
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.utils.timing import ServerTimingMiddleware, span
+from main import app
+
+client = TestClient(app)
+
+
+def _spans(header):
+	spans = {}
+	for part in header.split(", "):
+		name, *params = part.split(";")
+		spans[name] = dict(param.split("=", 1) for param in params)
+	return spans
+
+
+def _profiled_app(tmp_path, token="secret"):
+	profiled = FastAPI()
+	profiled.add_middleware(ServerTimingMiddleware, admin_token=token, profile_dir=str(tmp_path))
+
+	@profiled.get("/work")
+	async def work():
+		with span("compute"):
+			total = sum(range(1000))
+		return {"total": total}
+
+	return TestClient(profiled)
+
+
+def test_weather_response_breaks_down_request_time(fake_upstream):
+	response = client.get("/api/weather", params={"province": "06", "start_date": "2024-01-15", "end_date": "2024-01-16"})
+	assert response.status_code == 200
+
+	spans = _spans(response.headers["server-timing"])
+	for name in ("load", "fetch", "upstream_archive", "upstream_queue", "validate", "serialize", "encode", "total"):
+		assert name in spans
+		assert float(spans[name]["dur"]) >= 0
+
+def test_snapshot_fanout_spans_count_upstream_calls(fake_upstream):
+	response = client.get("/api/weather/snapshot", params={"date": "2024-01-15", "time": "12:00"})
+	assert response.status_code == 200
+
+	spans = _spans(response.headers["server-timing"])
+	assert {"cache", "build", "select", "encode", "upstream_archive"} <= set(spans)
+	assert spans["upstream_archive"]["desc"] == '"3x"'
+
+def test_profile_requires_admin_token(tmp_path):
+	profiled = _profiled_app(tmp_path)
+	assert profiled.get("/work", params={"profile": "1"}).status_code == 403
+	assert profiled.get("/work", params={"profile": "1"}, headers={"X-Admin-Token": "wrong"}).status_code == 403
+	assert not list(tmp_path.iterdir())
+
+	disabled = _profiled_app(tmp_path, token=None)
+	assert disabled.get("/work", params={"profile": "1"}, headers={"X-Admin-Token": ""}).status_code == 403
+
+def test_profile_stores_pstats_for_one_request(tmp_path):
+	profiled = _profiled_app(tmp_path)
+	assert "x-profile-id" not in profiled.get("/work").headers
+	assert not list(tmp_path.iterdir())
+
+	response = profiled.get("/work", params={"profile": "1"}, headers={"X-Admin-Token": "secret"})
+	assert response.status_code == 200
+	assert response.json() == {"total": 499500}
+	assert "compute" in _spans(response.headers["server-timing"])
+
+	path = tmp_path / f"{response.headers['x-profile-id']}.prof"
+	assert path.exists()
+	assert pstats.Stats(str(path)).total_calls > 0
@@ -0,0 +1,65 @@
+import asyncio
+import math
+
+import httpx
+
+from app.services.open_meteo import open_meteo
+from app.utils.singleflight import SingleFlight, singleflight_stats
+from main import app
+
+EXPECTED_BATCH_CALLS = math.ceil(81 / open_meteo.batch_size)
+
+
+def _concurrent_get(path, params=None, count=5):
+	async def run():
+		transport = httpx.ASGITransport(app=app)
+		async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+			return await asyncio.gather(*(client.get(path, params=params) for _ in range(count)))
+
+	return asyncio.run(run())
+
+
+def test_singleflight_shares_result_and_error():
+	flight = SingleFlight("test")
+	calls = []
+
+	async def factory():
+		calls.append(1)
+		await asyncio.sleep(0.01)
+		return "ok"
+
+	async def failing():
+		await asyncio.sleep(0.01)
+		raise RuntimeError("boom")
+
+	async def run():
+		results = await asyncio.gather(*(flight.do("key", factory) for _ in range(4)))
+		errors = await asyncio.gather(*(flight.do("bad", failing) for _ in range(3)), return_exceptions=True)
+		return results, errors
+
+	results, errors = asyncio.run(run())
+	assert results == ["ok"] * 4
+	assert len(calls) == 1
+	assert all(isinstance(error, RuntimeError) for error in errors)
+	assert flight.stats() == {"leaders": 2, "coalesced": 5, "inflight": 0}
+
+def test_concurrent_current_requests_share_one_build(fake_upstream):
+	fake_upstream.delay = 0.05
+	coalesced_before = singleflight_stats()["current"]["coalesced"]
+	responses = _concurrent_get("/api/weather/current")
+	assert all(response.status_code == 200 for response in responses)
+	assert len(fake_upstream.requests) == EXPECTED_BATCH_CALLS
+	assert singleflight_stats()["current"]["coalesced"] - coalesced_before == 4
+
+def test_concurrent_snapshot_requests_share_one_build(fake_upstream):
+	fake_upstream.delay = 0.05
+	responses = _concurrent_get("/api/weather/snapshot", params={"date": "2024-01-15", "time": "12:00"})
+	assert all(response.status_code == 200 for response in responses)
+	assert len(fake_upstream.requests) == EXPECTED_BATCH_CALLS
+
+def test_concurrent_weather_requests_share_one_fetch(fake_upstream):
+	fake_upstream.delay = 0.05
+	params = {"province": "06", "start_date": "2024-01-15", "end_date": "2024-01-20", "hourly": "false"}
+	responses = _concurrent_get("/api/weather", params=params)
+	assert all(response.status_code == 200 for response in responses)
+	assert len(fake_upstream.requests) == 1
@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+
+from app.api import weather
+from app.services.snapshot_cube import SnapshotCube
+from main import app
+
+client = TestClient(app)
+
+
+def _province(code, times, temperatures, **fields):
+	return {"plate_code": code, "name": f"Il {code}", "hourly": {"time": times, "temperature_2m": temperatures, **fields}}
+
+def test_select_picks_nearest_hour_per_province():
+	cube = SnapshotCube.from_payload("2024-03-01", {
+		"total": 3,
+		"provinces": [
+			_province("01", ["2024-03-01T00:00", "2024-03-01T06:00", "2024-03-01T12:00"], [1.0, 6.0, 12.0], weather_code=[0, 3, 61]),
+			_province("02", ["2024-03-01T00:00", "2024-03-01T01:00"], [5.0, None]),
+			_province("03", [], []),
+		],
+	})
+
+	rows = cube.select(9.0)
+	# 02'nin en yakin saati 01:00 ama sicakligi yok; il atlanir.
+	assert [row["plate_code"] for row in rows] == ["01"]
+	assert rows[0]["resolved_time"] == "2024-03-01T06:00"
+	assert rows[0]["temperature"] == 6.0
+	assert rows[0]["apparent_temperature"] == 6.0
+	assert rows[0]["weather_code"] == 3
+	assert rows[0]["icon"] == "code_3"
+	assert rows[0]["humidity"] == 0
+
+	assert [row["plate_code"] for row in cube.select(0.0)] == ["01", "02"]
+
+def test_select_breaks_ties_towards_earlier_hour():
+	cube = SnapshotCube.from_payload("2024-03-01", {
+		"total": 1,
+		"provinces": [_province("01", ["2024-03-01T06:00", "2024-03-01T12:00"], [6.0, 12.0])],
+	})
+	assert cube.select(9.0)[0]["resolved_time"] == "2024-03-01T06:00"
+
+def test_switching_hours_reuses_the_cube(fake_upstream):
+	day = (datetime.now().date() - timedelta(days=30)).isoformat()
+	first = client.get("/api/weather/snapshot", params={"date": day, "time": "03:00"})
+	assert first.status_code == 200
+	calls = len(fake_upstream.requests)
+	cube = weather._snapshot_cubes.get(day)
+
+	second = client.get("/api/weather/snapshot", params={"date": day, "time": "15:00"})
+	assert second.status_code == 200
+	assert len(fake_upstream.requests) == calls
+	assert weather._snapshot_cubes.get(day) is cube
+	assert weather._snapshot_cache._local.stats()["entries"] == 2
+
+def test_day_columns_match_hourly_snapshots(fake_upstream):
+	day = (datetime.now().date() - timedelta(days=30)).isoformat()
+	response = client.get("/api/weather/snapshot/day", params={"date": day})
+	assert response.status_code == 200
+	columns = response.json()
+	plate_codes = columns["plate_codes"]
+	assert columns["shape"] == [len(plate_codes), 24]
+	assert columns["times"][0] == f"{day}T00:00"
+	assert columns["variables"]["weather_code"]["type"] == "int"
+	assert len(columns["variables"]["temperature_2m"]["values"]) == len(plate_codes) * 24
+
+	snapshot = client.get("/api/weather/snapshot", params={"date": day, "time": "07:00"}).json()
+	assert snapshot["provinces"]
+	temperatures = columns["variables"]["temperature_2m"]["values"]
+	for item in snapshot["provinces"]:
+		row = plate_codes.index(item["plate_code"])
+		assert temperatures[row * 24 + 7] == item["temperature"]
+
+	again = client.get("/api/weather/snapshot/day", params={"date": day}, headers={"If-None-Match": response.headers["etag"]})
+	assert again.status_code == 304
+
+def test_day_columns_fill_missing_hours_from_nearest():
+	cube = SnapshotCube.from_payload("2024-03-01", {
+		"total": 1,
+		"provinces": [_province("01", ["2024-03-01T00:00", "2024-03-01T12:00"], [0.5, 12.0], cloud_cover=[None, 40])],
+	})
+	columns = cube.day_columns()
+	assert columns["variables"]["temperature_2m"]["values"][5] == 0.5
+	assert columns["variables"]["temperature_2m"]["values"][7] == 12.0
+	assert columns["variables"]["cloud_cover"]["values"][0] is None
+	assert columns["variables"]["cloud_cover"]["values"][23] == 40
+	assert columns["coverage"] == {"available": 1, "total": 1}
+	assert not cube.is_complete()
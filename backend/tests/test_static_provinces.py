@@ -0,0 +1,41 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from app.models.province import ProvinceList
+from main import app
+
+client = TestClient(app)
+
+
+def test_province_list_is_valid_and_has_strong_etag():
+	response = client.get("/api/provinces", headers={"Accept-Encoding": "identity"})
+	assert response.status_code == 200
+	assert response.headers["content-type"] == "application/json"
+	etag = response.headers["etag"]
+	assert etag.startswith('"') and not etag.startswith("W/")
+	payload = ProvinceList.model_validate(response.json())
+	assert payload.total == 81
+
+def test_province_list_answers_304_for_matching_etag():
+	etag = client.get("/api/provinces").headers["etag"]
+	response = client.get("/api/provinces", headers={"If-None-Match": f'"other", {etag}'})
+	assert response.status_code == 304
+	assert response.content == b""
+	assert response.headers["etag"] == etag
+
+def test_province_list_is_served_precompressed():
+	response = client.get("/api/provinces", headers={"Accept-Encoding": "gzip"})
+	assert response.headers["content-encoding"] == "gzip"
+	plain = client.get("/api/provinces", headers={"Accept-Encoding": "identity"})
+	assert "content-encoding" not in plain.headers
+	assert response.json() == plain.json()
+	assert int(response.headers["content-length"]) < len(plain.content)
+
+def test_province_detail_is_prepared():
+	response = client.get("/api/provinces/06")
+	assert response.status_code == 200
+	assert json.loads(response.content)["name"] == "Ankara"
+	etag = response.headers["etag"]
+	assert client.get("/api/provinces/06", headers={"If-None-Match": etag}).status_code == 304
+	assert client.get("/api/provinces/99").status_code == 404
@@ -0,0 +1,89 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from app.services.archive_store import archive_store
+from app.services.open_meteo import ARCHIVE_ENDPOINT, open_meteo
+from app.services.upstream_transport import (
+	RecordingStore,
+	RecordingTransport,
+	ReplayTransport,
+	build_transport,
+)
+from conftest import clear_weather_caches
+from main import app
+
+client = TestClient(app)
+
+
+def test_recordings_replay_regardless_of_param_order(tmp_path):
+	calls = []
+
+	def handler(request):
+		calls.append(request)
+		return httpx.Response(200, json={"latitude": float(request.url.params["latitude"])})
+
+	store = RecordingStore(str(tmp_path / "recordings.sqlite3"))
+
+	async def scenario():
+		async with httpx.AsyncClient(transport=RecordingTransport(store, httpx.MockTransport(handler))) as recorder:
+			response = await recorder.get("https://api.example/v1/forecast", params={"latitude": "39.9", "longitude": "32.8"})
+			assert response.json() == {"latitude": 39.9}
+			await recorder.get("https://api.example/v1/forecast", params={"latitude": "41.0", "longitude": "29.0"})
+
+		replay = ReplayTransport(RecordingStore(store.path))
+		async with httpx.AsyncClient(transport=replay) as replayer:
+			hit = await replayer.get("https://api.example/v1/forecast?longitude=32.8&latitude=39.9")
+			miss = await replayer.get("https://api.example/v1/forecast", params={"latitude": "0", "longitude": "0"})
+		return hit, miss, replay
+
+	hit, miss, replay = asyncio.run(scenario())
+	assert len(calls) == 2
+	assert hit.status_code == 200
+	assert hit.json() == {"latitude": 39.9}
+	assert hit.headers["content-type"] == "application/json"
+	assert miss.status_code == 404
+	assert (replay.hits, replay.misses) == (1, 1)
+
+def test_replay_miss_is_not_retried_and_keeps_breaker_closed(tmp_path):
+	replay = ReplayTransport(RecordingStore(str(tmp_path / "empty.sqlite3")))
+	original_client = open_meteo._client
+	open_meteo._client = httpx.AsyncClient(transport=replay)
+	try:
+		with pytest.raises(httpx.HTTPStatusError):
+			asyncio.run(open_meteo.get_historical_weather(39.9, 32.8, "2024-01-15", "2024-01-15"))
+	finally:
+		open_meteo._client = original_client
+	assert replay.misses == 1
+	assert open_meteo.breakers[ARCHIVE_ENDPOINT].state == "closed"
+
+def test_build_transport_selects_mode(tmp_path):
+	path = str(tmp_path / "recordings.sqlite3")
+	assert build_transport("live", path) is None
+	assert isinstance(build_transport("record", path), RecordingTransport)
+	replay = build_transport("replay", path, replay_latency_ms=5)
+	assert isinstance(replay, ReplayTransport)
+	assert replay.latency_ms == 5
+	with pytest.raises(ValueError):
+		build_transport("offline", path)
+	with pytest.raises(ValueError):
+		build_transport("replay", None)
+
+def test_weather_replays_offline_after_recording(fake_upstream, tmp_path):
+	params = {"province": "06", "start_date": "2024-01-15", "end_date": "2024-01-16"}
+	store = RecordingStore(str(tmp_path / "recordings.sqlite3"))
+	open_meteo._client = httpx.AsyncClient(transport=RecordingTransport(store, httpx.MockTransport(fake_upstream.handler)))
+	recorded = client.get("/api/weather", params=params)
+	assert recorded.status_code == 200
+	upstream_calls = len(fake_upstream.requests)
+	assert upstream_calls > 0
+
+	clear_weather_caches()
+	archive_store.open(str(tmp_path / "fresh-archive.sqlite3"))
+	open_meteo._client = httpx.AsyncClient(transport=ReplayTransport(store))
+	replayed = client.get("/api/weather", params=params)
+	assert replayed.status_code == 200
+	assert len(fake_upstream.requests) == upstream_calls
+	assert replayed.json()["data"] == recorded.json()["data"]
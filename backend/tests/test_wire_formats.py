@@ -0,0 +1,53 @@
+from array import array
+
+import msgpack
+import pytest
+from fastapi.testclient import TestClient
+
+from app.utils.wire_formats import ARROW_MEDIA_TYPE, JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE, negotiate
+from main import app
+
+client = TestClient(app)
+
+PARAMS = {"province": "06", "start_date": "2024-03-01", "end_date": "2024-03-02"}
+
+
+def test_negotiate_respects_quality():
+	offered = [JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE]
+	assert negotiate(None, offered) == JSON_MEDIA_TYPE
+	assert negotiate("application/x-msgpack", offered) == MSGPACK_MEDIA_TYPE
+	assert negotiate("application/json;q=0.9, application/x-msgpack", offered) == MSGPACK_MEDIA_TYPE
+	assert negotiate("application/x-msgpack;q=0.5, application/json", offered) == JSON_MEDIA_TYPE
+	assert negotiate("application/vnd.apache.arrow.stream", offered) == JSON_MEDIA_TYPE
+
+def test_weather_msgpack_packs_numeric_columns(fake_upstream):
+	expected = client.get("/api/weather", params=PARAMS).json()
+	response = client.get("/api/weather", params=PARAMS, headers={"Accept": MSGPACK_MEDIA_TYPE})
+	assert response.status_code == 200
+	assert response.headers["content-type"] == MSGPACK_MEDIA_TYPE
+	assert response.headers["vary"] == "Accept"
+
+	payload = msgpack.unpackb(response.content)
+	hourly = payload["data"]["hourly"]
+	assert hourly["time"] == expected["data"]["hourly"]["time"]
+	assert hourly["temperature_2m"]["dtype"] == "float32"
+	temperatures = array("f", hourly["temperature_2m"]["data"]).tolist()
+	assert temperatures == pytest.approx(expected["data"]["hourly"]["temperature_2m"], abs=1e-4)
+	assert payload["province"] == expected["province"]
+
+	cached = client.get("/api/weather", params=PARAMS, headers={"Accept": MSGPACK_MEDIA_TYPE, "If-None-Match": response.headers["etag"]})
+	assert cached.status_code == 304
+
+def test_weather_arrow_stream(fake_upstream):
+	pyarrow = pytest.importorskip("pyarrow")
+	import pyarrow.ipc
+
+	expected = client.get("/api/weather", params={**PARAMS, "hourly": "false"}).json()
+	response = client.get("/api/weather", params={**PARAMS, "hourly": "false"}, headers={"Accept": ARROW_MEDIA_TYPE})
+	assert response.status_code == 200
+	assert response.headers["content-type"] == ARROW_MEDIA_TYPE
+
+	table = pyarrow.ipc.open_stream(response.content).read_all()
+	assert table.column("time").to_pylist() == expected["data"]["daily"]["time"]
+	assert table.column("temperature_2m_max").type == pyarrow.float32()
+	assert b"plate_code" in table.schema.metadata[b"payload"]